@@ -0,0 +1,71 @@
+"""
+Bingo lookups for a rack: an anagram index keyed on a word's sorted letters.
+
+A rack with no blanks is one dict lookup on its sorted letters. Blanks are
+answered from a subset table that maps every key with one letter removed to
+the full keys containing it:
+
+    0 blanks    index[sorted(rack)]
+    1 blank     subsets[sorted(rack letters)]
+    2 blanks    subsets[sorted(rack letters + L)] for each letter L (26 lookups)
+
+The subset table is built the first time a rack with a blank comes up, so
+lookups that never see a blank don't pay for it, or up front with
+build_blank_table() (as the watcher does, in its executor).
+"""
+
+from itertools import combinations_with_replacement
+
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+BINGO_LENGTH = 7
+
+def _key(letters):
+    return "".join(sorted(letters))
+
+class AnagramIndex:
+    """Sorted letters -> words, for the words of one length (a full rack by default)."""
+    def __init__(self, words, length=BINGO_LENGTH):
+        self.length = length
+        self._index = {}
+        for word in words:
+            if len(word) == length and word.isascii() and word.isalpha() and word.isupper():
+                self._index.setdefault(_key(word), []).append(word)
+        for anagrams in self._index.values():
+            anagrams.sort()
+        self._subsets = None
+
+    def __len__(self):
+        return sum(len(anagrams) for anagrams in self._index.values())
+
+    def build_blank_table(self):
+        """Build the subset table for racks with blanks now rather than on first use. Returns self."""
+        self._get_subsets()
+        return self
+
+    def _get_subsets(self):
+        if self._subsets is None:
+            subsets = {}
+            for key in self._index:
+                for i in range(len(key)):
+                    if i and key[i] == key[i - 1]:
+                        continue
+                    subsets.setdefault(key[:i] + key[i + 1:], []).append(key)
+            self._subsets = subsets
+        return self._subsets
+
+    def anagrams(self, rack):
+        """Return the sorted words that use every tile of rack ('?' is a blank), or [] if rack is the wrong size."""
+        rack = rack.upper()
+        if len(rack) != self.length:
+            return []
+        letters = rack.replace("?", "")
+        blanks = len(rack) - len(letters)
+        if not blanks:
+            return list(self._index.get(_key(letters), ()))
+
+        subsets = self._get_subsets()
+        keys = set()
+        # The first blanks - 1 blanks are spelled out, the last one comes from the subset table
+        for extra in combinations_with_replacement(ALPHABET, blanks - 1):
+            keys.update(subsets.get(_key(letters + "".join(extra)), ()))
+        return sorted(word for key in keys for word in self._index[key])
@@ -0,0 +1,101 @@
+"""
+Board rendering as SVG text, a cheap alternative to compositing JPEGs.
+
+The board is laid out with the same parameters as the raster renderer:
+tile (row, col) sits at (startx + col * tile_spacing, starty + row *
+tile_spacing), tile_scale sizes the tiles within their squares, and
+board_scale scales the whole image. The SVG scales to any size, so an OBS
+browser source can show it at any resolution, and no Pillow is needed.
+
+The empty board (squares and premium labels) is built once per renderer;
+each frame only appends the tiles. Blank tiles (lowercase in the matrix)
+get the 'blank' class and no value, and squares of the last move get
+'last'. Colours are CSS in a <style> block, so overlays can restyle them.
+"""
+
+from movegen import LETTER_VALUES, PREMIUM_SQUARES
+
+BOARD_SIZE = len(PREMIUM_SQUARES)
+
+# Font sizes are filled in from the tile spacing
+STYLE = """\
+.bg{{fill:#1d4d38}}
+.sq{{fill:#e8e4d8;stroke:#1d4d38;stroke-width:1}}
+.T{{fill:#d9534f}}.D{{fill:#f2a7a0}}.t{{fill:#3b7dd8}}.d{{fill:#a8d0f0}}
+.pl{{font:bold {label}px sans-serif;fill:#ffffff;text-anchor:middle;dominant-baseline:central}}
+.tile{{fill:#f3d9a4;stroke:#a8834a;stroke-width:1}}
+.tile.blank{{fill:#fffaf0;stroke:#c0392b;stroke-dasharray:3 2}}
+.tile.last{{stroke:#ffcc00;stroke-width:3}}
+.ch{{font:bold {letter}px sans-serif;fill:#222222;text-anchor:middle;dominant-baseline:central}}
+.ch.blank{{fill:#c0392b;font-style:italic}}
+.val{{font:{value}px sans-serif;fill:#222222;text-anchor:end}}"""
+
+PREMIUM_LABELS = {"T": "TW", "D": "DW", "t": "TL", "d": "DL"}
+
+def _number(value):
+    return f"{value:.2f}".rstrip("0").rstrip(".")
+
+class SvgBoardRenderer:
+    """Renders a board matrix (see watch_gcg.Board) to SVG text."""
+    def __init__(self, startx=50, starty=50, tile_spacing=50, board_scale=1.0, tile_scale=1.0):
+        self.startx = startx
+        self.starty = starty
+        self.tile_spacing = tile_spacing
+        self.board_scale = board_scale
+        self.tile_scale = tile_scale
+        self._background = None
+
+    def _background_svg(self):
+        if self._background is None:
+            spacing = self.tile_spacing
+            width = 2 * self.startx + BOARD_SIZE * spacing
+            height = 2 * self.starty + BOARD_SIZE * spacing
+            parts = [
+                f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" '
+                f'width="{_number(width * self.board_scale)}" height="{_number(height * self.board_scale)}">',
+                "<style>" + STYLE.format(label=_number(spacing * 0.2), letter=_number(spacing * 0.52),
+                                         value=_number(spacing * 0.18)) + "</style>",
+                f'<rect class="bg" width="{width}" height="{height}"/>',
+            ]
+            for row, premiums in enumerate(PREMIUM_SQUARES):
+                for col, premium in enumerate(premiums):
+                    x = self.startx + col * spacing
+                    y = self.starty + row * spacing
+                    premium_class = f" {premium}" if premium != "." else ""
+                    parts.append(f'<rect class="sq{premium_class}" x="{x}" y="{y}" width="{spacing}" height="{spacing}"/>')
+                    if premium != ".":
+                        parts.append(f'<text class="pl" x="{_number(x + spacing / 2)}" y="{_number(y + spacing / 2)}">'
+                                     f"{PREMIUM_LABELS[premium]}</text>")
+            self._background = "".join(parts)
+        return self._background
+
+    def render(self, matrix, last_squares=()):
+        """Return the SVG for matrix, with the (row, col) squares in last_squares highlighted."""
+        spacing = self.tile_spacing
+        size = spacing * min(self.tile_scale, 1.0) * 0.92
+        inset = (spacing - size) / 2
+        last_squares = set(last_squares)
+        parts = [self._background_svg()]
+        for row in range(BOARD_SIZE):
+            for col in range(BOARD_SIZE):
+                tile = matrix[row][col]
+                if not tile:
+                    continue
+                x = self.startx + col * spacing + inset
+                y = self.starty + row * spacing + inset
+                classes = "tile"
+                if tile.islower():
+                    classes += " blank"
+                if (row, col) in last_squares:
+                    classes += " last"
+                parts.append(f'<rect class="{classes}" x="{_number(x)}" y="{_number(y)}" width="{_number(size)}" '
+                             f'height="{_number(size)}" rx="{_number(size / 10)}"/>')
+                letter = tile.upper()
+                letter_class = "ch blank" if tile.islower() else "ch"
+                parts.append(f'<text class="{letter_class}" x="{_number(x + size / 2)}" y="{_number(y + size / 2)}">'
+                             f"{letter}</text>")
+                if not tile.islower() and letter in LETTER_VALUES:
+                    parts.append(f'<text class="val" x="{_number(x + size - 3)}" y="{_number(y + size - 4)}">'
+                                 f"{LETTER_VALUES[letter]}</text>")
+        parts.append("</svg>\n")
+        return "".join(parts)
@@ -1,25 +1,204 @@
 import argparse
+import heapq
+import os
+from operator import itemgetter
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from lexicon_index import LexiconIndexWriter, split_lexicon_word
+
+# Lines are read and written in blocks of about this many bytes
+CHUNK_SIZE = 1 << 20
+
+# Index rows held in memory before a sorted run is spilled to a temporary file
+INDEX_RUN_ROWS = 100_000
+
+# How many malformed line numbers to keep per file for the summary
+MALFORMED_EXAMPLES = 5
+
+def _malformed_reason(word):
+    if not word:
+        return "empty word"
+    if "," in word:
+        return "comma in word"
+    return None
+
+_by_key = itemgetter(0)
+
+class _SortedRuns:
+    """
+    External sort of the --index rows, so building an index streams like the
+    CSV does. Rows are sorted in runs of at most run_rows and spilled to
+    temporary files, then merged; only the last row of each key is kept.
+    Sorting and merging are both stable, so rows of one key stay in input
+    order without tracking line numbers.
+    """
+    def __init__(self, run_rows):
+        self.run_rows = run_rows
+        self._rows = []
+        self._runs = []
+
+    def add(self, key, symbols, definition):
+        self._rows.append((key, symbols, definition))
+        if len(self._rows) >= self.run_rows:
+            self._spill()
+
+    def _spill(self):
+        self._rows.sort(key=_by_key)
+        # Only "\n" ends a line, as a definition could hold a stray "\r"
+        run = tempfile.TemporaryFile("w+", encoding="utf-8", newline="\n")
+        run.writelines(f"{key}\t{symbols}\t{definition}\n" for key, symbols, definition in self._rows)
+        run.seek(0)
+        self._runs.append(run)
+        self._rows = []
+
+    @staticmethod
+    def _read(run):
+        for line in run:
+            yield tuple(line[:-1].split("\t", 2))
+
+    def rows(self):
+        """Yield (key, symbols, definition) in key order; later lines win, as in read_definitions()."""
+        self._rows.sort(key=_by_key)
+        runs = [self._read(run) for run in self._runs] + [iter(self._rows)]
+        previous = None
+        for row in heapq.merge(*runs, key=_by_key) if self._runs else self._rows:
+            if previous is not None and row[0] != previous[0]:
+                yield previous
+            previous = row
+        if previous is not None:
+            yield previous
+
+    def close(self):
+        for run in self._runs:
+            run.close()
+        self._runs = []
 
 # Function to process the text file
-def convert_file(input_file, output_file):
-    with open(input_file, "r") as infile, open(output_file, "w") as outfile:
-        for line in infile:
-            # Strip the line of leading/trailing whitespace
-            line = line.strip()
-            
-            # Split by the tab character
-            if "\t" in line:
-                word, definition = line.split("\t", 1)
+def convert_file(input_file, output_file, index_file=None):
+    """
+    Convert WORD<TAB>definition lines to WORD,'definition' lines.
+
+    Lines without a tab, with an empty word, or with a comma in the word
+    (which would break the CSV) are skipped and counted. When index_file is
+    given, the same rows are also written in the compiled .lexidx format
+    that watch_gcg.py can load directly, sorted in bounded memory (see
+    _SortedRuns).
+
+    Returns a dict with the number of rows written, blank lines and
+    malformed lines, plus a few (line number, reason) examples.
+    """
+    stats = {"input": input_file, "output": output_file, "index": index_file,
+             "rows": 0, "blank": 0, "malformed": 0, "examples": []}
+    entries = _SortedRuns(INDEX_RUN_ROWS) if index_file else None
+    try:
+        _convert_lines(input_file, output_file, entries, stats)
+        if entries is not None:
+            with LexiconIndexWriter(index_file) as writer:
+                for row in entries.rows():
+                    writer.add(*row)
+    finally:
+        if entries is not None:
+            entries.close()
+    return stats
+
+def _convert_lines(input_file, output_file, entries, stats):
+    line_number = 0
+    with open(input_file, "r", encoding="utf-8") as infile, \
+            open(output_file, "w", encoding="utf-8", buffering=CHUNK_SIZE) as outfile:
+        while True:
+            lines = infile.readlines(CHUNK_SIZE)
+            if not lines:
+                break
+            out = []
+            for line in lines:
+                line_number += 1
+                # Strip the line of leading/trailing whitespace
+                line = line.strip()
+                if not line:
+                    stats["blank"] += 1
+                    continue
+
+                # Split by the tab character
+                reason = "no tab" if "\t" not in line else None
+                if reason is None:
+                    word, definition = line.split("\t", 1)
+                    reason = _malformed_reason(word)
+                if reason is not None:
+                    stats["malformed"] += 1
+                    if len(stats["examples"]) < MALFORMED_EXAMPLES:
+                        stats["examples"].append((line_number, reason))
+                    continue
+
                 # Format and write the output
-                outfile.write(f"{word},'{definition}'\n")
+                out.append(f"{word},'{definition}'\n")
+                if entries is not None:
+                    # Same key/symbol split as read_definitions() uses for the CSV
+                    key, symbols = split_lexicon_word(word)
+                    entries.add(key, symbols, definition)
+            outfile.write("".join(out))
+            stats["rows"] += len(out)
+
+def _output_paths(input_file, output_dir, index):
+    stem = os.path.splitext(os.path.basename(input_file))[0]
+    output_file = os.path.join(output_dir, stem + ".csv")
+    index_file = os.path.join(output_dir, stem + ".lexidx") if index else None
+    return output_file, index_file
+
+def convert_files(jobs_list, jobs=None):
+    """Convert [(input, output, index_or_None), ...] using a process pool; yields each stats dict in input order."""
+    if len(jobs_list) == 1 or jobs == 1:
+        for job in jobs_list:
+            yield convert_file(*job)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(convert_file, *job) for job in jobs_list]
+        for future in futures:
+            yield future.result()
+
+def _print_stats(stats):
+    message = f"{stats['input']} -> {stats['output']}: {stats['rows']} rows"
+    if stats["malformed"]:
+        examples = ", ".join(f"line {n} ({reason})" for n, reason in stats["examples"])
+        message += f", {stats['malformed']} malformed skipped (e.g. {examples})"
+    if stats["index"]:
+        message += f", index {stats['index']}"
+    print(message)
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Convert a tab-separated file to a comma-separated format with quoted definitions.")
-    parser.add_argument("input_file", help="Path to the input file")
-    parser.add_argument("output_file", help="Path to the output file")
+    parser = argparse.ArgumentParser(
+        description="Convert tab-separated files to a comma-separated format with quoted definitions. "
+                    "'convert_lexica.py INPUT OUTPUT' converts one file; with --output-dir any number of "
+                    "inputs are converted in parallel to <output-dir>/<name>.csv."
+    )
+    parser.add_argument("files", nargs="+", help="Input file(s), or INPUT OUTPUT when --output-dir is not given")
+    parser.add_argument("-o", "--output-dir", default=None, help="Directory for converted files (enables multiple inputs)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--index", action="store_true", help="Also write a compiled .lexidx next to each output")
+    parser.add_argument("--strict", action="store_true", help="Exit with an error if any malformed rows were found")
 
     args = parser.parse_args()
 
-    convert_file(args.input_file, args.output_file)
+    if args.output_dir is None:
+        if len(args.files) != 2:
+            parser.error("give INPUT OUTPUT, or use --output-dir for several inputs")
+        input_file, output_file = args.files
+        index_file = os.path.splitext(output_file)[0] + ".lexidx" if args.index else None
+        jobs_list = [(input_file, output_file, index_file)]
+    else:
+        os.makedirs(args.output_dir, exist_ok=True)
+        jobs_list = [(f,) + _output_paths(f, args.output_dir, args.index) for f in args.files]
+
+    total_malformed = 0
+    for stats in convert_files(jobs_list, args.jobs):
+        _print_stats(stats)
+        total_malformed += stats["malformed"]
+
+    if args.output_dir is None:
+        print(f"Conversion complete. Output written to {jobs_list[0][1]}.")
+    else:
+        print(f"Conversion complete. {len(jobs_list)} files written to {args.output_dir}.")
 
-    print(f"Conversion complete. Output written to {args.output_file}.")
+    if args.strict and total_malformed:
+        sys.exit(1)
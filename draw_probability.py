@@ -0,0 +1,72 @@
+"""
+Draw odds for the unseen tile pool.
+
+For a pool of N unseen tiles holding K copies of a tile, the chance that a
+draw of n tiles contains at least one of them is hypergeometric:
+
+    P(at least one) = 1 - C(N - K, n) / C(N, n)
+
+and the expected number of vowels in the draw is n * V / N. Every value for a
+pool state is computed in one go and cached, keyed on the pool's counts, so
+repeated updates with an unchanged pool (and the two boards of the same
+position) cost one dict lookup.
+"""
+
+from functools import lru_cache
+from math import comb
+
+VOWELS = set("AEIOU")
+
+class DrawOdds:
+    """Draw odds for one pool state: tile -> P(at least one), blank/S shortcuts and expected vowels."""
+    def __init__(self, pool_size, draw_size, at_least_one, expected_vowels):
+        self.pool_size = pool_size
+        self.draw_size = draw_size
+        self.at_least_one = at_least_one
+        self.expected_vowels = expected_vowels
+
+    @property
+    def blank(self):
+        return self.at_least_one.get("?", 0.0)
+
+    @property
+    def s(self):
+        return self.at_least_one.get("S", 0.0)
+
+    def get_string(self):
+        if not self.pool_size:
+            return ""
+        tile_word = "tile" if self.draw_size == 1 else "tiles"
+        lines = [
+            f"Drawing {self.draw_size} {tile_word} of {self.pool_size}",
+            f"Blank: {100 * self.blank:.1f}% | S: {100 * self.s:.1f}%",
+            f"Expected vowels: {self.expected_vowels:.1f}",
+            " | ".join(f"{tile} {100 * p:.0f}%" for tile, p in self.at_least_one.items()),
+        ]
+        return "\n".join(lines)
+
+@lru_cache(maxsize=256)
+def _draw_odds(pool, draw_size):
+    pool_size = sum(count for _, count in pool if count > 0)
+    draw_size = min(draw_size, pool_size)
+    if not pool_size:
+        return DrawOdds(0, 0, {}, 0.0)
+
+    total = comb(pool_size, draw_size)
+    # C(N - K, n) only depends on K, and K is small, so share it between tiles
+    misses = {}
+    at_least_one = {}
+    vowel_count = 0
+    for tile, count in pool:
+        if count <= 0:
+            continue
+        if count not in misses:
+            misses[count] = comb(pool_size - count, draw_size)
+        at_least_one[tile] = 1 - misses[count] / total
+        if tile in VOWELS:
+            vowel_count += count
+    return DrawOdds(pool_size, draw_size, at_least_one, draw_size * vowel_count / pool_size)
+
+def draw_odds(tiles, draw_size=7):
+    """Return the DrawOdds for drawing draw_size tiles from tiles ({tile: unseen count}, like Bag.tiles)."""
+    return _draw_odds(tuple(tiles.items()), draw_size)
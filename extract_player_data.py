@@ -1,8 +1,16 @@
+import argparse
+import re
 import sys
 import os
+import unicodedata
 
-def get_output_filename(column_name, player_number):
-    return f"p{player_number}{column_name}.txt"
+def get_output_filename(column_name, player_number, board=1):
+    # Board 1 keeps the original names; board N writes board<N>_p<n><column>.txt
+    # next to them, like watch_gcg.py does for its per-board outputs.
+    filename = f"p{player_number}{column_name}.txt"
+    if board == 1:
+        return filename
+    return f"board{board}_" + filename
 
 def write_single_file(column_name, player_number, content):
     with open(get_output_filename(column_name, player_number), 'w') as file:
@@ -18,18 +26,19 @@ def write_player_data(player_info, header, player_index, player_number):
         if index == 3:
             hometown = player_info_row[index]
         write_single_file(column_name, player_number, player_info_row[index])
-    
-    write_single_file("preview", player_number, team + "\n" + hometown)
 
+    write_single_file("preview", player_number, team + "\n" + hometown)
 
-def parse_player_csv(csv_filename, player1_number, player2_number):
+def read_roster(csv_filename):
+    """Return (header, {player index: row}) for a tab-separated roster file."""
     # Check if the CSV file exists
     if not os.path.isfile(csv_filename):
         raise ValueError(f"Error: File '{csv_filename}' not found.")
 
+    header = []
+    player_info = {}
     with open(csv_filename, 'r') as file:
         line_number = 0
-        player_info = {}
         for line in file:
             line = line.strip()
             if line == "":
@@ -44,23 +53,257 @@ def parse_player_csv(csv_filename, player1_number, player2_number):
                 if player_index != "":
                     player_info[player_index] = split_line
             line_number += 1
+    return header, player_info
+
+def parse_player_csv(csv_filename, player1_number, player2_number):
+    header, player_info = read_roster(csv_filename)
 
-        if player1_number not in player_info:
-            raise ValueError(f"Error: Player with index {player1_number} not found.")
-        
-        if player2_number not in player_info:
-            raise ValueError(f"Error: Player with index {player2_number} not found.")
+    if player1_number not in player_info:
+        raise ValueError(f"Error: Player with index {player1_number} not found.")
 
-        write_player_data(player_info, header, player1_number, 1)
-        write_player_data(player_info, header, player2_number, 2)
+    if player2_number not in player_info:
+        raise ValueError(f"Error: Player with index {player2_number} not found.")
+
+    write_player_data(player_info, header, player1_number, 1)
+    write_player_data(player_info, header, player2_number, 2)
+
+def read_pairings(pairings_filename):
+    """
+    Read a pairings file: one 'BOARD PLAYER1 PLAYER2' line per board (or just
+    'PLAYER1 PLAYER2', numbered by line). Blank lines and '#' comments are skipped.
+    A board given twice is an error, since the second pairing would overwrite
+    the first. Returns a list of (board, player1 index, player2 index).
+    """
+    pairings = []
+    boards = set()
+    with open(pairings_filename, 'r') as file:
+        for line in file:
+            fields = line.split('#', 1)[0].split()
+            if not fields:
+                continue
+            if len(fields) == 2:
+                board, player1, player2 = len(pairings) + 1, fields[0], fields[1]
+            elif len(fields) == 3 and fields[0].isdigit():
+                board, player1, player2 = int(fields[0]), fields[1], fields[2]
+            else:
+                raise ValueError(f"Error: Invalid pairing line: {line.strip()}")
+            if board in boards:
+                raise ValueError(f"Error: Board {board} is paired more than once: {line.strip()}")
+            boards.add(board)
+            pairings.append((board, player1, player2))
+    return pairings
+
+def normalize_name(name):
+    """
+    Lowercase name, drop accents and punctuation, and turn 'Last, First' and
+    GCG-style 'First_Last' into 'first last'.
+    """
+    name = unicodedata.normalize("NFKD", name.replace("_", " "))
+    name = "".join(c for c in name if not unicodedata.combining(c))
+    if "," in name:
+        last, first = name.split(",", 1)
+        name = first + " " + last
+    return " ".join(re.findall(r"[a-z0-9]+", name.lower()))
+
+def _deletions(key):
+    return {key[:i] + key[i + 1:] for i in range(len(key))}
+
+def _one_edit_apart(a, b):
+    """True if a and b differ by at most one missing, extra, wrong or swapped (adjacent) letter."""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    i = 0
+    while i < min(len(a), len(b)) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1:] == b[i + 1:] or (a[i:i + 2] == b[i:i + 2][::-1] and a[i + 2:] == b[i + 2:])
+    if len(a) < len(b):
+        a, b = b, a
+    return a[i + 1:] == b[i:]
+
+class NameMatcher:
+    """
+    Precomputed name -> player index lookup.
+
+    Names match exactly after normalize_name(), in any word order, or with one
+    typo (a missing, extra, wrong or swapped letter). Typo candidates are found
+    with the symmetric-delete trick: every roster name is stored under itself
+    and all its one-letter deletions, so a lookup is a handful of dict probes
+    no matter how big the roster is. A shared deletion can also pair names two
+    edits apart (abcd/abde), so each candidate is then checked against the
+    name itself. Names that match more than one player give None.
+    """
+    # Shorter names are only matched exactly
+    FUZZY_MIN_LENGTH = 5
+
+    def __init__(self, names):
+        self._exact = {}
+        self._fuzzy = {}
+        self._compact = {}
+        for player_index, name in names.items():
+            tokens = normalize_name(name).split()
+            if not tokens:
+                continue
+            compact = "".join(tokens)
+            for key in (compact, "".join(sorted(tokens))):
+                self._exact.setdefault(key, set()).add(player_index)
+            if len(compact) >= self.FUZZY_MIN_LENGTH:
+                self._compact[player_index] = compact
+                for key in _deletions(compact) | {compact}:
+                    self._fuzzy.setdefault(key, set()).add(player_index)
+
+    def find(self, name):
+        """Return the player index for name, or None if there is no unique match."""
+        tokens = normalize_name(name).split()
+        if not tokens:
+            return None
+        compact = "".join(tokens)
+        for key in (compact, "".join(sorted(tokens))):
+            found = self._exact.get(key)
+            if found:
+                return next(iter(found)) if len(found) == 1 else None
+        if len(compact) < self.FUZZY_MIN_LENGTH:
+            return None
+        found = set()
+        for key in _deletions(compact) | {compact}:
+            found |= self._fuzzy.get(key, set())
+        found = {player_index for player_index in found if _one_edit_apart(compact, self._compact[player_index])}
+        return next(iter(found)) if len(found) == 1 else None
+
+class RosterIndex:
+    """
+    A roster parsed once and kept in memory, for writing the player files of
+    many boards per round.
+
+    Files are only written when their content changes, through a temporary
+    file and os.replace() so overlays never read a half-written file. Each
+    file is replaced on its own: an overlay reading during write_pairings()
+    can see some boards already on the new round and others not yet. The
+    roster is re-read only if its modification time changes (see refresh()).
+    """
+    def __init__(self, csv_filename, output_dir="."):
+        self.csv_filename = csv_filename
+        self.output_dir = output_dir
+        self._mtime = None
+        # path -> content we last wrote or found there
+        self._written = {}
+        self.refresh()
+
+    def refresh(self):
+        """Re-read the roster if the file changed on disk. Returns True if it was re-read."""
+        mtime = os.path.getmtime(self.csv_filename) if os.path.isfile(self.csv_filename) else None
+        if self._mtime is not None and mtime == self._mtime:
+            return False
+        self.header, self.players = read_roster(self.csv_filename)
+        self._mtime = mtime
+        # The name column is the one headed "name", otherwise the second column
+        lowered = [column.lower() for column in self.header]
+        self.name_column = lowered.index("name") if "name" in lowered else 1
+        self.matcher = NameMatcher({index: row[self.name_column] for index, row in self.players.items()
+                                    if len(row) > self.name_column})
+        return True
+
+    def find_player(self, *names):
+        """Return the player index of the first of names that matches a roster name, or None."""
+        for name in names:
+            if name:
+                player_index = self.matcher.find(name)
+                if player_index is not None:
+                    return player_index
+        return None
+
+    def __contains__(self, player_index):
+        return player_index in self.players
+
+    def player_files(self, player_index, player_number, board=1):
+        """Return {filename: content} for one player, the same files write_player_data() writes."""
+        if player_index not in self.players:
+            raise ValueError(f"Error: Player with index {player_index} not found.")
+        row = self.players[player_index]
+        files = {}
+        for index, column_name in enumerate(self.header):
+            files[get_output_filename(column_name, player_number, board)] = row[index]
+        team = row[2] if len(row) > 2 else ""
+        hometown = row[3] if len(row) > 3 else ""
+        files[get_output_filename("preview", player_number, board)] = team + "\n" + hometown
+        return files
+
+    def unmatched_files(self, name, player_number, board=1):
+        """Return {filename: content} for a player not in the roster: name in the name column, the rest blank."""
+        files = {}
+        for index, column_name in enumerate(self.header):
+            files[get_output_filename(column_name, player_number, board)] = name if index == self.name_column else ""
+        files[get_output_filename("preview", player_number, board)] = ""
+        return files
+
+    def _write_if_changed(self, filename, content):
+        path = os.path.join(self.output_dir, filename)
+        if path not in self._written:
+            try:
+                with open(path, 'r') as file:
+                    self._written[path] = file.read()
+            except OSError:
+                self._written[path] = None
+        if self._written[path] == content:
+            return False
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w') as file:
+            file.write(content)
+        os.replace(tmp_path, path)
+        self._written[path] = content
+        return True
+
+    def write_pairings(self, pairings):
+        """
+        Write the player files for every (board, player1 index, player2 index).
+        All players are checked before anything is written. Returns the paths
+        that changed.
+        """
+        missing = [p for _, p1, p2 in pairings for p in (p1, p2) if p not in self.players]
+        if missing:
+            raise ValueError(f"Error: Player(s) with index {', '.join(missing)} not found.")
+
+        changed = []
+        for board, player1_index, player2_index in pairings:
+            changed += self.write_player(player1_index, 1, board)
+            changed += self.write_player(player2_index, 2, board)
+        return changed
+
+    def write_player(self, player_index, player_number, board=1):
+        """Write one player's files for a board. Returns the paths that changed."""
+        return self._write_files(self.player_files(player_index, player_number, board))
+
+    def write_unmatched(self, name, player_number, board=1):
+        """Overwrite a board's player files for a player not in the roster. Returns the paths that changed."""
+        return self._write_files(self.unmatched_files(name, player_number, board))
+
+    def _write_files(self, files):
+        changed = []
+        for filename, content in files.items():
+            if self._write_if_changed(filename, content):
+                changed.append(os.path.join(self.output_dir, filename))
+        return changed
 
 if __name__ == "__main__":
-    if len(sys.argv) != 4:
+    parser = argparse.ArgumentParser(
+        description="Write p1<column>.txt / p2<column>.txt player files from a tab-separated roster. "
+                    "Give two player numbers for a single board, or --pairings for a whole round."
+    )
+    parser.add_argument("csv_filename", help="Tab-separated roster; the first column is the player number")
+    parser.add_argument("players", nargs="*", help="player1_number player2_number")
+    parser.add_argument("--pairings", default=None, help="File of 'BOARD PLAYER1 PLAYER2' lines; board N writes board<N>_p<n><column>.txt")
+    parser.add_argument("--output-dir", default=".", help="Directory for the player files (default: current directory)")
+    args = parser.parse_args()
+
+    if args.pairings is None and len(args.players) != 2:
         print("Usage: python script.py <csv_filename> <player1_number> <player2_number>")
+        print("       python script.py <csv_filename> --pairings <pairings_file>")
         sys.exit(1)
 
-    csv_filename = sys.argv[1]
-    player1_index = sys.argv[2]
-    player2_index = sys.argv[3]
-
-    parse_player_csv(csv_filename, player1_index, player2_index)
+    roster = RosterIndex(args.csv_filename, args.output_dir)
+    if args.pairings is not None:
+        pairings = read_pairings(args.pairings)
+    else:
+        pairings = [(1, args.players[0], args.players[1])]
+    changed = roster.write_pairings(pairings)
+    print(f"{len(pairings)} board(s), {len(changed)} file(s) updated.")
@@ -0,0 +1,266 @@
+import os
+import re
+import sys
+from pathlib import Path
+
+from stream_lex_symbs import (
+    OUTPUTS, build_parser, iter_defs, iter_wordlist, merge_sources, rows_for_word,
+)
+
+# Patch a previous build (NWL23_lexsym.csv, CSW24_lexsym.csv, WOW24_lexsym.csv)
+# after some inputs changed, instead of rebuilding every row:
+#
+#   1. diff the old and new version of each changed input (one streaming merge)
+#   2. the words added, removed or re-defined there are the only words whose
+#      rows can change; their entries in every input are looked up by binary
+#      search in the sorted input files
+#   3. each output is rewritten by copying the untouched byte ranges of the
+#      previous output and splicing in the recomputed rows
+#
+# so the work done per word only happens for the changed words.
+
+SOURCES = ("nwl23", "csw24", "csw21", "nwl18", "nwl20", "wow24")
+
+LEX_SUFFIX_RE = re.compile(rb"[+#x$]+$")
+
+_COPY_CHUNK = 1 << 20
+
+# ---------- Sorted text files ----------
+
+def defs_key(line):
+    return line.split(b"\t", 1)[0].strip().upper()
+
+def wordlist_key(line):
+    return line.strip().upper()
+
+def output_key(line):
+    return LEX_SUFFIX_RE.sub(b"", line.split(b",", 1)[0].strip())
+
+def find_line(f, target, key, size):
+    """
+    Return the byte offset of the first line in the sorted binary file f
+    whose key is >= target (size if there is none).
+    """
+    lo, hi = 0, size
+    # Bisect on byte offsets; lo always sits on a line start whose line sorts before target
+    while hi - lo > 4096:
+        mid = (lo + hi) // 2
+        f.seek(mid)
+        f.readline()
+        pos = f.tell()
+        line = f.readline()
+        if not line or key(line) >= target:
+            hi = mid
+        else:
+            lo = pos
+    f.seek(lo)
+    while True:
+        pos = f.tell()
+        line = f.readline()
+        if not line or (line.strip() and key(line) >= target):
+            return pos
+
+def lookup_sorted(path, words, key, parse):
+    """
+    Look up each word in a sorted input file by binary search.
+    Returns {word: value} for the words present; for repeated words the
+    last row wins, like load_defs().
+    """
+    found = {}
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        for word in sorted(words):
+            target = word.encode("utf-8")
+            f.seek(find_line(f, target, key, size))
+            while True:
+                line = f.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                if key(line) != target:
+                    break
+                value = parse(line.decode("utf-8"))
+                if value is not None:
+                    found[word] = value
+    return found
+
+def _parse_defs_line(line):
+    line = line.rstrip("\n")
+    if "\t" not in line:
+        return None  # malformed rows are skipped, as in load_defs()
+    return line.split("\t", 1)[1].strip()
+
+def _parse_wordlist_line(line):
+    return ""
+
+# ---------- Diff ----------
+
+def diff_source(old_rows, new_rows):
+    """Yield (word, old_definition or None, new_definition or None) for every changed word."""
+    for word, entry in merge_sources({"old": old_rows, "new": new_rows}):
+        old, new = entry.get("old"), entry.get("new")
+        if old != new:
+            yield word, old, new
+
+def _source_paths(args):
+    paths = {
+        "nwl23": args.nwl23_defs,
+        "csw24": args.csw24_defs,
+        "csw21": args.csw21_defs,
+        "nwl18": args.nwl18_defs,
+        "nwl20": args.nwl20_defs,
+    }
+    paths["wow24"] = args.wow24_defs if args.mode == "direct" else args.wow24_words
+    return paths
+
+def _is_wordlist(source, mode):
+    return source == "wow24" and mode == "staged"
+
+def _iter_source(path, wordlist):
+    return iter_wordlist(path) if wordlist else iter_defs(path)
+
+# ---------- Patching ----------
+
+def _copy_range(src, dst, start, end):
+    src.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        chunk = src.read(min(_COPY_CHUNK, remaining))
+        if not chunk:
+            break
+        dst.write(chunk)
+        remaining -= len(chunk)
+
+def patch_output(old_path, new_path, new_rows):
+    """
+    Rewrite old_path into new_path, replacing the rows of the words in
+    new_rows ({word: (display, definition) or None}). Returns a list of
+    (word, old_line or None, new_line or None) for the rows that changed.
+    """
+    changes = []
+    size = os.path.getsize(old_path)
+    tmp_path = str(new_path) + ".tmp"
+    with open(old_path, "rb") as src, open(tmp_path, "wb") as dst:
+        pos = 0
+        for word in sorted(new_rows):
+            target = word.encode("utf-8")
+            start = find_line(src, target, output_key, size)
+            _copy_range(src, dst, pos, start)
+            src.seek(start)
+            line = src.readline()
+            if line and output_key(line) == target:
+                old_line, pos = line, start + len(line)
+            else:
+                old_line, pos = None, start
+
+            new_line = None
+            if new_rows[word] is not None:
+                display, definition = new_rows[word]
+                new_line = f"{display},'{definition}'\n".encode("utf-8")
+                dst.write(new_line)
+            if old_line != new_line:
+                changes.append((word, old_line, new_line))
+        _copy_range(src, dst, pos, size)
+    os.replace(tmp_path, new_path)
+    return changes
+
+def _line_text(line):
+    return line.decode("utf-8").rstrip("\n") if line else ""
+
+# ---------- Core pipeline ----------
+
+def main(args):
+    previous_dir = Path(args.previous_dir)
+    out_dir = Path(args.output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = _source_paths(args)
+
+    changed = {}
+    for spec in args.changed:
+        source, sep, old_path = spec.partition("=")
+        source = source.strip().lower()
+        if not sep or source not in SOURCES:
+            raise SystemExit(f"--changed expects SOURCE=OLD_PATH with SOURCE one of {', '.join(SOURCES)}: {spec}")
+        changed[source] = old_path
+
+    # 1. Input diffs
+    log = []
+    affected = set()
+    for source, old_path in changed.items():
+        wordlist = _is_wordlist(source, args.mode)
+        counts = {"+": 0, "-": 0, "~": 0}
+        for word, old, new in diff_source(_iter_source(old_path, wordlist), _iter_source(paths[source], wordlist)):
+            affected.add(word)
+            if old is None:
+                counts["+"] += 1
+                log.append(f"[{source}] + {word}")
+            elif new is None:
+                counts["-"] += 1
+                log.append(f"[{source}] - {word}")
+            else:
+                counts["~"] += 1
+                log.append(f"[{source}] ~ {word}: '{old}' -> '{new}'")
+        print(f"[INFO] {source}: {counts['+']} added, {counts['-']} removed, {counts['~']} re-defined.")
+
+    # 2. Current entries of the affected words, by binary search in each input
+    entries = {word: {} for word in affected}
+    for source, path in paths.items():
+        if _is_wordlist(source, args.mode):
+            found = lookup_sorted(path, affected, wordlist_key, _parse_wordlist_line)
+        else:
+            found = lookup_sorted(path, affected, defs_key, _parse_defs_line)
+        for word, definition in found.items():
+            entries[word][source] = definition
+
+    new_rows = {name: {} for name in OUTPUTS}
+    for word, entry in entries.items():
+        rows = rows_for_word(word, entry, args.mode)
+        for name in OUTPUTS:
+            new_rows[name][word] = rows.get(name)
+
+    # 3. Patch each output
+    for name in OUTPUTS:
+        filename = f"{name}_lexsym.csv"
+        changes = patch_output(previous_dir / filename, out_dir / filename, new_rows[name])
+        for word, old_line, new_line in changes:
+            if old_line is None:
+                log.append(f"{filename} + {_line_text(new_line)}")
+            elif new_line is None:
+                log.append(f"{filename} - {_line_text(old_line)}")
+            else:
+                log.append(f"{filename} ~ {_line_text(old_line)} -> {_line_text(new_line)}")
+        print(f"[INFO] {filename}: {len(changes)} rows changed.")
+
+    changelog = Path(args.changelog) if args.changelog else out_dir / "lexsym_changelog.txt"
+    with open(changelog, "w", encoding="utf-8") as f:
+        f.write("\n".join(log) + ("\n" if log else ""))
+
+    if args.index_dir:
+        # lexicon_index.py lives next to watch_gcg.py in the repo root
+        sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+        from lexicon_index import INDEX_SUFFIX, write_lexicon_index
+        index_dir = Path(args.index_dir)
+        index_dir.mkdir(parents=True, exist_ok=True)
+        for name in OUTPUTS:
+            write_lexicon_index(index_dir / f"{name}_lexsym{INDEX_SUFFIX}", _csv_rows(out_dir / f"{name}_lexsym.csv"))
+
+    print(f"Done. Changelog written to {changelog}.")
+
+def _csv_rows(path):
+    with open(path, "r", encoding="utf-8", buffering=1 << 20) as f:
+        for line in f:
+            raw_word, definition = line.rstrip("\n").split(",", 1)
+            word = re.sub(r"[+#x$]+$", "", raw_word)
+            yield word, raw_word[len(word):], definition.strip()[1:-1]
+
+if __name__ == "__main__":
+    p = build_parser()
+    p.description = ("Patch a previous NWL23/CSW24/WOW24 lexsym build after some inputs changed, "
+                     "recomputing only the rows of added, removed or re-defined words. "
+                     "Input paths are the NEW versions; pass the old version of each changed input with --changed.")
+    p.add_argument("--previous-dir", required=True, help="Directory holding the previous NWL23/CSW24/WOW24_lexsym.csv")
+    p.add_argument("--changed", action="append", default=[], metavar="SOURCE=OLD_PATH",
+                   help="Previous version of a changed input, e.g. csw24=csw24_defs_old.txt (repeatable)")
+    p.add_argument("--changelog", default=None, help="Changelog path (default: <output-dir>/lexsym_changelog.txt)")
+    main(p.parse_args())
@@ -0,0 +1,260 @@
+import argparse
+import heapq
+import queue
+import sys
+import threading
+from pathlib import Path
+
+from direct_defs_lex_symbs import append_marker, cross_membership_combo
+
+# Same outputs as direct_defs_lex_symbs.py / staged_defs_lex_symbs.py, built in
+# one streaming pass: every input is read in sorted order, the inputs are
+# k-way merged by word, and each word's markers and definitions are decided
+# from the merged entry and written to all three outputs at once. Memory no
+# longer depends on lexicon size.
+
+OUTPUTS = ("NWL23", "CSW24", "WOW24")
+
+# ---------- Streaming inputs ----------
+
+def _prefetch(lines, chunk_size=8192, max_chunks=16):
+    """
+    Read lines in a background thread, handing them over in chunks, so disk
+    reads and decoding overlap with the merge.
+    """
+    q = queue.Queue(max_chunks)
+    done = object()
+
+    def reader():
+        try:
+            chunk = []
+            for line in lines:
+                chunk.append(line)
+                if len(chunk) >= chunk_size:
+                    q.put(chunk)
+                    chunk = []
+            if chunk:
+                q.put(chunk)
+        except BaseException as e:
+            q.put(e)
+        q.put(done)
+
+    threading.Thread(target=reader, daemon=True).start()
+    while True:
+        item = q.get()
+        if item is done:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield from item
+
+def iter_defs(path):
+    """
+    Yield (WORD, definition) from a sorted WORD<TAB>definition file.
+    Blank and malformed rows are skipped like load_defs(); for repeated words
+    the last definition wins. Raises ValueError if the file is not sorted.
+    """
+    with open(path, "r", encoding="utf-8", buffering=1 << 20) as f:
+        yield from _sorted_unique(path, _parse_defs(_prefetch(f)))
+
+def iter_wordlist(path):
+    """Yield (WORD, '') from a sorted one-word-per-line file."""
+    with open(path, "r", encoding="utf-8", buffering=1 << 20) as f:
+        words = ((line.strip().upper(), "") for line in _prefetch(f))
+        yield from _sorted_unique(path, ((w, d) for w, d in words if w))
+
+def _parse_defs(lines):
+    for line in lines:
+        line = line.rstrip("\n")
+        if not line.strip() or "\t" not in line:
+            continue
+        word, definition = line.split("\t", 1)
+        yield word.strip().upper(), definition.strip()
+
+def _sorted_unique(path, rows):
+    previous = None
+    for word, definition in rows:
+        if previous is not None:
+            if word < previous[0]:
+                raise ValueError(
+                    f"{path} is not sorted ({word} comes after {previous[0]}). "
+                    "Sort it first (e.g. LC_ALL=C sort) or use the in-memory scripts."
+                )
+            if word != previous[0]:
+                yield previous
+        previous = (word, definition)
+    if previous is not None:
+        yield previous
+
+def _tag(name, rows):
+    for word, definition in rows:
+        yield word, name, definition
+
+def merge_sources(sources):
+    """
+    K-way merge {name: sorted (word, definition) iterator} into
+    (word, {name: definition}) for every word in any source, in sorted order.
+    """
+    streams = [_tag(name, rows) for name, rows in sources.items()]
+    current, entry = None, {}
+    for word, name, definition in heapq.merge(*streams, key=lambda row: row[0]):
+        if word != current:
+            if current is not None:
+                yield current, entry
+            current, entry = word, {}
+        entry[name] = definition
+    if current is not None:
+        yield current, entry
+
+# ---------- Per-word rules ----------
+
+def _combo(entry):
+    return cross_membership_combo("csw24" in entry, "nwl23" in entry, "wow24" in entry)
+
+def nwl23_row(word, entry):
+    if "nwl23" not in entry:
+        return None
+    display = word + _combo(entry)
+    # '+' rule: In NWL23 and not in NWL20
+    if "nwl20" not in entry:
+        display = append_marker(display, "+")
+    return display, entry["nwl23"]
+
+def csw24_row(word, entry):
+    if "csw24" not in entry:
+        return None
+    display = word + _combo(entry)
+    # '+' rule: In CSW24 and not in CSW21
+    if "csw21" not in entry:
+        display = append_marker(display, "+")
+    return display, entry["csw24"]
+
+def wow24_definition(entry, mode):
+    """
+    Return (definition, source) for a WOW24 word. 'direct' prefers the WOW24
+    definition with an NWL23 fallback; 'staged' fills NWL18 -> NWL20 -> NWL23.
+    """
+    if mode == "direct":
+        d = entry.get("wow24", "")
+        if d == "" and "nwl23" in entry:
+            return entry["nwl23"], "nwl23"
+        return d, "wow24"
+    for source in ("nwl18", "nwl20", "nwl23"):
+        d = entry.get(source, "")
+        if d != "":
+            return d, source
+    return "", None
+
+def wow24_row(word, entry, mode):
+    if "wow24" not in entry:
+        return None
+    display = word + _combo(entry)
+    # '+' rule: In WOW24 but not in NWL20 AND not in NWL18
+    if "nwl20" not in entry and "nwl18" not in entry:
+        display = append_marker(display, "+")
+    return display, wow24_definition(entry, mode)[0]
+
+def rows_for_word(word, entry, mode):
+    """Return {output lexicon: (display, definition)} for the outputs word belongs to."""
+    rows = {}
+    for name, row in (("NWL23", nwl23_row(word, entry)),
+                      ("CSW24", csw24_row(word, entry)),
+                      ("WOW24", wow24_row(word, entry, mode))):
+        if row is not None:
+            rows[name] = row
+    return rows
+
+def open_sources(args):
+    sources = {
+        "nwl23": iter_defs(args.nwl23_defs),
+        "csw24": iter_defs(args.csw24_defs),
+        "csw21": iter_defs(args.csw21_defs),
+        "nwl18": iter_defs(args.nwl18_defs),
+        "nwl20": iter_defs(args.nwl20_defs),
+    }
+    if args.mode == "direct":
+        sources["wow24"] = iter_defs(args.wow24_defs)
+    else:
+        sources["wow24"] = iter_wordlist(args.wow24_words)
+    return sources
+
+# ---------- Core pipeline ----------
+
+def main(args):
+    out_dir = Path(args.output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    index_writers = {}
+    if args.index_dir:
+        # lexicon_index.py lives next to watch_gcg.py in the repo root
+        sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+        from lexicon_index import LexiconIndexWriter, INDEX_SUFFIX
+        index_dir = Path(args.index_dir)
+        index_dir.mkdir(parents=True, exist_ok=True)
+        index_writers = {name: LexiconIndexWriter(index_dir / f"{name}_lexsym{INDEX_SUFFIX}") for name in OUTPUTS}
+
+    outputs = {name: open(out_dir / f"{name}_lexsym.csv", "w", encoding="utf-8", newline="", buffering=1 << 20)
+               for name in OUTPUTS}
+    fallback_count = 0
+    # stage -> [count, first few words], mirroring staged_defs_lex_symbs.report_missing
+    missing = {"After NWL20 fill": [0, []], "After NWL23 fill": [0, []]}
+    try:
+        for word, entry in merge_sources(open_sources(args)):
+            for name, (display, definition) in rows_for_word(word, entry, args.mode).items():
+                outputs[name].write(f"{display},'{definition}'\n")
+                if name in index_writers:
+                    index_writers[name].add(word, display[len(word):], definition)
+
+            if "wow24" in entry:
+                definition, source = wow24_definition(entry, args.mode)
+                if args.mode == "direct" and source == "nwl23":
+                    fallback_count += 1
+                elif args.mode == "staged":
+                    for stage, still_missing in (("After NWL20 fill", source in (None, "nwl23")),
+                                                 ("After NWL23 fill", source is None)):
+                        if still_missing:
+                            missing[stage][0] += 1
+                            if len(missing[stage][1]) < 5:
+                                missing[stage][1].append(word)
+    except BaseException:
+        for writer in index_writers.values():
+            writer.abort()
+        raise
+    finally:
+        for f in outputs.values():
+            f.close()
+
+    for writer in index_writers.values():
+        writer.close()
+
+    if args.mode == "direct" and fallback_count:
+        print(f"[INFO] WOW24: used NWL23 fallback definitions for {fallback_count} words.")
+    if args.mode == "staged":
+        for stage, (count, first) in missing.items():
+            if stage == "After NWL23 fill" and not missing["After NWL20 fill"][0]:
+                continue
+            print(f"[DEBUG] {stage}: missing definitions = {count}")
+            if count:
+                print(f"[DEBUG] {stage}: first {len(first)} missing -> {', '.join(first)}")
+    print("Done.")
+
+def build_parser():
+    p = argparse.ArgumentParser(
+        description="Stream pre-sorted definition files into tagged CSVs for NWL23, CSW24, WOW24 in one merge pass "
+                    "(same rules as direct_defs_lex_symbs.py / staged_defs_lex_symbs.py)."
+    )
+    p.add_argument("--mode", choices=["direct", "staged"], default="direct",
+                   help="WOW24 definitions: 'direct' uses --wow24-defs with NWL23 fallback; 'staged' fills --wow24_words from NWL18 -> NWL20 -> NWL23")
+    p.add_argument("--nwl23-defs", nargs="?", default="nwl23_defs.txt", help="Path to nwl23_defs.txt (WORD<TAB>definition, sorted)")
+    p.add_argument("--csw24-defs", nargs="?", default="csw24_defs.txt", help="Path to csw24_defs.txt (WORD<TAB>definition, sorted)")
+    p.add_argument("--csw21-defs", nargs="?", default="csw21_defs.txt", help="Path to csw21_defs.txt (WORD<TAB>definition, sorted)")
+    p.add_argument("--nwl18-defs", nargs="?", default="nwl18_defs.txt", help="Path to nwl18_defs.txt (WORD<TAB>definition, sorted)")
+    p.add_argument("--nwl20-defs", nargs="?", default="nwl20_defs.txt", help="Path to nwl20_defs.txt (WORD<TAB>definition, sorted)")
+    p.add_argument("--wow24-defs", nargs="?", default="WOW24.txt", help="(direct) Path to wow24_defs.txt (WORD<TAB>definition, sorted)")
+    p.add_argument("--wow24_words", nargs="?", default="WOW24_words.txt", help="(staged) Path to the WOW24 word list (one word per line, sorted)")
+    p.add_argument("--output-dir", nargs="?", default=".", help="Directory to write NWL23_lexsym.csv, CSW24_lexsym.csv, WOW24_lexsym.csv")
+    p.add_argument("--index-dir", default=None, help="Also write compiled <LEX>_lexsym.lexidx lookup files here (loadable with watch_gcg.py --lex)")
+    return p
+
+if __name__ == "__main__":
+    main(build_parser().parse_args())
@@ -0,0 +1,194 @@
+"""
+Compiled lexicon lookup format shared by the lexicon tools and watch_gcg.py.
+
+A .lexidx file holds the same data as a WORD+symbols,'definition' CSV, sorted
+by word so it can be memory-mapped and binary searched instead of parsed:
+
+    b"WGCGLEX1"                      magic
+    records                          b"WORD\\tSYMBOLS\\tDEFINITION" (UTF-8), sorted by WORD
+    uint32 offsets[count + 1]        little-endian, relative to the first record
+    uint32 count                     little-endian
+    b"WGCGLEX1"                      magic
+
+The offset table is at the end so the file can be written in a single
+streaming pass over sorted rows.
+"""
+
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+
+MAGIC = b"WGCGLEX1"
+INDEX_SUFFIX = ".lexidx"
+
+# Lexicon symbols trail the word in the CSV, e.g. QI+ or AA$x
+LEX_SUFFIX_RE = re.compile(r'[+#x$]+$')
+
+def split_lexicon_word(raw_word):
+    """Split a lexicon CSV word like 'qi+' into its lookup key and symbols: ('QI', '+')."""
+    word = raw_word.strip()
+    match = LEX_SUFFIX_RE.search(word)
+    key = (word[:match.start()] if match else word).upper()
+    if word != raw_word:
+        match = LEX_SUFFIX_RE.search(raw_word)  # Symbols are only kept when they end the raw word
+    return key, match.group(0) if match else ""
+
+_HEADER_SIZE = len(MAGIC)
+_FOOTER = struct.Struct("<I8s")
+
+def is_lexicon_index(path):
+    """True if path starts with the compiled lexicon magic."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(_HEADER_SIZE) == MAGIC
+    except OSError:
+        return False
+
+class LexiconIndexWriter:
+    """
+    Streams (word, symbols, definition) rows, in strictly increasing word
+    order, into a .lexidx file. The file is written under a temporary name
+    and moved into place on close().
+    """
+    def __init__(self, path):
+        self.path = str(path)
+        self._tmp_path = self.path + ".tmp"
+        self._file = open(self._tmp_path, "wb", buffering=1 << 20)
+        self._file.write(MAGIC)
+        self._offsets = array("I", [0])
+        self._position = 0
+        self._last_word = None
+
+    def add(self, word, symbols, definition):
+        if self._last_word is not None and word <= self._last_word:
+            raise ValueError(f"Lexicon index rows must be sorted and unique: {word!r} after {self._last_word!r}")
+        self._last_word = word
+        record = f"{word}\t{symbols}\t{definition}".encode("utf-8")
+        self._file.write(record)
+        self._position += len(record)
+        self._offsets.append(self._position)
+
+    def close(self):
+        if self._file is None:
+            return
+        offsets = self._offsets
+        if sys.byteorder != "little":
+            offsets = array("I", offsets)
+            offsets.byteswap()
+        self._file.write(offsets.tobytes())
+        self._file.write(_FOOTER.pack(len(self._offsets) - 1, MAGIC))
+        self._file.close()
+        self._file = None
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+def write_lexicon_index(path, rows):
+    """Write an iterable of sorted (word, symbols, definition) rows to path."""
+    with LexiconIndexWriter(path) as writer:
+        for word, symbols, definition in rows:
+            writer.add(word, symbols, definition)
+
+class LexiconIndex:
+    """Read-only, memory-mapped view of a .lexidx file."""
+    def __init__(self, path):
+        self.path = str(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        size = len(self._mm)
+        if size < _HEADER_SIZE + 4 + _FOOTER.size or self._mm[:_HEADER_SIZE] != MAGIC:
+            raise ValueError(f"Not a compiled lexicon: {self.path}")
+        count, magic = _FOOTER.unpack_from(self._mm, size - _FOOTER.size)
+        if magic != MAGIC:
+            raise ValueError(f"Truncated compiled lexicon: {self.path}")
+        self.count = count
+        table_start = size - _FOOTER.size - 4 * (count + 1)
+        if sys.byteorder == "little":
+            self._offsets = memoryview(self._mm)[table_start:size - _FOOTER.size].cast("I")
+        else:
+            self._offsets = array("I", self._mm[table_start:size - _FOOTER.size])
+            self._offsets.byteswap()
+        self.definitions = _IndexColumn(self, 2)
+        self.symbols = _IndexColumn(self, 1)
+
+    def __len__(self):
+        return self.count
+
+    def _record(self, i):
+        start = _HEADER_SIZE + self._offsets[i]
+        return self._mm[start:_HEADER_SIZE + self._offsets[i + 1]]
+
+    def _word(self, i):
+        record = self._record(i)
+        return record[:record.index(b"\t")]
+
+    def _find(self, word):
+        key = word.encode("utf-8")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._word(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self._word(lo) == key:
+            return lo
+        return -1
+
+    def lookup(self, word):
+        """Return (symbols, definition) for word, or None."""
+        i = self._find(word)
+        if i < 0:
+            return None
+        _, symbols, definition = self._record(i).decode("utf-8").split("\t", 2)
+        return symbols, definition
+
+    def __contains__(self, word):
+        return isinstance(word, str) and self._find(word) >= 0
+
+    def rows(self):
+        """Yield every (word, symbols, definition) row in sorted order."""
+        for i in range(self.count):
+            yield tuple(self._record(i).decode("utf-8").split("\t", 2))
+
+    def words(self):
+        for i in range(self.count):
+            yield self._word(i).decode("utf-8")
+
+class _IndexColumn(Mapping):
+    """dict-like word -> symbols/definition view, so callers can use the index like read_definitions() maps."""
+    def __init__(self, index, column):
+        self._index = index
+        self._column = column
+
+    def __getitem__(self, word):
+        i = self._index._find(word) if isinstance(word, str) else -1
+        if i < 0:
+            raise KeyError(word)
+        return self._index._record(i).decode("utf-8").split("\t", 2)[self._column]
+
+    def __contains__(self, word):
+        return word in self._index
+
+    def __iter__(self):
+        return self._index.words()
+
+    def __len__(self):
+        return len(self._index)
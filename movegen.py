@@ -0,0 +1,385 @@
+"""
+Built-in static move generator, used for analysis when MAGPIE is not available.
+
+Plays are generated with the Appel-Jacobson algorithm over a word_graph.WordGraph:
+every play must cover an anchor (an empty square next to a tile, or the
+centre on an empty board), left parts are grown from the graph root over the
+free squares before the anchor, and words are extended right through board
+tiles and tiles from the rack. Cross-checks (which letters may go on a
+square given the tiles above and below it) and cross-word scores are kept in
+CrossChecks, which only recomputes the squares around tiles that changed
+since the last move. Plays are ranked by score only (no equity or
+simulation); the top N are kept, within a time budget.
+"""
+
+import heapq
+import time
+
+BOARD_SIZE = 15
+RACK_SIZE = 7
+BINGO_BONUS = 50
+
+LETTER_VALUES = {
+    "A": 1, "B": 3, "C": 3, "D": 2, "E": 1, "F": 4, "G": 2, "H": 4, "I": 1,
+    "J": 8, "K": 5, "L": 1, "M": 3, "N": 1, "O": 1, "P": 3, "Q": 10, "R": 1,
+    "S": 1, "T": 1, "U": 1, "V": 4, "W": 4, "X": 8, "Y": 4, "Z": 10,
+}
+
+# T/D: triple/double word, t/d: triple/double letter
+PREMIUM_SQUARES = [
+    "T..d...T...d..T",
+    ".D...t...t...D.",
+    "..D...d.d...D..",
+    "d..D...d...D..d",
+    "....D.....D....",
+    ".t...t...t...t.",
+    "..d...d.d...d..",
+    "T..d...D...d..T",
+    "..d...d.d...d..",
+    ".t...t...t...t.",
+    "....D.....D....",
+    "d..D...d...D..d",
+    "..D...d.d...D..",
+    ".D...t...t...D.",
+    "T..d...T...d..T",
+]
+
+_LETTER_MULTIPLIER = {"d": 2, "t": 3}
+_WORD_MULTIPLIER = {"D": 2, "T": 3}
+
+ALL_LETTERS = (1 << 26) - 1
+ACROSS, DOWN = 0, 1
+
+def _bit(letter):
+    return 1 << (ord(letter) - 65)
+
+def tile_value(tile):
+    """Score of a board or rack tile; blanks (lowercase or '?') score 0."""
+    return 0 if not tile or tile == "?" or tile.islower() else LETTER_VALUES.get(tile, 0)
+
+class CrossChecks:
+    """
+    Cross-check masks and cross-word scores for every square, for plays in
+    each direction, kept in step with a Board through its change log.
+
+    masks[ACROSS][sq] is the set of letters (bit 0 = A) that form a valid
+    word with the tiles above and below sq; scores[ACROSS][sq] is the score
+    of those tiles, or -1 if there are none. The DOWN arrays are the same for
+    the tiles left and right of sq.
+    """
+    def __init__(self, graph):
+        self.graph = graph
+        self.board = None
+        self._seen = 0
+        self.masks = ([ALL_LETTERS] * BOARD_SIZE * BOARD_SIZE, [ALL_LETTERS] * BOARD_SIZE * BOARD_SIZE)
+        self.scores = ([-1] * BOARD_SIZE * BOARD_SIZE, [-1] * BOARD_SIZE * BOARD_SIZE)
+
+    def sync(self, board):
+        """Bring the cross-checks up to date with board; only squares near changed tiles are recomputed."""
+        changes = board.changes
+        if board is not self.board or len(changes) < self._seen:
+            self.board = board
+            for row in range(BOARD_SIZE):
+                for col in range(BOARD_SIZE):
+                    self._compute(row, col)
+        else:
+            for row, col in changes[self._seen:]:
+                self._refresh_around(row, col)
+        self._seen = len(changes)
+
+    def _refresh_around(self, row, col):
+        matrix = self.board.matrix
+        self._compute(row, col)
+        # The first empty square past each end of the lines through (row, col)
+        for d_row, d_col in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            r, c = row + d_row, col + d_col
+            while 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE and matrix[r][c]:
+                r += d_row
+                c += d_col
+            if 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE:
+                self._compute(r, c)
+
+    def _compute(self, row, col):
+        sq = row * BOARD_SIZE + col
+        matrix = self.board.matrix
+        if matrix[row][col]:
+            # Occupied squares take no tiles; reset them as a fresh build would
+            for direction in (ACROSS, DOWN):
+                self.masks[direction][sq] = ALL_LETTERS
+                self.scores[direction][sq] = -1
+            return
+        for direction, (d_row, d_col) in ((ACROSS, (1, 0)), (DOWN, (0, 1))):
+            before = []
+            r, c = row - d_row, col - d_col
+            while r >= 0 and c >= 0 and matrix[r][c]:
+                before.append(matrix[r][c])
+                r -= d_row
+                c -= d_col
+            before.reverse()
+            after = []
+            r, c = row + d_row, col + d_col
+            while r < BOARD_SIZE and c < BOARD_SIZE and matrix[r][c]:
+                after.append(matrix[r][c])
+                r += d_row
+                c += d_col
+            if not before and not after:
+                self.masks[direction][sq] = ALL_LETTERS
+                self.scores[direction][sq] = -1
+                continue
+            self.masks[direction][sq] = self._allowed("".join(before).upper(), "".join(after).upper())
+            self.scores[direction][sq] = sum(tile_value(t) for t in before) + sum(tile_value(t) for t in after)
+
+    def _allowed(self, before, after):
+        graph = self.graph
+        walked = graph.walk(before) if before else (False, 0)
+        if walked is None or (before and not walked[1]):
+            return 0
+        mask = 0
+        for letter, terminal, child in graph.children(walked[1]):
+            if not after:
+                ok = terminal
+            else:
+                rest = graph.walk(after, child) if child else None
+                ok = rest is not None and rest[0]
+            if ok:
+                mask |= _bit(letter)
+        return mask
+
+class Play:
+    """A generated play in GCG terms: position ('8D' across, 'D8' down), word with '.' for board tiles, score."""
+    __slots__ = ("position", "word", "display_word", "score", "tiles")
+
+    def __init__(self, position, word, display_word, score, tiles):
+        self.position = position
+        self.word = word
+        self.display_word = display_word
+        self.score = score
+        self.tiles = tiles
+
+    def __repr__(self):
+        return f"{self.position} {self.display_word} {self.score}"
+
+class _OutOfTime(Exception):
+    pass
+
+def _position(direction, line, start):
+    if direction == ACROSS:
+        return f"{line + 1}{chr(65 + start)}"
+    return f"{chr(65 + line)}{start + 1}"
+
+def _display(word):
+    parts = []
+    inside = False
+    for tile in word:
+        if tile.startswith("("):
+            if not inside:
+                parts.append("(")
+                inside = True
+            parts.append(tile[1:])
+        else:
+            if inside:
+                parts.append(")")
+                inside = False
+            parts.append(tile)
+    if inside:
+        parts.append(")")
+    return "".join(parts)
+
+def generate_plays(graph, matrix, masks, scores, rack, top_n=10, time_budget=1.0, cancel=None):
+    """
+    Return (plays, complete): the top_n highest scoring plays for rack
+    ('?' is a blank) on matrix, best first, and whether the search finished
+    inside time_budget seconds. masks and scores come from CrossChecks.
+    The search also stops early once cancel (a threading.Event) is set.
+    """
+    deadline = time.perf_counter() + time_budget
+    counts = {}
+    for tile in rack.upper():
+        counts[tile] = counts.get(tile, 0) + 1
+    board_empty = not any(any(row) for row in matrix)
+
+    best = []  # min-heap of (score, n, Play)
+    seen_singles = set()
+    serial = [0]
+    children = graph.children
+    step = graph.step
+
+    def record(direction, line, start, tiles, cells, premiums, xscores):
+        main = 0
+        multiplier = 1
+        cross = 0
+        new = 0
+        for offset, (tile, is_new) in enumerate(tiles):
+            i = start + offset
+            value = tile_value(tile)
+            if not is_new:
+                main += value
+                continue
+            new += 1
+            premium = premiums[i]
+            letter_value = value * _LETTER_MULTIPLIER.get(premium, 1)
+            word_multiplier = _WORD_MULTIPLIER.get(premium, 1)
+            main += letter_value
+            multiplier *= word_multiplier
+            if xscores[i] >= 0:
+                cross += (xscores[i] + letter_value) * word_multiplier
+        score = main * multiplier + cross + (BINGO_BONUS if new == RACK_SIZE else 0)
+        if new == 1:
+            # A one-tile play is found once across and once down
+            offset = next(o for o, (_, is_new) in enumerate(tiles) if is_new)
+            square = (line, start + offset) if direction == ACROSS else (start + offset, line)
+            key = (square, tiles[offset][0])
+            if key in seen_singles:
+                return
+            seen_singles.add(key)
+        serial[0] += 1
+        if len(best) >= top_n and score <= best[0][0]:
+            return
+        word = "".join(tile if is_new else "." for tile, is_new in tiles)
+        display = _display([tile if is_new else "(" + tile for tile, is_new in tiles])
+        play = Play(_position(direction, line, start), word, display, score, new)
+        if len(best) < top_n:
+            heapq.heappush(best, (score, serial[0], play))
+        else:
+            heapq.heapreplace(best, (score, serial[0], play))
+
+    def search_line(direction, line):
+        if direction == ACROSS:
+            cells = [matrix[line][i] for i in range(BOARD_SIZE)]
+            sqs = [line * BOARD_SIZE + i for i in range(BOARD_SIZE)]
+            premiums = PREMIUM_SQUARES[line]
+        else:
+            cells = [matrix[i][line] for i in range(BOARD_SIZE)]
+            sqs = [i * BOARD_SIZE + line for i in range(BOARD_SIZE)]
+            premiums = "".join(PREMIUM_SQUARES[i][line] for i in range(BOARD_SIZE))
+        line_masks = [masks[direction][sq] for sq in sqs]
+        xscores = [scores[direction][sq] for sq in sqs]
+
+        if board_empty:
+            anchors = [BOARD_SIZE // 2] if line == BOARD_SIZE // 2 else []
+        else:
+            anchors = [i for i in range(BOARD_SIZE) if not cells[i] and (
+                xscores[i] >= 0
+                or (i > 0 and cells[i - 1])
+                or (i + 1 < BOARD_SIZE and cells[i + 1]))]
+        anchor_set = set(anchors)
+        tiles = []
+        calls = [0]
+
+        def extend_right(pos, node, terminal, placed):
+            calls[0] += 1
+            if calls[0] & 1023 == 0 and (time.perf_counter() > deadline or cancel is not None and cancel.is_set()):
+                raise _OutOfTime()
+            if pos == BOARD_SIZE or not cells[pos]:
+                if terminal and placed:
+                    record(direction, line, pos - len(tiles), tiles, cells, premiums, xscores)
+                if pos == BOARD_SIZE or not node:
+                    return
+                mask = line_masks[pos]
+                for letter, child_terminal, child in children(node):
+                    if not mask & _bit(letter):
+                        continue
+                    for tile in (letter, "?"):
+                        if counts.get(tile, 0):
+                            counts[tile] -= 1
+                            tiles.append((letter if tile != "?" else letter.lower(), True))
+                            extend_right(pos + 1, child, child_terminal, placed + 1)
+                            tiles.pop()
+                            counts[tile] += 1
+            else:
+                if not node:
+                    return
+                taken = step(node, cells[pos].upper())
+                if taken is None:
+                    return
+                tiles.append((cells[pos], False))
+                extend_right(pos + 1, taken[1], taken[0], placed)
+                tiles.pop()
+
+        def first_extend(anchor, node, placed):
+            # Put a tile on the anchor; unlike in extend_right, node 0 here is the root
+            mask = line_masks[anchor]
+            for letter, child_terminal, child in children(node):
+                if not mask & _bit(letter):
+                    continue
+                for tile in (letter, "?"):
+                    if counts.get(tile, 0):
+                        counts[tile] -= 1
+                        tiles.append((letter if tile != "?" else letter.lower(), True))
+                        extend_right(anchor + 1, child, child_terminal, placed + 1)
+                        tiles.pop()
+                        counts[tile] += 1
+
+        def left_part(anchor, node, limit):
+            first_extend(anchor, node, len(tiles))
+            if limit <= 0:
+                return
+            for letter, _, child in children(node):
+                if not child:
+                    continue  # A leaf cannot reach the anchor
+                for tile in (letter, "?"):
+                    if counts.get(tile, 0):
+                        counts[tile] -= 1
+                        tiles.append((letter if tile != "?" else letter.lower(), True))
+                        left_part(anchor, child, limit - 1)
+                        tiles.pop()
+                        counts[tile] += 1
+
+        for anchor in anchors:
+            if anchor > 0 and cells[anchor - 1]:
+                # Tiles already before the anchor form the left part
+                start = anchor
+                while start > 0 and cells[start - 1]:
+                    start -= 1
+                walked = graph.walk("".join(cells[start:anchor]).upper())
+                if walked is None or not walked[1]:
+                    continue
+                tiles[:] = [(cell, False) for cell in cells[start:anchor]]
+                first_extend(anchor, walked[1], 0)
+                tiles.clear()
+            else:
+                limit = 0
+                i = anchor - 1
+                while i >= 0 and not cells[i] and i not in anchor_set:
+                    limit += 1
+                    i -= 1
+                left_part(anchor, 0, min(limit, sum(counts.values()) - 1))
+
+    complete = True
+    try:
+        # An opening down the centre column is the same play turned, so only openings across are listed
+        for direction in (ACROSS,) if board_empty else (ACROSS, DOWN):
+            for line in range(BOARD_SIZE):
+                if cancel is not None and cancel.is_set():
+                    raise _OutOfTime()
+                search_line(direction, line)
+    except _OutOfTime:
+        complete = False
+    return [play for _, _, play in sorted(best, key=lambda item: (-item[0], item[1]))], complete
+
+class LocalAnalysis:
+    """Keeps cross-checks for one board in step between updates and formats the top plays."""
+    def __init__(self, graph, top_n=10, time_budget=1.0):
+        self.graph = graph
+        self.top_n = top_n
+        self.time_budget = time_budget
+        self.cross_checks = CrossChecks(graph)
+
+    def snapshot(self, board):
+        """Sync the cross-checks and copy what generate_plays needs, so it can run off the event loop thread."""
+        self.cross_checks.sync(board)
+        masks = tuple(list(m) for m in self.cross_checks.masks)
+        scores = tuple(list(s) for s in self.cross_checks.scores)
+        return [list(row) for row in board.matrix], masks, scores
+
+    def analyze(self, snapshot, rack, cancel=None):
+        matrix, masks, scores = snapshot
+        start = time.perf_counter()
+        plays, complete = generate_plays(self.graph, matrix, masks, scores, rack, self.top_n, self.time_budget, cancel)
+        elapsed = time.perf_counter() - start
+        lines = [f"Local analysis for {rack} (static score, {elapsed:.2f}s{'' if complete else ', time limit hit'}):"]
+        for i, play in enumerate(plays, start=1):
+            lines.append(f"{i:>2}. {play.position} {play.display_word} {play.score}")
+        if not plays:
+            lines.append("No plays found.")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,287 @@
+"""
+Whole-game post-mortem: analyse every turn of a finished GCG with MAGPIE and
+write one report of the best play, the play made and the equity lost.
+
+Turns are queued and shared out between several MAGPIE processes. Each
+worker loads the game once, then for every turn it takes: 'goto N' to the
+position before it, 'gs' (or 'endgame' once the bag is empty) and 'shm' (or
+'she') for the ranked plays. Progress is printed as turns finish.
+
+    python postmortem.py game.gcg --magpie ~/magpie --lex NWL23defs.csv -j 4 -o report.txt
+
+MAGPIE's tables are matched loosely (see parse_ranked_plays()): a play made
+that is not in the ranked list is reported without an equity loss.
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import time
+
+from watch_gcg import (
+    Bag, EngineLimits, Game, MOVE_TYPE_EXCHANGE, MOVE_TYPE_TILE_PLACEMENT, RACK_SIZE, parse_cpu_list, parse_nice,
+    _drain_magpie, _emit, _magpie_output_ok, _set_magpie_threads, _start_magpie, _wait_for_magpie_finished,
+)
+
+# Seconds a single turn may run before it is stopped and its result fetched
+TURN_TIMEOUT = 120.0
+
+class Turn:
+    """One move of the game to analyse: MAGPIE's 'goto index' is the position just before it."""
+    def __init__(self, index, player, move, endgame):
+        self.index = index
+        self.player = player
+        self.move = move
+        self.endgame = endgame
+
+    @property
+    def number(self):
+        return self.index + 1
+
+class TurnResult:
+    def __init__(self, turn, plays=None, output="", error=""):
+        self.turn = turn
+        self.plays = plays or []  # [(play, equity)], best first
+        self.output = output
+        self.error = error
+
+    @property
+    def best(self):
+        return self.plays[0] if self.plays else None
+
+    @property
+    def actual(self):
+        """The (play, equity) entry for the move made, or None if it is not among the ranked plays."""
+        key = move_key(self.turn.move)
+        for play, equity in self.plays:
+            if play_key(play) == key:
+                return play, equity
+        return None
+
+    @property
+    def equity_lost(self):
+        best, actual = self.best, self.actual
+        if best is None or actual is None or best[1] is None or actual[1] is None:
+            return None
+        return max(0.0, best[1] - actual[1])
+
+def read_turns(gcg_filename):
+    """Return (game, [Turn]) for every move of a GCG, challenged-off plays included."""
+    game = Game(gcg_filename)
+    pool = sum(Bag().tiles.values())
+    placed = 0
+    turns = []
+    for index, move in enumerate(game.moves):
+        # Unseen to the mover is the bag plus the opponent's rack, so the bag is empty once that is a rack or less
+        unseen = pool - placed - len(move.rack)
+        player = game.players.get_name(move.player_index) if move.player_index is not None else ""
+        turns.append(Turn(index, player, move, unseen <= RACK_SIZE))
+        if move.move_type == MOVE_TYPE_TILE_PLACEMENT and not move.challenged_off:
+            placed += move.tiles
+    return game, turns
+
+def move_key(move):
+    """A loose key for a move, comparable with play_key() of MAGPIE's notation."""
+    if move.move_type == MOVE_TYPE_TILE_PLACEMENT:
+        return move.position.upper() + " " + move.key
+    if move.move_type == MOVE_TYPE_EXCHANGE:
+        return "EXCH " + "".join(sorted(move.word.upper()))
+    return "PASS"
+
+def play_key(play):
+    tokens = play.replace("(", " ").replace(")", " ").split()
+    if not tokens:
+        return ""
+    if tokens[0].lower() == "pass":
+        return "PASS"
+    if tokens[0].lower().startswith("ex"):
+        # 'exch ABC', 'exch. ABC' or 'exch.ABC'
+        letters = "".join(tokens[1:]) or tokens[0].partition(".")[2]
+        return "EXCH " + "".join(sorted(letters.upper().lstrip("-")))
+    return tokens[0].upper() + " " + re.sub(r"[^A-Za-z]", "", "".join(tokens[1:])).upper()
+
+_NUMBER = re.compile(r"^[-+]?\d+(?:\.\d+)?%?$")
+
+def _number(token):
+    return float(token.rstrip("%"))
+
+def parse_ranked_plays(output):
+    """
+    Return [(play, equity)] from MAGPIE's shm/she table, best first.
+
+    Ranked rows start with their rank; the play is the text up to the first
+    number. The equity is taken from the column headed 'Eq...' when the
+    header lines up with the row, and is otherwise the row's last number.
+    """
+    plays = []
+    equity_column = None
+    for line in output.splitlines():
+        tokens = line.split()
+        if not tokens:
+            continue
+        lowered = [token.lower() for token in tokens]
+        if equity_column is None and any(token.startswith("eq") for token in lowered) and not _NUMBER.match(tokens[0]):
+            # Columns counted from the right, so multi-word plays do not shift them
+            equity_column = next(i for i, token in enumerate(lowered) if token.startswith("eq")) - len(tokens)
+            continue
+        rank = tokens[0].rstrip(".:)")
+        if not rank.isdigit() or len(tokens) < 3:
+            continue
+        rest = tokens[1:]
+        end = next((i for i, token in enumerate(rest) if _NUMBER.match(token)), len(rest))
+        play = " ".join(rest[:end])
+        numbers = [_number(token) for token in rest[end:] if _NUMBER.match(token)]
+        if not play or not numbers:
+            continue
+        equity = numbers[-1]
+        if equity_column is not None and -equity_column <= len(rest) - end and _NUMBER.match(rest[equity_column]):
+            equity = _number(rest[equity_column])
+        plays.append((play, equity))
+    return plays
+
+async def _send(proc, command):
+    proc.stdin.write(f"{command}\n".encode())
+    await proc.stdin.drain()
+
+async def _analyse_turn(proc, turn, poll_interval, turn_timeout, limits=None):
+    command, show = ("endgame", "she") if turn.endgame else ("gs", "shm")
+    if limits is not None:
+        await _set_magpie_threads(proc, limits)
+    await _send(proc, f"goto {turn.index}")
+    goto_output = await _wait_for_magpie_finished(proc)
+    if not _magpie_output_ok(goto_output):
+        return TurnResult(turn, output=goto_output, error=f"goto {turn.index} failed")
+
+    await _send(proc, command)
+    deadline = time.monotonic() + turn_timeout
+    while True:
+        await asyncio.sleep(poll_interval)
+        output = await _drain_magpie(proc, timeout=0.1)
+        if '(error 1)' in output or 'finished' in output:
+            break
+        if proc.returncode is not None:
+            return TurnResult(turn, error="MAGPIE exited")
+        if time.monotonic() > deadline:
+            await _send(proc, "stop")
+            await _wait_for_magpie_finished(proc)
+            break
+    await _send(proc, show)
+    output = await _drain_magpie(proc, timeout=2.0)
+    plays = parse_ranked_plays(output)
+    return TurnResult(turn, plays, output, "" if plays else "no ranked plays in MAGPIE's output")
+
+async def _worker(proc, gcg_filename, queue, results, on_progress, poll_interval, turn_timeout, limits):
+    await _send(proc, f"load {os.path.abspath(gcg_filename)}")
+    load_output = await _wait_for_magpie_finished(proc)
+    if not _magpie_output_ok(load_output):
+        raise RuntimeError(f"MAGPIE could not load {gcg_filename}:\n{load_output.strip()}")
+    while not queue.empty():
+        turn = queue.get_nowait()
+        result = await _analyse_turn(proc, turn, poll_interval, turn_timeout, limits)
+        results[turn.index] = result
+        on_progress(result)
+        if proc.returncode is not None:
+            return
+
+async def analyse_game(gcg_filename, magpie_path, lex_filename, workers=2, poll_interval=0.5,
+                       turn_timeout=TURN_TIMEOUT, limits=None, on_event=None):
+    """
+    Analyse every turn of gcg_filename across up to workers MAGPIE processes,
+    each within limits (a watch_gcg.EngineLimits).
+    Returns (game, [TurnResult] in turn order); turns no worker got to have an error.
+    """
+    game, turns = read_turns(gcg_filename)
+    queue = asyncio.Queue()
+    for turn in turns:
+        queue.put_nowait(turn)
+    results = {}
+    start = time.perf_counter()
+
+    def on_progress(result):
+        status = f"best {result.best[0]}" if result.best else result.error
+        _emit(on_event, "progress", f"Turn {result.turn.number} ({len(results)}/{len(turns)}, "
+              f"{time.perf_counter() - start:.0f}s): {status}", done=len(results), total=len(turns))
+
+    procs = []
+    try:
+        for _ in range(max(1, min(workers, len(turns)))):
+            proc = await _start_magpie(magpie_path, lex_filename, on_event, limits)
+            if proc is not None:
+                procs.append(proc)
+        if not procs and turns:
+            raise RuntimeError(f"Could not start MAGPIE in {magpie_path}")
+        _emit(on_event, "status", f"Analysing {len(turns)} turns with {len(procs)} MAGPIE worker(s)…")
+        outcomes = await asyncio.gather(
+            *(_worker(proc, gcg_filename, queue, results, on_progress, poll_interval, turn_timeout, limits) for proc in procs),
+            return_exceptions=True,
+        )
+        for outcome in outcomes:
+            if isinstance(outcome, Exception):
+                _emit(on_event, "warning", f"MAGPIE worker stopped: {outcome}")
+    finally:
+        for proc in procs:
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+    return game, [results.get(turn.index) or TurnResult(turn, error="not analysed") for turn in turns]
+
+def _format_play(play):
+    return play if len(play) <= 24 else play[:23] + "…"
+
+def format_report(gcg_filename, game, results, elapsed=None):
+    """Return the post-mortem report text: one row per turn, then each player's total equity lost."""
+    header = f"Post-mortem: {os.path.basename(gcg_filename)} ({len(results)} turns"
+    header += f", {elapsed:.0f}s)" if elapsed is not None else ")"
+    lines = [header, "", f"{'Turn':>4}  {'Player':<12}{'Played':<25}{'Best':<25}{'Eq lost':>12}"]
+    lost = {}
+    turns = {}
+    for result in results:
+        turn = result.turn
+        made = turn.move.display_word if turn.move.move_type == MOVE_TYPE_TILE_PLACEMENT else (
+            "exch " + turn.move.word if turn.move.move_type == MOVE_TYPE_EXCHANGE else "pass")
+        if turn.move.move_type == MOVE_TYPE_TILE_PLACEMENT:
+            made = f"{turn.move.position} {made}"
+        if turn.move.challenged_off:
+            made += " --"
+        equity_lost = result.equity_lost
+        if result.error:
+            column = result.error
+        elif equity_lost is None:
+            column = "(not ranked)"
+        else:
+            column = f"{equity_lost:.1f}"
+            lost[turn.player] = lost.get(turn.player, 0.0) + equity_lost
+            turns[turn.player] = turns.get(turn.player, 0) + 1
+        best = _format_play(result.best[0]) if result.best else ""
+        lines.append(f"{turn.number:>4}  {turn.player[:11]:<12}{_format_play(made):<25}{best:<25}{column:>12}")
+    lines.append("")
+    totals = [f"{player} {lost[player]:.1f} over {turns[player]} turn{'s' if turns[player] != 1 else ''}" for player in lost]
+    lines.append("Equity lost: " + (" | ".join(totals) if totals else "none measured"))
+    return "\n".join(lines) + "\n"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Analyse every turn of a finished GCG with MAGPIE and write a best play / equity lost report."
+    )
+    parser.add_argument("gcg", help="The finished game")
+    parser.add_argument("--magpie", required=True, help="Path to the MAGPIE directory (as for watch_gcg.py --autosim)")
+    parser.add_argument("--lex", required=True, help="The lexicon file watch_gcg.py uses; MAGPIE gets its name (e.g. NWL23defs.csv -> NWL23)")
+    parser.add_argument("-j", "--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="MAGPIE processes to run at once (default: half the CPUs)")
+    parser.add_argument("-o", "--output", default=None, help="Report file (default: <gcg name>_postmortem.txt)")
+    parser.add_argument("--threads", type=int, default=None, help="MAGPIE threads per worker (default: MAGPIE's own)")
+    parser.add_argument("--cpus", type=parse_cpu_list, default=None, help="CPUs the workers may run on, e.g. '2-7'")
+    parser.add_argument("--nice", type=parse_nice, default=None, help="Lower the workers' priority by this nice level")
+    parser.add_argument("--turn-timeout", type=float, default=TURN_TIMEOUT, help="Seconds before a turn's analysis is stopped")
+    args = parser.parse_args()
+
+    output = args.output or os.path.splitext(args.gcg)[0] + "_postmortem.txt"
+    start = time.perf_counter()
+    limits = EngineLimits(threads=args.threads, cpus=args.cpus, nice=args.nice)
+    game, results = asyncio.run(analyse_game(args.gcg, args.magpie, args.lex, args.workers,
+                                             turn_timeout=args.turn_timeout, limits=limits))
+    report = format_report(args.gcg, game, results, time.perf_counter() - start)
+    with open(output, "w", encoding="utf-8") as f:
+        f.write(report)
+    print(f"Report written to {output}.")
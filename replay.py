@@ -0,0 +1,189 @@
+"""
+Animated replay of a finished game: one frame per move, written as a GIF,
+an MP4 (through ffmpeg) or a folder of numbered images.
+
+The GCG is parsed once and its moves are replayed onto a single frame: each
+placement only pastes its new tiles onto the previous frame (a play that is
+challenged off re-renders the board without it). Frames are handed to a
+pool of threads as they are made: for a GIF each one is mapped onto one
+palette built up front from the board and every tile sprite, which is
+about fifty times faster than quantizing each frame on its own and keeps
+the colours steady between frames.
+
+    python replay.py game.gcg -o replay.gif
+    python replay.py game.gcg -o replay.mp4 --delay 1500
+    python replay.py game.gcg --frames frames/ --format png
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from watch_gcg import (
+    BOARD_SIZE, Board, BoardRenderer, Game, IMAGE_FORMATS, MOVE_TYPE_TILE_PLACEMENT, _benchmark_matrix, _import_pil,
+)
+
+class ReplayFrames:
+    """Yields (label, frame) for the empty board and after every move of a game, drawn with a BoardRenderer."""
+    def __init__(self, renderer):
+        self.renderer = renderer
+
+    def _paste(self, frame, squares, tiles):
+        renderer = self.renderer
+        for (row, col), tile in zip(squares, tiles):
+            tile_img = renderer._tile(tile.upper())
+            if tile_img is not None:
+                frame.paste(tile_img, (renderer.startx + col * renderer.tile_spacing,
+                                       renderer.starty + row * renderer.tile_spacing))
+
+    def frames(self, game):
+        board = Board()
+        frame = self.renderer.render(board.matrix)
+        if frame is None:
+            return
+        yield "start", frame.copy()
+        for number, move in enumerate(game.moves, start=1):
+            if move.move_type == MOVE_TYPE_TILE_PLACEMENT:
+                label = f"{number}. {move.position} {move.display_word}"
+                squares = board.get_placed_squares(move.position, move.word)
+                tiles = [tile for tile in move.word if tile != '.']
+                board.place_tiles(move.position, move.word)
+                self._paste(frame, squares, tiles)
+                yield label, frame.copy()
+                if move.challenged_off:
+                    board.unplace_tiles(move.position, move.word)
+                    frame = self.renderer.render(board.matrix)
+                    yield label + " --", frame.copy()
+            else:
+                yield f"{number}. {'exch ' + move.word if move.word else 'pass'}", frame.copy()
+
+def _palette(renderer):
+    """A 256-colour palette image covering the empty board and every tile sprite."""
+    Image = _import_pil()
+    empty = renderer.render([[''] * BOARD_SIZE for _ in range(BOARD_SIZE)])
+    full = renderer.render(_benchmark_matrix())
+    sample = Image.new("RGB", (empty.width * 2, empty.height))
+    sample.paste(empty, (0, 0))
+    sample.paste(full, (empty.width, 0))
+    return sample.quantize(256)
+
+def write_gif(frames, path, renderer, delay, hold, pool):
+    """Quantize each frame on pool as it arrives, then write the GIF. Returns the frame count."""
+    Image = _import_pil()
+    palette = _palette(renderer)
+    futures = [pool.submit(frame.quantize, palette=palette, dither=Image.Dither.NONE) for frame in frames]
+    images = [future.result() for future in futures]
+    if images:
+        # Every frame already shares the palette, so Pillow's per-frame palette optimization only costs time
+        images[0].save(path, "GIF", save_all=True, append_images=images[1:],
+                       duration=[delay] * (len(images) - 1) + [hold], loop=0, optimize=False)
+    return len(images)
+
+def _find_ffmpeg():
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise RuntimeError("ffmpeg was not found on the PATH; write a .gif or --frames instead")
+    return ffmpeg
+
+def write_mp4(frames, path, delay, hold, ffmpeg=None):
+    ffmpeg = ffmpeg or _find_ffmpeg()
+    proc = None
+    count = 0
+    last = None
+    try:
+        for frame in frames:
+            if proc is None:
+                proc = subprocess.Popen([
+                    ffmpeg, "-y", "-loglevel", "error",
+                    "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{frame.width}x{frame.height}",
+                    "-framerate", f"{1000 / delay:.6f}", "-i", "-",
+                    # yuv420p needs even dimensions
+                    "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-c:v", "libx264", "-pix_fmt", "yuv420p", "-r", "30",
+                    path,
+                ], stdin=subprocess.PIPE)
+            last = frame.tobytes()
+            proc.stdin.write(last)
+            count += 1
+        if proc is not None:
+            for _ in range(max(0, round(hold / delay) - 1)):
+                proc.stdin.write(last)
+            proc.stdin.close()
+            if proc.wait() != 0:
+                raise RuntimeError(f"ffmpeg exited with code {proc.returncode}")
+    finally:
+        if proc is not None and proc.poll() is None:
+            proc.kill()
+    return count
+
+def saving_frames(frames, directory, image_format, pool, futures):
+    """Pass frames through, saving each one to directory on pool (its future goes in futures) as it goes by."""
+    pil_format, extension = IMAGE_FORMATS[image_format.lower()]
+    os.makedirs(directory, exist_ok=True)
+    for i, frame in enumerate(frames):
+        futures.append(pool.submit(frame.save, os.path.join(directory, f"frame{i:03d}.{extension}"), pil_format))
+        yield frame
+
+def export_replay(gcg_filename, output=None, frames_dir=None, image_format="png", delay=1000, hold=3000,
+                  startx=50, starty=50, tile_spacing=50, board_scale=1.0, tile_scale=1.0, workers=None):
+    """
+    Write the replay of gcg_filename to output (.gif or .mp4) and/or a
+    folder of numbered frames. Returns (frame count, labels).
+    """
+    if not output and not frames_dir:
+        raise ValueError("Nothing to write: give an output file or a frames folder")
+    if output and os.path.splitext(output)[1].lower() not in (".gif", ".mp4"):
+        raise ValueError(f"Unsupported replay format: {output} (use .gif or .mp4)")
+    ffmpeg = _find_ffmpeg() if output and output.lower().endswith(".mp4") else None
+    game = Game(gcg_filename)
+    renderer = BoardRenderer(startx, starty, tile_spacing, board_scale, tile_scale)
+    labels = []
+
+    def frames():
+        for label, frame in ReplayFrames(renderer).frames(game):
+            labels.append(label)
+            yield frame
+
+    saved = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        stream = frames()
+        if frames_dir:
+            stream = saving_frames(stream, frames_dir, image_format, pool, saved)
+        if output and output.lower().endswith(".gif"):
+            count = write_gif(stream, output, renderer, delay, hold, pool)
+        elif output:
+            count = write_mp4(stream, output, delay, hold, ffmpeg)
+        else:
+            count = sum(1 for _ in stream)
+        for future in saved:
+            future.result()
+    if not labels:
+        raise RuntimeError("Could not render the board (is img/board.jpg present?)")
+    return count, labels
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export an animated replay of a GCG: one frame per move.")
+    parser.add_argument("gcg", help="The game to replay")
+    parser.add_argument("-o", "--output", default=None, help="Replay file: .gif, or .mp4 (needs ffmpeg)")
+    parser.add_argument("--frames", default=None, help="Also write every frame to this folder as frameNNN.<format>")
+    parser.add_argument("--format", default="png", choices=sorted(IMAGE_FORMATS), help="(frames) image format")
+    parser.add_argument("--delay", type=int, default=1000, help="Milliseconds per move")
+    parser.add_argument("--hold", type=int, default=3000, help="Milliseconds to show the final position")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Encoder threads (default: Python's default pool size)")
+    parser.add_argument("--tilestartx", type=int, default=50, help="Horizontal offset of the first tile, as in watch_gcg.py")
+    parser.add_argument("--tilestarty", type=int, default=50, help="Vertical offset of the first tile, as in watch_gcg.py")
+    parser.add_argument("--tilespacing", type=int, default=50, help="Spacing between tiles, as in watch_gcg.py")
+    parser.add_argument("--boardscale", type=float, default=1.0, help="Scale of the board, as in watch_gcg.py")
+    parser.add_argument("--tilescale", type=float, default=1.0, help="Scale of the tiles, as in watch_gcg.py")
+    args = parser.parse_args()
+
+    if not args.output and not args.frames:
+        args.output = os.path.splitext(args.gcg)[0] + "_replay.gif"
+    start = time.perf_counter()
+    count, _ = export_replay(args.gcg, args.output, args.frames, args.format, args.delay, args.hold,
+                             args.tilestartx, args.tilestarty, args.tilespacing, args.boardscale, args.tilescale,
+                             args.jobs)
+    written = " and ".join(p for p in (args.output, args.frames) if p)
+    print(f"{count} frames written to {written} in {time.perf_counter() - start:.2f}s.")
@@ -1,5 +1,22 @@
+import argparse
+import asyncio
 import os
-from watch_gcg import Game, read_definitions
+import pytest
+import queue
+import threading
+import time
+from math import comb
+from watch_gcg import _board_output_path, build_cli_parser, _write_player_cards, Bag, BoardTable, ControlFile, BoardRenderer, EngineLimits, Game, ImageOutput, ImageVariant, NotifyWatcher, NumpyBoardRenderer, OutputFanout, PollingWatcher, _run_local_analysis, parse_cpu_list, parse_draw_size, parse_image_variant, parse_nice, read_definitions, get_word_definition
+from lexicon_index import LexiconIndex, write_lexicon_index
+import convert_lexica
+from draw_probability import draw_odds
+from word_graph import WordGraph, build_edges, write_word_graph
+from movegen import LocalAnalysis, generate_plays
+from anagram_index import AnagramIndex
+from board_svg import SvgBoardRenderer
+from postmortem import TurnResult, parse_ranked_plays, read_turns
+from replay import export_replay
+from extract_player_data import NameMatcher, RosterIndex, normalize_name, read_pairings
 
 def get_game_from_gcg(gcg, gcg_line):
     with open(gcg, 'r') as file:
@@ -49,5 +66,641 @@ def test_watch_gcg():
     assert_watch_gcg_outputs("test.gcg", word_definitions, 28, 516, 807, 9, 4, "     LAST PLAY: Josh#%^()&& 12A (Y)E(F)G(S)I(CH)I(L)RWz(TG) +170 807 | ")
     assert_watch_gcg_outputs("test.gcg", word_definitions, 31, 516, 833, 4, 2, "     LAST PLAY: Josh#%^()&& 5A (J)EaNED +26 833 | wearing jeans [adj]")
 
+def test_lexicon_index_round_trip(tmp_path):
+    csv_path = tmp_path / "lex.csv"
+    csv_path.write_text("AA$x,'rough lava'\nQI+,'vital force [n QIS]'\nZA#,''\n")
+    index_path = tmp_path / "lex.lexidx"
+    write_lexicon_index(index_path, [("AA", "$x", "rough lava"), ("QI", "+", "vital force [n QIS]"), ("ZA", "#", "")])
+
+    word_definitions, lex_symbols_map = read_definitions(str(index_path))
+    assert (dict(word_definitions), dict(lex_symbols_map)) == read_definitions(str(csv_path))
+    assert "QI" in word_definitions and "QIS" not in word_definitions
+    assert get_word_definition(word_definitions, "ZZZ") == ""
+
+def test_game_update_matches_full_parse(tmp_path):
+    lines = [
+        "#player1 Matt Matt Smith\n",
+        "#player2 Josh Josh Jones\n",
+        ">Matt: AEINRST 8D RETAINS +74 74\n",
+        ">Josh: GOTXYZE G6 GO.T +10 10\n",
+        ">Matt: ABCDEFG -ABC +0 74\n",
+        ">Josh: EEQXYZ 9J ZX +20 30\n",
+        ">Josh: EEQXYZ -- -20 10\n",
+        ">Matt: ADEFGLO (challenge) +5 79\n",
+    ]
+    gcg = tmp_path / "game.gcg"
+    gcg.write_text("")
+    game = Game(str(gcg))
+    for i in range(len(lines)):
+        gcg.write_text("".join(lines[:i + 1]))
+        assert game.update()
+        full = Game(str(gcg))
+        assert game.board.matrix == full.board.matrix
+        assert game.bag.tiles == full.bag.tiles
+        assert game.get_gamestats_string() == full.get_gamestats_string()
+
+    assert game.stats.bingos == [1, 0]
+    assert game.stats.challenged_off == [0, 1]
+    assert game.stats.get_highest_play().score == 74
+    gcg.write_text("".join(lines[1:]))
+    assert not game.update()
+
+def test_draw_odds_full_bag():
+    odds = draw_odds(Bag().tiles, 7)
+    assert abs(odds.blank - (1 - comb(98, 7) / comb(100, 7))) < 1e-12
+    assert abs(odds.s - (1 - comb(96, 7) / comb(100, 7))) < 1e-12
+    assert abs(odds.expected_vowels - 7 * 42 / 100) < 1e-12
+    assert draw_odds({"?": 1, "S": 0}, 7).at_least_one == {"?": 1.0}
+    assert parse_draw_size("0") == 0 and parse_draw_size("7") == 7
+    for bad in ("-1", "8", "two"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_draw_size(bad)
+
+def cli_error(capsys, *argv):
+    """Return the message argparse prints for argv."""
+    with pytest.raises(SystemExit):
+        build_cli_parser().parse_args(list(argv))
+    return capsys.readouterr().err.strip().splitlines()[-1]
+
+def test_cli_explains_rejected_values(capsys):
+    assert cli_error(capsys, "--drawsize", "9").endswith("argument --drawsize: Draw size must be between 0 and 7: 9")
+    assert "--engine-cpus: CPU(s) 4096 not available" in cli_error(capsys, "--engine-cpus", "4096")
+    assert cli_error(capsys, "--engine-nice", "-5").endswith("argument --engine-nice: Nice level must be between 0 and 19: -5")
+
+def test_phony_words(tmp_path):
+    gcg = tmp_path / "game.gcg"
+    lines = [
+        "#player1 Matt Matt\n",
+        "#player2 Josh Josh\n",
+        ">Matt: AEINRST 8D RETAINS +74 74\n",
+        ">Josh: EEQXYZ 9J ZX +20 20\n",
+    ]
+    gcg.write_text("".join(lines))
+    game = Game(str(gcg))
+    word_definitions = {"RETAINS": "", "ZAX": ""}
+    assert game.last_move.formed_words == ["ZX", "SZ"]
+    assert game.get_phony_string(word_definitions) == "INVALID: ZX, SZ"
+
+    gcg.write_text("".join(lines) + ">Josh: EEQXYZ -- -20 0\n")
+    assert game.update()
+    assert game.get_phony_string(word_definitions) == ""
+
+def test_word_graph_queries(tmp_path):
+    words = ["AT", "ATE", "EAT", "ETA", "GOAT", "GOATS", "OAT", "OATS", "TEA", "TEAS"]
+    path = tmp_path / "lex.dawg"
+    write_word_graph(path, build_edges(words))
+    graph = WordGraph.open(path)
+
+    assert list(graph.words()) == words
+    assert "GOAT" in graph and "GOA" not in graph
+    assert graph.hooks("OAT") == ("G", "S")
+    assert graph.anagrams("TAE") == ["ATE", "EAT", "ETA", "TEA"]
+    assert graph.anagrams("T?") == ["AT"]
+    assert graph.match("?OAT*") == ["GOAT", "GOATS"]
+
+def test_local_analysis(tmp_path):
+    gcg = tmp_path / "game.gcg"
+    gcg.write_text("#player1 Matt Matt\n#player2 Josh Josh\n>Matt: AEINRST 8D RETAINS +74 74\n#rack2 GOTXYZE\n")
+    game = Game(str(gcg))
+    assert game.get_rack() == "GOTXYZE"
+    graph = WordGraph.from_words(["GOAT", "RETAINS", "ZA", "ZAX"])
+    analysis = LocalAnalysis(graph)
+    plays, complete = generate_plays(graph, *analysis.snapshot(game.board), game.get_rack(), top_n=2)
+    assert complete
+    assert [(play.position, play.display_word, play.score) for play in plays] == [("G7", "Z(A)X", 37), ("G7", "Z(A)", 21)]
+
+def test_openings_are_listed_once(tmp_path):
+    gcg = tmp_path / "game.gcg"
+    gcg.write_text("#player1 Matt Matt\n#player2 Josh Josh\n")
+    graph = WordGraph.from_words(["GO", "GOAT", "TOGA"])
+    snapshot = LocalAnalysis(graph).snapshot(Game(str(gcg)).board)
+    plays, complete = generate_plays(graph, *snapshot, "AGOTXYZ", top_n=100)
+    assert complete
+    assert all(play.position.startswith("8") for play in plays)  # 8E, never the same play turned as H5
+    assert sorted(play.position for play in plays if play.word == "GOAT") == ["8E", "8F", "8G", "8H"]
+
+def test_cancelled_local_analysis_stops_the_search(tmp_path):
+    graph = WordGraph.from_words(["GOAT", "RETAINS", "ZA", "ZAX"])
+    gcg = tmp_path / "game.gcg"
+    gcg.write_text("#player1 Matt Matt\n#player2 Josh Josh\n>Matt: AEINRST 8D RETAINS +74 74\n")
+    analysis = LocalAnalysis(graph, time_budget=60)
+    snapshot = analysis.snapshot(Game(str(gcg)).board)
+    cancel = threading.Event()
+    cancel.set()
+    assert generate_plays(graph, *snapshot, "ZAXGOTE", time_budget=60, cancel=cancel) == ([], False)
+
+    started = threading.Event()
+    stopped = []
+
+    def slow_analyze(snapshot, rack, cancel):
+        started.set()
+        stopped.append(cancel.wait(5))
+        return "late\n"
+
+    analysis.analyze = slow_analyze
+    written = []
+
+    async def cancel_run():
+        task = asyncio.create_task(_run_local_analysis(analysis, snapshot, "ZAXGOTE", "analysis.txt",
+                                                       lambda path, text: written.append(text)))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_run())
+    assert stopped == [True] and written == []
+
+def test_anagram_index_blanks():
+    words = ["ANESTRI", "NASTIER", "RATINES", "RETAINS", "RETINAS", "RETSINA", "STAINER", "STEARIN", "ANOESTRI", "ZAX"]
+    index = AnagramIndex(words)
+    stearin = ["ANESTRI", "NASTIER", "RATINES", "RETAINS", "RETINAS", "RETSINA", "STAINER", "STEARIN"]
+    assert index.anagrams("RETAINS") == stearin
+    assert index.anagrams("SATIRE?") == stearin
+    assert index.anagrams("?ETAI?S") == stearin
+    assert index.anagrams("ZAX") == []
+
+def test_challenged_off_bingo_is_missed(tmp_path):
+    index = AnagramIndex(["RETAINS", "STAINER"]).build_blank_table()
+    gcg = tmp_path / "game.gcg"
+    gcg.write_text("#player1 Matt Matt\n#player2 Josh Josh\n>Matt: AEINRST 8D STAINER +74 74\n")
+    assert Game(str(gcg)).get_bingos_string(index) == "BINGOS: RETAINS, STAINER"
+    with open(gcg, "a") as f:
+        f.write(">Matt: AEINRST -- -74 0\n")
+    assert Game(str(gcg)).get_bingos_string(index) == "MISSED BINGO: RETAINS, STAINER"
+
+def test_postmortem_turns_and_equity(tmp_path):
+    gcg = tmp_path / "game.gcg"
+    gcg.write_text("#player1 Matt Matt\n#player2 Josh Josh\n>Matt: AEINRST 8D RETAINS +74 74\n"
+                   ">Josh: GOTXYZE G6 GO.T +10 10\n>Matt: ABCDEFG -ABC +0 74\n")
+    _, turns = read_turns(str(gcg))
+    assert [(turn.index, turn.player, turn.endgame) for turn in turns] == [(0, "Matt", False), (1, "Josh", False), (2, "Matt", False)]
+
+    plays = parse_ranked_plays("Idx Move Score Leave Win% Equity\n"
+                               "  1. 8D RETAINS 74 0.0 80.5 60.5\n"
+                               "  2. G6 GO(A)T 10 2.0 40.0 10.0\n"
+                               "  3. exch ABC 0 5.0 30.0 5.0\n")
+    assert plays == [("8D RETAINS", 60.5), ("G6 GO(A)T", 10.0), ("exch ABC", 5.0)]
+    assert TurnResult(turns[1], plays).equity_lost == 50.5
+    assert TurnResult(turns[2], plays).equity_lost == 55.5
+
+def test_engine_limits_shrink_under_load(monkeypatch):
+    monkeypatch.setattr(os, "cpu_count", lambda: 8)
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: set(range(8)), raising=False)
+    assert parse_cpu_list("0-2,6") == {0, 1, 2, 6}
+    # CPUs the engine could not be pinned to, and raising its priority, are refused up front
+    for bad_cpus in ("4096", "6-9", "two"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_cpu_list(bad_cpus)
+    assert parse_nice("10") == 10
+    for bad_nice in ("-5", "20", "low"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_nice(bad_nice)
+    limits = EngineLimits(threads=6, max_load=0.75)
+    assert limits.threads_for_load(0.0) == 6
+    assert limits.threads_for_load(4.0) == 2
+    # What the engine itself kept busy is not held against it
+    assert limits.threads_for_load(4.0, engine_load=2.0) == 4
+    assert limits.threads_for_load(16.0) == 1
+
+    # An engine with 6 threads applied that sat idle leaves the whole load to OBS
+    import watch_gcg
+    limits.applied[1] = 6
+    cpu_seconds, clock = iter([100.0, 100.0, 190.0]), iter([10.0, 40.0, 70.0])
+    monkeypatch.setattr(limits, "_cpu_seconds", lambda pid: next(cpu_seconds))
+    monkeypatch.setattr(watch_gcg.time, "monotonic", lambda: next(clock))
+    assert limits.engine_load() == 0.0  # First sample: nothing to compare with yet
+    assert limits.threads_for_load(4.0) == 2
+    assert limits.threads_for_load(5.0) == 4  # 3 of the 5 were the engine's
+    assert EngineLimits(threads=3).threads_for_load(16.0) == 3
+
+@pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="needs sched_setaffinity")
+def test_engine_limits_apply_to_a_running_process():
+    import subprocess
+    import sys
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(10)"])
+    try:
+        cpu = min(os.sched_getaffinity(0))
+        assert EngineLimits(cpus={cpu}, nice=5).spawn_kwargs() == {}
+        EngineLimits(cpus={cpu}, nice=5).apply_limits(child.pid)
+        assert os.sched_getaffinity(child.pid) == {cpu}
+        assert os.getpriority(os.PRIO_PROCESS, child.pid) == os.getpriority(os.PRIO_PROCESS, 0) + 5
+        with pytest.raises(OSError):
+            EngineLimits(cpus={4096}).apply_limits(child.pid)
+    finally:
+        child.kill()
+        child.wait()
+
+def test_output_fanout_keeps_latest(tmp_path):
+    mirror = tmp_path / "mirror"
+
+    async def write_all():
+        outputs = OutputFanout([str(mirror)])
+        for score in range(50):
+            outputs.write(str(tmp_path / "score.txt"), f"{score:03}")
+        assert len(outputs.destinations[1].pending) <= 1  # Queued writes of a file collapse to the latest
+        assert await outputs.flush(timeout=5)
+        outputs.close()
+
+    asyncio.run(write_all())
+    assert (tmp_path / "score.txt").read_text() == "049"
+    assert (mirror / "score.txt").read_text() == "049"
+
+def test_image_ring_keeps_last_frames(tmp_path):
+    from PIL import Image
+    frame = Image.new("RGB", (4, 4))
+    base = str(tmp_path / "game")
+    image_output = ImageOutput("ring", ring_size=2)
+    for word in ("A", "B", "A", "C"):
+        image_output.save(frame, base, "_" + word)
+
+    expected = {"game.latest.jpg", "game_A.jpg", "game_C.jpg"}
+    deadline = time.monotonic() + 2
+    while set(os.listdir(tmp_path)) != expected and time.monotonic() < deadline:
+        time.sleep(0.01)  # Old frames are removed in the background
+    assert set(os.listdir(tmp_path)) == expected
+
+def test_image_ring_keeps_resaved_frames(tmp_path):
+    from PIL import Image
+    base = str(tmp_path / "game")
+    image_output = ImageOutput("ring", ring_size=1)
+    # Hold the removals until all three frames are saved
+    image_output._removals = queue.SimpleQueue()
+    image_output.save(Image.new("RGB", (4, 4)), base, "_LATEST")
+    image_output.save(Image.new("RGB", (4, 4)), base, "_A")  # Queues _LATEST for removal
+    image_output.save(Image.new("RGB", (4, 4)), base, "_LATEST")  # Back in the ring, queues _A
+    threading.Thread(target=image_output._remover, daemon=True).start()
+    deadline = time.monotonic() + 2
+    while os.path.exists(base + "_A.jpg") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert set(os.listdir(tmp_path)) == {"game.latest.jpg", "game_LATEST.jpg"}
+
+def test_image_variants_from_one_composite(tmp_path):
+    from PIL import Image
+    variants = [parse_image_variant(spec) for spec in ("main:40x20:jpeg:90", "pip:10:png", "full:full")]
+    ImageOutput("latest", variants=variants).save(Image.new("RGB", (80, 40)), str(tmp_path / "game"), "_A")
+
+    sizes = {name: Image.open(tmp_path / name).size for name in os.listdir(tmp_path)}
+    assert sizes == {"game.latest_main.jpg": (40, 20), "game.latest_pip.png": (10, 5), "game.latest_full.jpg": (80, 40)}
+
+def test_image_variants_are_checked_up_front(capsys):
+    for bad in ("pip:0", "pip:0x10", "pip:10x0", "pip:10:gif", "pip:10:jpeg:0", "pip:10:jpeg:101", "pip:10:jpeg:hi"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_image_variant(bad)
+    assert cli_error(capsys, "--imagevariant", "pip:0").endswith("argument --imagevariant: Invalid image size: 0")
+    # jpeg and jpg share an extension, so these two would write the same file
+    with pytest.raises(ValueError):
+        ImageOutput("latest", variants=[parse_image_variant("pip:10:jpeg"), parse_image_variant("pip:20:jpg")])
+    ImageOutput("latest", variants=[ImageVariant("pip"), ImageVariant("pip", image_format="png")])
+
+def test_board_svg_highlights_last_play(tmp_path):
+    gcg = tmp_path / "game.gcg"
+    gcg.write_text("#player1 Matt Matt\n#player2 Josh Josh\n>Matt: AEINRST 8D RETAiNS +72 72\n>Josh: GOTXYZE G6 GO.T +10 10\n")
+    game = Game(str(gcg))
+    assert game.get_last_move_squares() == [(5, 6), (6, 6), (8, 6)]
+
+    svg = game.get_board_svg_string(SvgBoardRenderer())
+    assert svg.startswith("<svg") and svg.endswith("</svg>\n")
+    assert svg.count('class="tile') == 10
+    assert svg.count('class="tile last"') == 3
+    assert svg.count('class="tile blank"') == 1 and '<text class="ch blank"' in svg
+
+def test_numpy_renderer_matches_pillow():
+    import pytest
+    pytest.importorskip("numpy")
+    matrix = [["" for _ in range(15)] for _ in range(15)]
+    for col, tile in enumerate("RETaINS"):
+        matrix[7][3 + col] = tile
+    matrix[14][14] = "Z"
+    # Tiles hanging off the board's edge are clipped the same way
+    for startx, starty in ((50, 50), (-10, 860)):
+        renderer = BoardRenderer(startx, starty, 50, 1.0, 1.0)
+        assert NumpyBoardRenderer(renderer).render(matrix).tobytes() == renderer.render(matrix).tobytes()
+
+def test_replay_gif_one_frame_per_move(tmp_path):
+    from PIL import Image
+    gcg = tmp_path / "game.gcg"
+    gcg.write_text("#player1 Matt Matt\n#player2 Josh Josh\n>Matt: AEINRST 8D RETAiNS +72 72\n"
+                   ">Josh: GOTXYZE G6 GO.T +10 10\n>Josh: GOTXYZE -- -10 0\n>Matt: ABCDEFG - +0 72\n")
+    output = str(tmp_path / "replay.gif")
+    count, labels = export_replay(str(gcg), output, frames_dir=str(tmp_path / "frames"), delay=500, hold=2000)
+    assert labels == ["start", "1. 8D RETAiNS", "2. G6 GO(A)T", "2. G6 GO(A)T --", "3. pass"]
+    assert count == 5 and len(os.listdir(tmp_path / "frames")) == 5
+
+    # The challenged-off play is taken back off the incrementally drawn frame
+    frames = [Image.open(tmp_path / "frames" / name).convert("RGB") for name in sorted(os.listdir(tmp_path / "frames"))]
+    assert frames[1].tobytes() == frames[3].tobytes() == frames[4].tobytes() != frames[2].tobytes()
+    # The GIF folds the pass into the frame before it, keeping both durations
+    gif = Image.open(output)
+    assert gif.n_frames == 4
+    gif.seek(3)
+    assert gif.info["duration"] == 2500
+
+@pytest.mark.skipif(os.name == "nt", reason="the ffmpeg stub is a script")
+def test_replay_mp4_streams_raw_frames_to_ffmpeg(tmp_path, monkeypatch):
+    import sys
+    stub_dir = tmp_path / "bin"
+    stub_dir.mkdir()
+    stub = stub_dir / "ffmpeg"
+    # Records its arguments and how many bytes of raw video it was sent
+    stub.write_text(f"#!{sys.executable}\n"
+                    "import sys\n"
+                    "data = sys.stdin.buffer.read()\n"
+                    "open(sys.argv[-1], 'w').write(str(len(data)) + '\\n' + ' '.join(sys.argv[1:]))\n")
+    stub.chmod(0o755)
+    monkeypatch.setenv("PATH", str(stub_dir) + os.pathsep + os.environ["PATH"])
+    gcg = tmp_path / "game.gcg"
+    gcg.write_text("#player1 Matt Matt\n#player2 Josh Josh\n>Matt: AEINRST 8D RETAINS +74 74\n")
+    output = tmp_path / "replay.mp4"
+    count, _ = export_replay(str(gcg), str(output), delay=500, hold=2000)
+    written, args = output.read_text().splitlines()
+    width, height = map(int, args.split(" -s ")[1].split()[0].split("x"))
+    # Two frames, and the last one repeated to fill the 2000 ms hold at 500 ms per frame
+    assert count == 2 and int(written) == width * height * 3 * (2 + 3)
+    assert "-framerate 2.000000" in args and args.endswith(str(output))
+
+def test_name_matcher():
+    assert normalize_name("Smith, Matthew") == normalize_name("matthew_SMITH") == "matthew smith"
+    assert normalize_name("José Álvarez-Ruiz") == "jose alvarez ruiz"
+    matcher = NameMatcher({"1": "Smith, Matthew", "2": "Josh Jones", "3": "Ann Lee", "4": "Dana Abcd", "5": "Al Lee"})
+    assert matcher.find("Matthew Smith") == "1"  # exact
+    assert matcher.find("Jones Josh") == "2"  # reordered
+    assert matcher.find("Matthew Smth") == "1"  # missing letter
+    assert matcher.find("Josh Jnoes") == "2"  # swapped letters
+    assert matcher.find("Ann Lea") == "3"  # wrong letter
+    assert matcher.find("Al Le") is None  # too short to match fuzzily
+    assert matcher.find("Dana Abde") is None  # shares a deletion with Dana Abcd, but two edits away
+    assert matcher.find("Quentin Smith") is None
+
+def test_roster_writes_a_round_of_pairings(tmp_path):
+    roster_file = tmp_path / "roster.tsv"
+    roster_file.write_text("num\tName\tteam\thometown\n1\tAnn Lee\tRed\tReno\n2\tBo Diaz\tBlue\tOmaha\n"
+                           "3\tCy Park\tRed\tTulsa\n")
+    pairings_file = tmp_path / "round1.txt"
+    pairings_file.write_text("# round 1\n1 2\n\n3 3 1  # board 3\n")
+    pairings = read_pairings(str(pairings_file))
+    assert pairings == [(1, "1", "2"), (3, "3", "1")]
+
+    roster = RosterIndex(str(roster_file), str(tmp_path))
+    changed = roster.write_pairings(pairings)
+    assert (tmp_path / "p1Name.txt").read_text() == "Ann Lee"
+    assert (tmp_path / "board3_p2preview.txt").read_text() == "Red\nReno"
+    assert len(changed) == 2 * 2 * 5  # 2 boards, 2 players, 4 columns + preview
+    assert roster.write_pairings(pairings) == []  # Unchanged files are not rewritten
+
+    with pytest.raises(ValueError):
+        roster.write_pairings([(2, "1", "9")])
+    for bad in ("1 2\n1 3 1\n", "2 1 2\n2 3 1\n", "1 2 3 4\n"):
+        pairings_file.write_text(bad)
+        with pytest.raises(ValueError):
+            read_pairings(str(pairings_file))
+
+def test_player_cards_follow_the_gcg(tmp_path):
+    roster_file = tmp_path / "roster.tsv"
+    roster_file.write_text("num\tName\tteam\thometown\n1\tSmith, Matthew\tRed\tBoston\n2\tJosh Jones\tBlue\tDallas\n")
+    roster = RosterIndex(str(roster_file), str(tmp_path))
+    written = {}
+
+    def cards_for(player1, player2):
+        gcg = tmp_path / "game.gcg"
+        gcg.write_text(f"#player1 {player1}\n#player2 {player2}\n")
+        _write_player_cards(roster, Game(str(gcg)), 2, written)
+        return [(tmp_path / f"board2_p{n}{column}.txt").read_text() for n in (1, 2) for column in ("Name", "team")]
+
+    assert cards_for("Matt Matthew Smith", "Josh Josh Jones") == ["Smith, Matthew", "Red", "Josh Jones", "Blue"]
+    # A player who is not in the roster blanks the card instead of keeping the last game's player
+    assert cards_for("Matt Matthew Smith", "Kim Kim Park") == ["Smith, Matthew", "Red", "Kim Park", ""]
+
+def test_daemon_survives_a_failing_board(tmp_path):
+    import watch_gcg
+    lex = tmp_path / "lex.csv"
+    lex.write_text("GOAT,'a horned mammal [n GOATS]'\nRETAINS,'from RETAIN (to keep possession of) [v]'\n")
+    moves = "#player1 Matt Matt\n#player2 Josh Josh\n>Matt: AEINRST 8D RETAINS +74 74\n"
+    game1, game2 = tmp_path / "game1.gcg", tmp_path / "game2.gcg"
+    game1.write_text(moves)
+    game2.write_text(moves)
+    control = tmp_path / "watch_gcg.control"
+    control.write_text("")
+    events = asyncio.Queue()
+    out = [str(tmp_path / name) for name in ("score.txt", "unseen.txt", "count.txt", "lp.txt")]
+
+    async def next_event(kind):
+        while True:
+            event = await asyncio.wait_for(events.get(), 5)
+            if event["kind"] == kind:
+                return event
+
+    async def run():
+        watcher = asyncio.create_task(watch_gcg.main(str(game1), str(lex), *out, on_event=events.put_nowait,
+                                                     control_file=str(control), watcher="poll"))
+        try:
+            await next_event("ready")
+            with open(control, "a") as f:
+                f.write(f"switch 2 {game2}\n")
+            assert (await next_event("update"))["board"] == 2
+            game2.unlink()
+            game1.write_text(moves + ">Josh: GOTXYZE G6 GO.T +10 10\n")
+            seen = {}
+            while len(seen) < 2:
+                event = await asyncio.wait_for(events.get(), 5)
+                if event["kind"] in ("error", "update"):
+                    seen[event["kind"]] = event
+        finally:
+            watcher.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await watcher
+        return seen["error"], seen["update"]
+
+    error, update = asyncio.run(run())
+    assert error["board"] == 2 and "game2.gcg" in error["message"]
+    assert update["board"] == 1 and "GO(A)T" in update["last_play"]
+
+def test_board_output_paths():
+    assert _board_output_path("score.txt", 1) == "score.txt"
+    assert _board_output_path("score.txt", 3) == os.path.join(".", "board3_score.txt")
+    assert _board_output_path(os.path.join("obs", "lp.txt"), 2) == os.path.join("obs", "board2_lp.txt")
+    assert _board_output_path(None, 2) is None
+
+def test_polling_watcher_backs_off_until_a_change(tmp_path, monkeypatch):
+    import watch_gcg
+    gcg = tmp_path / "game.gcg"
+    gcg.write_text("#player1 Matt Matt\n")
+    watcher = PollingWatcher([str(gcg)])
+    sleeps = []
+
+    async def fake_sleep(interval):
+        sleeps.append(round(interval, 4))
+        if len(sleeps) == 8:
+            with open(gcg, "a") as f:
+                f.write(">Matt: AEINRST 8D RETAINS +74 74\n")  # The size changes even if the mtime does not
+        elif len(sleeps) == 9:
+            watcher.stop()
+
+    monkeypatch.setattr(watch_gcg.asyncio, "sleep", fake_sleep)
+
+    async def collect():
+        return [changed async for changed in watcher.changes()]
+
+    assert asyncio.run(collect()) == [{str(gcg)}]
+    # 50 ms growing by 1.5x to the 500 ms cap while idle, then straight back to 50 ms after the change
+    assert sleeps == [0.05, 0.075, 0.1125, 0.1688, 0.2531, 0.3797, 0.5, 0.5, 0.05]
+
+def test_select_watcher_polls_network_drives(monkeypatch):
+    import watch_gcg
+    fs_types = {"/mnt/share/game.gcg": "nfs4", "/home/me/game.gcg": "ext4", "Z:/game.gcg": "remote"}
+    monkeypatch.setattr(watch_gcg, "_filesystem_type", lambda path: fs_types.get(path))
+    imported = []
+    monkeypatch.setattr(watch_gcg, "_timed_import", lambda name: imported.append(name))
+    assert isinstance(watch_gcg.select_watcher(["/home/me/game.gcg"]), NotifyWatcher)
+    assert isinstance(watch_gcg.select_watcher(["/home/me/game.gcg", "/mnt/share/game.gcg"]), PollingWatcher)
+    assert isinstance(watch_gcg.select_watcher(["Z:/game.gcg"]), PollingWatcher)
+    assert isinstance(watch_gcg.select_watcher(["/mnt/share/game.gcg"], "notify"), NotifyWatcher)
+    with pytest.raises(ValueError):
+        watch_gcg.select_watcher(["/home/me/game.gcg"], "inotify")
+
+    assert imported == ["watchfiles"]
+
+    def no_watchfiles(name):
+        raise ModuleNotFoundError(name)
+
+    def reinstall():
+        raise SystemExit(1)  # What a failed pip run in ensure_requirements() does
+    monkeypatch.setattr(watch_gcg, "_timed_import", no_watchfiles)
+    monkeypatch.setattr(watch_gcg, "_import_awatch", reinstall)
+    assert isinstance(watch_gcg.select_watcher(["/home/me/game.gcg"]), PollingWatcher)
+
+def test_daemon_commands(tmp_path):
+    game1, game2 = tmp_path / "table1.gcg", tmp_path / "table 2.gcg"
+    game1.write_text("")
+    game2.write_text("")
+    table = BoardTable(str(game1))
+    changes = []
+    table.on_change = lambda: changes.append(dict(table.boards))
+
+    assert table.handle_command(f'switch board 2 to "{game2}"\n') == f"ok: board 2 -> {game2}"
+    assert table.handle_command(f"SWITCH 3 {game1}") == f"ok: board 3 -> {game1}"
+    assert table.pending == {2, 3} and len(changes) == 2
+    assert table.handle_command("switch 0 " + str(game1)).startswith("error: invalid board")
+    assert table.handle_command("switch 4 missing.gcg").startswith("error: GCG file not found")
+    assert table.handle_command("remove board 3") == "ok: board 3 removed"
+    assert table.handle_command("remove 1").startswith("error")
+    assert table.handle_command("remove 9") == "error: no board 9"
+    assert table.handle_command("# comment") == table.handle_command("  ") == ""
+    assert table.handle_command("status") == f"ok: board 1 -> {game1}; board 2 -> {game2}"
+    assert table.handle_command("reboot").startswith("error: unknown command")
+    assert table.boards_for({os.path.abspath(game2)}) == [2]
+
+    control_path = tmp_path / "watch_gcg.control"
+    control_path.write_text("switch 2 old.gcg\n")  # Written before the daemon started: not replayed
+    control = ControlFile(str(control_path))
+    with open(control_path, "a") as f:
+        f.write("status\nremove 2\nswi")
+    assert control.read_commands() == ["status", "remove 2"]
+    with open(control_path, "a") as f:
+        f.write("tch 2 x.gcg\n")
+    assert control.read_commands() == ["switch 2 x.gcg"]
+
+def test_missing_pil_clears_stale_stamp(tmp_path, monkeypatch):
+    import watch_gcg
+    monkeypatch.setattr(watch_gcg, "DEPS_STAMP_FILE", tmp_path / "deps_verified.json")
+    watch_gcg._set_deps_stamp("pillow", watch_gcg._deps_key("Pillow"))
+    imports = []
+
+    def fake_import(name):
+        imports.append(name)
+        if len(imports) == 1:
+            raise ModuleNotFoundError(name)  # uninstalled since the stamp was written
+        return "PIL.Image"
+
+    reinstalls = []
+    monkeypatch.setattr(watch_gcg, "_timed_import", fake_import)
+    monkeypatch.setattr(watch_gcg, "ensure_pil", lambda: reinstalls.append(watch_gcg._load_deps_stamp()))
+    assert watch_gcg._import_pil() == "PIL.Image"
+    assert reinstalls == [{}] and imports == ["PIL.Image", "PIL.Image"]
+
+def test_convert_lexica_chunks_and_malformed_rows(tmp_path, monkeypatch):
+    import subprocess
+    import sys
+    source = tmp_path / "lex.txt"
+    source.write_text("zap\ta tool\nQI+\tvital force\n\nnotab\nA,B\tcomma\n\tno word\n"
+                      "AA$x\trough\tlava\nqi+\tlife force\n", encoding="utf-8")
+    # Tiny reads and sort runs so both spill and merge
+    monkeypatch.setattr(convert_lexica, "CHUNK_SIZE", 16)
+    monkeypatch.setattr(convert_lexica, "INDEX_RUN_ROWS", 2)
+    stats = convert_lexica.convert_file(str(source), str(tmp_path / "lex.csv"), str(tmp_path / "lex.lexidx"))
+
+    assert (stats["rows"], stats["blank"], stats["malformed"]) == (4, 1, 3)
+    assert stats["examples"] == [(4, "no tab"), (5, "comma in word"), (6, "no tab")]
+    assert (tmp_path / "lex.csv").read_text(encoding="utf-8").splitlines() == [
+        "zap,'a tool'", "QI+,'vital force'", "AA$x,'rough\tlava'", "qi+,'life force'"]
+    # Later rows win, as when the CSV is loaded
+    assert list(LexiconIndex(str(tmp_path / "lex.lexidx")).rows()) == [
+        ("AA", "$x", "rough\tlava"), ("QI", "+", "life force"), ("ZAP", "", "a tool")]
+
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "convert_lexica.py")
+    out_dir = str(tmp_path / "out")
+    assert subprocess.run([sys.executable, script, str(source), "-o", out_dir], capture_output=True).returncode == 0
+    assert subprocess.run([sys.executable, script, str(source), "-o", out_dir, "--strict"], capture_output=True).returncode == 1
+
+def test_incremental_lexsym_matches_full_rebuild(tmp_path):
+    import subprocess
+    import sys
+    scripts = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lex_sym_csvs")
+    old = {
+        "nwl23": "AA\trough lava\nQI\tvital force\nZA\tpizza\n",
+        "csw24": "AA\trough lava\nOK\tfine\nQI\tvital force\nZA\tpizza\n",
+        "csw21": "AA\trough lava\nQI\tvital force\nZA\tpizza\n",
+        "nwl18": "AA\trough lava\nQI\tvital force\n",
+        "nwl20": "AA\trough lava\nQI\tvital force\nZA\tpizza\n",
+        "wow24": "AA\trough lava\nOK\tfine\nQI\tvital force\nZA\tpizza\n",
+        "wow24_words": "AA\nOK\nQI\nZA\n",
+    }
+    # Added (EW, OK), removed (ZA) and re-defined (QI) words
+    new = dict(old, nwl23="AA\trough lava\nEW\tyuck\nOK\tfine\nQI\tlife force\n",
+               csw24="AA\trough lava\nEW\tyuck\nQI\tlife force\n")
+
+    def write_inputs(directory, texts):
+        directory.mkdir()
+        for name, text in texts.items():
+            (directory / f"{name}.txt").write_text(text, encoding="utf-8")
+        return ["--nwl23-defs", str(directory / "nwl23.txt"), "--csw24-defs", str(directory / "csw24.txt"),
+                "--csw21-defs", str(directory / "csw21.txt"), "--nwl18-defs", str(directory / "nwl18.txt"),
+                "--nwl20-defs", str(directory / "nwl20.txt"), "--wow24-defs", str(directory / "wow24.txt"),
+                "--wow24_words", str(directory / "wow24_words.txt")]
+
+    def run(script, *args):
+        subprocess.run([sys.executable, os.path.join(scripts, script), *args], check=True, capture_output=True)
+
+    old_args, new_args = write_inputs(tmp_path / "old", old), write_inputs(tmp_path / "new", new)
+    for mode in ("direct", "staged"):
+        previous, full, patched = (tmp_path / f"{mode}_{name}" for name in ("previous", "full", "patched"))
+        run("stream_lex_symbs.py", "--mode", mode, *old_args, "--output-dir", str(previous))
+        run("stream_lex_symbs.py", "--mode", mode, *new_args, "--output-dir", str(full))
+        run("incremental_lex_symbs.py", "--mode", mode, *new_args, "--output-dir", str(patched),
+            "--previous-dir", str(previous), "--changed", f"nwl23={tmp_path / 'old' / 'nwl23.txt'}",
+            "--changed", f"csw24={tmp_path / 'old' / 'csw24.txt'}")
+        for name in ("NWL23", "CSW24", "WOW24"):
+            full_csv = (full / f"{name}_lexsym.csv").read_bytes()
+            assert (patched / f"{name}_lexsym.csv").read_bytes() == full_csv
+            assert full_csv != (previous / f"{name}_lexsym.csv").read_bytes()
+
+def test_auto_render_backend_is_remembered(tmp_path, monkeypatch):
+    import watch_gcg
+    pytest.importorskip("numpy")
+    monkeypatch.setattr(watch_gcg, "DEPS_STAMP_FILE", tmp_path / "deps_verified.json")
+    benchmarks = []
+
+    def fake_benchmark(renderers):
+        benchmarks.append(renderers)
+        return [0.02, 0.01]  # NumPy wins
+
+    monkeypatch.setattr(watch_gcg, "benchmark_board_renderers", fake_benchmark)
+    layout = (50, 50, 50, 1.0, 1.0)
+    first = watch_gcg.select_board_renderer("auto", *layout)
+    again = watch_gcg.select_board_renderer("auto", *layout)
+    assert first.backend == again.backend == "numpy" and len(benchmarks) == 1
+    watch_gcg.select_board_renderer("auto", 50, 50, 40, 1.0, 1.0)  # A new layout is benchmarked again
+    assert len(benchmarks) == 2
+
 if __name__ == "__main__":
     test_watch_gcg()
\ No newline at end of file
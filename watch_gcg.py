@@ -6,13 +6,105 @@ def _magpie_debug(*args, **kwargs):
     if AUTOSIM_DEBUG:
         print(*args, **kwargs)
 
+import time
+
+_STARTUP_T0 = time.perf_counter()
+
 import os
 import re
 import sys
+import importlib
 from pathlib import Path
 import argparse
-import asyncio
-import subprocess
+
+#-----------------------------
+# Startup timing and deferred imports
+#-----------------------------
+
+# Set by --startup-times; prints the phase/import breakdown once the watcher is ready
+STARTUP_TIMES = False
+
+_startup_marks = []  # (label, seconds since _STARTUP_T0)
+_import_times = {}   # module name -> seconds spent importing it
+
+def _startup_mark(label):
+    _startup_marks.append((label, time.perf_counter() - _STARTUP_T0))
+
+def _report_startup_times():
+    if not STARTUP_TIMES:
+        return
+    lines = ["Startup times (ms since watch_gcg import):"]
+    lines += [f"  {label:<24}{seconds * 1000:8.1f}" for label, seconds in _startup_marks]
+    if _import_times:
+        lines.append("Deferred imports (ms):")
+        lines += [f"  {name:<24}{seconds * 1000:8.1f}" for name, seconds in _import_times.items()]
+    print("\n".join(lines), file=sys.stderr, flush=True)
+
+def _timed_import(name):
+    """Import a module by name, recording how long the first import took."""
+    if name in sys.modules:
+        return sys.modules[name]
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    _import_times[name] = time.perf_counter() - start
+    return module
+
+class _DeferredModule:
+    """Stand-in for a heavy module that is only imported on first attribute access."""
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = _timed_import(self._name)
+        return getattr(self._module, attr)
+
+# asyncio alone is most of our import time, and the GUI does not need it until Start
+asyncio = _DeferredModule("asyncio")
+subprocess = _DeferredModule("subprocess")
+
+#-----------------------------
+# Dependency check stamp
+#-----------------------------
+
+# Records which interpreter/requirements combinations already passed the
+# dependency checks, so warm starts skip importing watchfiles/Pillow just to probe them.
+DEPS_STAMP_FILE = Path.home() / ".watchgcg-gui" / "deps_verified.json"
+
+def _deps_key(*parts):
+    import hashlib
+    h = hashlib.sha256()
+    for part in (sys.executable or "", sys.version) + parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+def _load_deps_stamp():
+    import json
+    try:
+        with open(DEPS_STAMP_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def _deps_verified(name, key):
+    return _load_deps_stamp().get(name) == key
+
+def _set_deps_stamp(name, key):
+    import json
+    data = _load_deps_stamp()
+    if key is None:
+        data.pop(name, None)
+    else:
+        data[name] = key
+    try:
+        DEPS_STAMP_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(DEPS_STAMP_FILE, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+    except OSError:
+        pass  # the stamp is only an optimisation
 
 #-----------------------------
 # Install watchfiles if missing
@@ -25,9 +117,14 @@ def ensure_requirements():
     if not req.exists():
         return  # nothing to install
 
+    stamp_key = _deps_key(req.read_bytes())
+    if _deps_verified("requirements", stamp_key):
+        return
+
     try:
         # Fast path: assume requirements already installed
-        import watchfiles
+        _timed_import("watchfiles")
+        _set_deps_stamp("requirements", stamp_key)
         return
     except ModuleNotFoundError:
         pass
@@ -51,8 +148,17 @@ def ensure_requirements():
         )
         sys.exit(1)
 
-    import importlib
     importlib.invalidate_caches()
+    _set_deps_stamp("requirements", stamp_key)
+
+def _import_awatch():
+    """Import watchfiles.awatch, reinstalling it if a stale stamp skipped the check."""
+    try:
+        return _timed_import("watchfiles").awatch
+    except ModuleNotFoundError:
+        _set_deps_stamp("requirements", None)
+        ensure_requirements()
+        return _timed_import("watchfiles").awatch
 
 # The Pillow library is not a strict requirement as it is only needed
 # to produce board images.
@@ -68,15 +174,22 @@ def ensure_pil(log_fn=None):
     if _PIL_INSTALLED:
         return True
 
+    # Pillow is imported lazily by the renderer; trust a matching stamp on warm starts
+    stamp_key = _deps_key("Pillow")
+    if _deps_verified("pillow", stamp_key):
+        _PIL_INSTALLED = True
+        return True
+
     def _log(msg):
         if log_fn: log_fn(msg + "\n")
         else: print(msg, file=sys.stderr)
 
     try:
-        from PIL import Image
+        Image = _timed_import("PIL.Image")
         # Test that the compiled extension works
         Image.new('RGB', (1, 1)) 
         _PIL_INSTALLED = True
+        _set_deps_stamp("pillow", stamp_key)
         return True
     except (ImportError, AttributeError):
         # This catches the '_imaging' import error specifically
@@ -90,11 +203,13 @@ def ensure_pil(log_fn=None):
         if getattr(sys, "base_prefix", sys.prefix) == sys.prefix:
             cmd += ["--user"]
         subprocess.check_call(cmd)
-        
+        importlib.invalidate_caches()
+
         # Final verification
         from PIL import Image
         Image.new('RGB', (1, 1))
         _PIL_INSTALLED = True
+        _set_deps_stamp("pillow", stamp_key)
         return True
     except Exception as e:
         raise RuntimeError(
@@ -103,18 +218,25 @@ def ensure_pil(log_fn=None):
             f"Try running: {py} -m pip install --force-reinstall Pillow"
         )
 
+def _import_pil():
+    """Import PIL.Image, reinstalling Pillow if a stale stamp skipped the check."""
+    global _PIL_INSTALLED
+    try:
+        return _timed_import("PIL.Image")
+    except ModuleNotFoundError:
+        _set_deps_stamp("pillow", None)
+        _PIL_INSTALLED = False
+        ensure_pil()
+        return _timed_import("PIL.Image")
+
 #----------------------------
 # Main logic
 #----------------------------
 
 vowels = "aeiouAEIOU"
 
-LEX_SUFFIX_RE = re.compile(r'[+#x$]+$')
-
-def _clean_csv_key(s: str) -> str:
-    return LEX_SUFFIX_RE.sub('', s.strip()).upper()
-
 BOARD_SIZE = 15
+RACK_SIZE = 7
 
 MOVE_TYPE_UNSPECIFIED = 0
 MOVE_TYPE_TILE_PLACEMENT = 1
@@ -128,6 +250,7 @@ POWER_TILES_SET = set('SJQXZ?')
 class Players:
     def __init__(self):
         self.names = ["", ""]
+        self.full_names = ["", ""]  # The rest of the #player line, if any
         self.scores = [0, 0]
         self.names_to_indexes = {}
 
@@ -150,6 +273,12 @@ class Players:
     def set_name(self, index, name):
         self.names[index] = name
         self.names_to_indexes[name] = index
+
+    def get_full_name(self, index):
+        return self.full_names[index]
+
+    def set_full_name(self, index, full_name):
+        self.full_names[index] = full_name
     
     def get_score(self, name_or_index):
         return self.scores[self.get_index(name_or_index)]
@@ -174,6 +303,7 @@ def get_unique_image(char_to_load):
 class Board:
     def __init__(self):
         self.matrix = [['' for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
+        self.changes = []  # (row, col) of every square set or cleared, in order
 
     def get_row_and_col_from_position(self, position):
         if position[0].isdigit():
@@ -196,8 +326,10 @@ class Board:
                 continue
             if position[0].isdigit():
                 self.matrix[row][col + i] = tile
+                self.changes.append((row, col + i))
             else:
                 self.matrix[row + i][col] = tile
+                self.changes.append((row + i, col))
 
     def unplace_tiles(self, position, word):
         row, col = self.get_row_and_col_from_position(position)
@@ -207,12 +339,15 @@ class Board:
                 continue
             if position[0].isdigit():
                 self.matrix[row][col + i] = ''
+                self.changes.append((row, col + i))
             else:
                 self.matrix[row + i][col] = ''
+                self.changes.append((row + i, col))
 
     def get_filled_in_word(self, position, word):
-        filled_in_word = ''
+        parts = []
         row, col = self.get_row_and_col_from_position(position)
+        d_row, d_col = (0, 1) if position[0].isdigit() else (1, 0)
 
         word_length = len(word)
         # Check for play through tiles
@@ -221,71 +356,450 @@ class Board:
             if tile == '.':
                 print_tile = self.matrix[row][col]
                 if i == 0:
-                    filled_in_word += '('
-            
-            filled_in_word += print_tile
+                    parts.append('(')
+
+            parts.append(print_tile)
 
             if tile == '.' and (i == word_length - 1 or  word[i + 1] != '.'):
-                filled_in_word += ')'
+                parts.append(')')
 
             if tile != '.' and i + 1 < word_length and word[i + 1] == '.':
-                filled_in_word += '('
+                parts.append('(')
+
+            row += d_row
+            col += d_col
+
+        return ''.join(parts)
+
+    def _read_word(self, row, col, d_row, d_col):
+        # Back up to the first tile of the run through (row, col), then read it
+        while 0 <= row - d_row and 0 <= col - d_col and self.matrix[row - d_row][col - d_col]:
+            row -= d_row
+            col -= d_col
+        letters = []
+        while row < BOARD_SIZE and col < BOARD_SIZE and self.matrix[row][col]:
+            letters.append(self.matrix[row][col].upper())
+            row += d_row
+            col += d_col
+        return ''.join(letters)
+
+    def get_placed_squares(self, position, word):
+        """Return the (row, col) of every tile a placement puts down (play-through tiles excluded)."""
+        row, col = self.get_row_and_col_from_position(position)
+        d_row, d_col = (0, 1) if position[0].isdigit() else (1, 0)
+        return [(row + i * d_row, col + i * d_col) for i, tile in enumerate(word) if tile != '.']
+
+    def get_formed_words(self, position, word):
+        """
+        Return the words a placement (already on the board) forms: the main
+        word first, then a cross-word for each newly placed tile that touches
+        tiles on either side. Single letters are left out.
+        """
+        row, col = self.get_row_and_col_from_position(position)
+        d_row, d_col = (0, 1) if position[0].isdigit() else (1, 0)
+        words = [self._read_word(row, col, d_row, d_col)]
+        for i, tile in enumerate(word):
+            if tile != '.':
+                words.append(self._read_word(row + i * d_row, col + i * d_col, d_col, d_row))
+        return [w for w in words if len(w) > 1]
 
-            if position[0].isdigit():
-                col += 1
-            else:
-                row += 1
+    def save_image(self, gcg_filename, last_play, startx, starty, tile_spacing, board_scale, tile_scale, renderer=None,
+                   image_output=None):
+        if renderer is None:
+            renderer = BoardRenderer(startx, starty, tile_spacing, board_scale, tile_scale)
 
-        return filled_in_word
+        board_img = renderer.render(self.matrix)
+        if board_img is None:
+            return
 
-    def save_image(self, gcg_filename, last_play, startx, starty, tile_spacing, board_scale, tile_scale):
-        from PIL import Image
+        # Construct filename: "some_name.gcg" -> "some_name_<LAST_PLAY>.jpg"
+        base_name = os.path.splitext(gcg_filename)[0]
+        (image_output or ImageOutput()).save(board_img, base_name, last_play)
 
-        try:
-            # 1. Open the base board image
-            board_img = Image.open("img/board.jpg").convert("RGB")
+IMAGE_MODES = ("history", "latest", "ring")
+
+# Format name -> (Pillow format, file extension)
+IMAGE_FORMATS = {
+    "jpeg": ("JPEG", "jpg"),
+    "jpg": ("JPEG", "jpg"),
+    "png": ("PNG", "png"),
+    "webp": ("WEBP", "webp"),
+}
+
+class ImageVariant:
+    """
+    One encoded copy of the board composite. size is None for the
+    composite's own size, (width, None) to keep its aspect ratio, or
+    (width, height); name is appended to the file names ('' for none).
+    """
+    def __init__(self, name="", size=None, image_format="jpeg", quality=None):
+        if image_format.lower() not in IMAGE_FORMATS:
+            raise ValueError(f"Unknown image format: {image_format}")
+        self.name = name
+        self.size = size
+        self.format, self.extension = IMAGE_FORMATS[image_format.lower()]
+        self.quality = quality
+
+    def path(self, stem):
+        return f"{stem}_{self.name}.{self.extension}" if self.name else f"{stem}.{self.extension}"
+
+    def resize(self, image):
+        if self.size is None:
+            return image
+        width, height = self.size
+        if height is None:
+            height = max(1, round(image.height * width / image.width))
+        if (width, height) == image.size:
+            return image
+        Image = _import_pil()
+        return image.resize((width, height), Image.Resampling.LANCZOS)
+
+    def save(self, image, path):
+        options = {}
+        if self.quality is not None and self.format != "PNG":
+            options["quality"] = self.quality
+        image.save(path, self.format, **options)
+
+def parse_image_variant(spec):
+    """
+    Parse an image variant 'NAME:SIZE[:FORMAT[:QUALITY]]', e.g. 'pip:480:webp:80'
+    or 'main:1920x1080:jpeg:90'. SIZE is WIDTHxHEIGHT, a width, or 'full';
+    QUALITY is 1-100.
+    """
+    parts = spec.split(":")
+    if not 2 <= len(parts) <= 4 or not re.fullmatch(r"\w*", parts[0]):
+        raise argparse.ArgumentTypeError(f"Invalid image variant: {spec}")
+    name, size_text = parts[0], parts[1].lower()
+    match = re.fullmatch(r"(\d+)(?:x(\d+))?", size_text)
+    if size_text == "full":
+        size = None
+    elif match and int(match.group(1)) >= 1 and int(match.group(2) or 1) >= 1:
+        size = (int(match.group(1)), int(match.group(2)) if match.group(2) else None)
+    else:
+        raise argparse.ArgumentTypeError(f"Invalid image size: {parts[1]}")
+    image_format = parts[2] if len(parts) > 2 and parts[2] else "jpeg"
+    if image_format.lower() not in IMAGE_FORMATS:
+        raise argparse.ArgumentTypeError(f"Unknown image format: {image_format}")
+    quality = None
+    if len(parts) > 3:
+        if not parts[3].isdigit() or not 1 <= int(parts[3]) <= 100:
+            raise argparse.ArgumentTypeError(f"Image quality must be between 1 and 100: {parts[3]}")
+        quality = int(parts[3])
+    return ImageVariant(name, size, image_format, quality)
+
+def duplicate_variant_files(variants):
+    """Return the file names that more than one of variants would write."""
+    paths = [variant.path("<gcg name>") for variant in variants]
+    return sorted({path for path in paths if paths.count(path) > 1})
+
+class ImageOutput:
+    """
+    Where board images go, per mode:
+
+    history   <base><_LAST_PLAY>.jpg for every update, kept forever (the original behaviour)
+    latest    only <base>.latest.jpg, replaced atomically so OBS never reads a partial frame
+    ring      <base>.latest.jpg plus the last ring_size <base><_LAST_PLAY>.jpg frames
+
+    The latest name uses a dot so it can never be a play's frame: on a
+    case-insensitive filesystem <base>_LATEST.jpg (the word LATEST) would
+    otherwise be the same file as <base>_latest.jpg.
+
+    Each frame is written once per variant (see ImageVariant): every size
+    is resized once from the one composite, and with several sizes they
+    are resized and encoded in parallel.
+
+    Ring frames are tracked in memory, so the folder is never scanned, and
+    frames that drop out of the ring are deleted on a background thread,
+    unless the same play was saved again before the removal ran.
+    """
+    def __init__(self, mode="history", ring_size=10, variants=None):
+        if mode not in IMAGE_MODES:
+            raise ValueError(f"Unknown image mode: {mode}")
+        self.mode = mode
+        self.ring_size = max(1, ring_size)
+        self.variants = list(variants) if variants else [ImageVariant()]
+        duplicates = duplicate_variant_files(self.variants)
+        if duplicates:
+            raise ValueError(f"Image variants would overwrite each other: {', '.join(duplicates)}")
+        import threading
+        self._frames = {}  # base name -> frame stems, oldest first
+        self._frames_lock = threading.Lock()
+        self._removals = None
+        self._executor = None
+
+    def save(self, image, base_name, last_play):
+        stem = f"{base_name}{last_play}"
+        evicted = []
+        if self.mode == "ring":
+            # Listed before it is written, so a removal still queued for this stem skips it
+            with self._frames_lock:
+                frames = self._frames.setdefault(base_name, [])
+                if stem in frames:
+                    frames.remove(stem)  # Same play again: it is about to be overwritten
+                frames.append(stem)
+                if len(frames) > self.ring_size:
+                    evicted = frames[:-self.ring_size]
+                    del frames[:-self.ring_size]
+
+        by_size = {}
+        for variant in self.variants:
+            by_size.setdefault(variant.size, []).append(variant)
+        jobs = [(image, variants, stem, base_name) for variants in by_size.values()]
+        if len(jobs) == 1:
+            self._save_size(*jobs[0])
+        else:
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+                self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="watchgcg-image")
+            for future in [self._executor.submit(self._save_size, *job) for job in jobs]:
+                future.result()
+
+        if evicted:
+            self._remove(base_name, evicted)
+
+    def _save_size(self, image, variants, stem, base_name):
+        # Pillow releases the GIL while resizing and encoding, so sizes run in parallel
+        resized = variants[0].resize(image)
+        for variant in variants:
+            if self.mode != "latest":
+                variant.save(resized, variant.path(stem))
+            if self.mode != "history":
+                self._replace(resized, variant, variant.path(f"{base_name}.latest"))
+
+    @staticmethod
+    def _replace(image, variant, path):
+        tmp_path = path + ".tmp"
+        variant.save(image, tmp_path)
+        for attempt in range(3):
+            try:
+                os.replace(tmp_path, path)
+                return
+            except PermissionError:
+                # Windows refuses while a reader has the file open; it is only briefly
+                if attempt == 2:
+                    raise
+                time.sleep(0.02)
+
+    def _remove(self, base_name, stems):
+        if self._removals is None:
+            import queue
+            import threading
+            self._removals = queue.SimpleQueue()
+            threading.Thread(target=self._remover, name="watchgcg-image-ring", daemon=True).start()
+        for stem in stems:
+            self._removals.put((base_name, stem))
+
+    def _remover(self):
+        while True:
+            base_name, stem = self._removals.get()
+            with self._frames_lock:
+                if stem in self._frames.get(base_name, ()):
+                    continue  # Saved again since it was queued
+                for variant in self.variants:
+                    try:
+                        os.remove(variant.path(stem))
+                    except OSError:
+                        pass
+
+class BoardRenderer:
+    """
+    Composites board images from img/.
+
+    The resized board and tile sprites are decoded once and reused for every
+    frame, so a long-running watcher only pays for pasting and encoding.
+    """
+    backend = "pillow"
+
+    def __init__(self, startx, starty, tile_spacing, board_scale, tile_scale):
+        self.startx = startx
+        self.starty = starty
+        self.tile_spacing = tile_spacing
+        self.board_scale = board_scale
+        self.tile_scale = tile_scale
+        self._board_img = None
+        self._tiles = {}
+
+    def _board(self):
+        if self._board_img is None:
+            Image = _import_pil()
+            try:
+                board_img = Image.open("img/board.jpg").convert("RGB")
+            except FileNotFoundError:
+                print("Error: 'board.jpg' not found in the current directory.")
+                return None
             board_orig_w, board_orig_h = board_img.size
-            board_new_size = (int(board_orig_w * board_scale), int(board_orig_h * board_scale))
-            resized_board_img = board_img.resize(board_new_size, Image.Resampling.LANCZOS)
-        except FileNotFoundError:
-            print("Error: 'board.jpg' not found in the current directory.")
-            return
+            board_new_size = (int(board_orig_w * self.board_scale), int(board_orig_h * self.board_scale))
+            self._board_img = board_img.resize(board_new_size, Image.Resampling.LANCZOS)
+        return self._board_img
+
+    def _tile(self, char_to_load):
+        if char_to_load not in self._tiles:
+            Image = _import_pil()
+            tile_filename = get_unique_image(char_to_load)
+            try:
+                tile_img = Image.open(tile_filename).convert("RGB")
+                orig_w, orig_h = tile_img.size
+                new_size = (int(orig_w * self.tile_scale), int(orig_h * self.tile_scale))
+                self._tiles[char_to_load] = tile_img.resize(new_size, Image.Resampling.LANCZOS)
+            except FileNotFoundError:
+                print(f"Warning: Could not find tile image {tile_filename}")
+                self._tiles[char_to_load] = None
+        return self._tiles[char_to_load]
+
+    def render(self, matrix):
+        """Return a new board image with every tile in matrix pasted on, or None."""
+        board_img = self._board()
+        if board_img is None:
+            return None
+        frame = board_img.copy()
 
-        # 2. Iterate through the 15x15 board matrix
         for row in range(BOARD_SIZE):
             for col in range(BOARD_SIZE):
-                tile_char = self.matrix[row][col]
-                
-                if tile_char:
-                    # GCG blank tiles are lowercase; use uppercase for filenames
-                    char_to_load = tile_char.upper()
-                    tile_filename = get_unique_image(char_to_load)
+                tile_char = matrix[row][col]
+                if not tile_char:
+                    continue
+                # GCG blank tiles are lowercase; use uppercase for filenames
+                tile_img = self._tile(tile_char.upper())
+                if tile_img is None:
+                    continue
+                x_pos = self.startx + (col * self.tile_spacing)
+                y_pos = self.starty + (row * self.tile_spacing)
+                frame.paste(tile_img, (x_pos, y_pos))
+        return frame
+
+class NumpyBoardRenderer:
+    """
+    Builds the same frames as a BoardRenderer (whose decoded sprites it
+    shares) with NumPy: the board and tiles are kept as arrays, and each
+    tile is one slice assignment into a copy of the board, with a single
+    conversion back to an image at the end.
+    """
+    backend = "numpy"
+
+    def __init__(self, sprites):
+        self.sprites = sprites
+        self._np = _timed_import("numpy")
+        self._board_array = None
+        self._tile_arrays = {}
+
+    def _tile_array(self, char_to_load):
+        if char_to_load not in self._tile_arrays:
+            tile_img = self.sprites._tile(char_to_load)
+            self._tile_arrays[char_to_load] = None if tile_img is None else self._np.asarray(tile_img)
+        return self._tile_arrays[char_to_load]
+
+    def render(self, matrix):
+        if self._board_array is None:
+            board_img = self.sprites._board()
+            if board_img is None:
+                return None
+            self._board_array = self._np.asarray(board_img)
+        frame = self._board_array.copy()
+        height, width = frame.shape[:2]
+        sprites = self.sprites
 
-                    try:
-                        tile_img = Image.open(tile_filename).convert("RGB")
-                        
-                        # Calculate new dimensions: 1/15th of original height and width
-                        orig_w, orig_h = tile_img.size
-                        new_size = (int(orig_w * tile_scale), int(orig_h * tile_scale))
-                        
-                        # Resize the tile in memory using high-quality resampling
-                        resized_tile = tile_img.resize(new_size, Image.Resampling.LANCZOS)
-                        
-                        # Calculate pixel position based on matrix indices
-                        x_pos = startx + (col * tile_spacing)
-                        y_pos = starty + (row * tile_spacing)
-                        
-                        # Overlay the resized letter tile onto the board image
-                        resized_board_img.paste(resized_tile, (x_pos, y_pos))
-                    except FileNotFoundError:
-                        print(f"Warning: Could not find tile image {tile_filename}")
-
-        # 3. Construct filename: "some_name.gcg" -> "some_name_<LAST_PLAY>.jpg"
-        base_name = os.path.splitext(gcg_filename)[0]
-        output_filename = f"{base_name}{last_play}.jpg"
+        for row in range(BOARD_SIZE):
+            for col in range(BOARD_SIZE):
+                tile_char = matrix[row][col]
+                if not tile_char:
+                    continue
+                tile = self._tile_array(tile_char.upper())
+                if tile is None:
+                    continue
+                x_pos = sprites.startx + (col * sprites.tile_spacing)
+                y_pos = sprites.starty + (row * sprites.tile_spacing)
+                # Clip like Image.paste does at the board's edges
+                x0, y0 = max(x_pos, 0), max(y_pos, 0)
+                x1, y1 = min(x_pos + tile.shape[1], width), min(y_pos + tile.shape[0], height)
+                if x0 < x1 and y0 < y1:
+                    frame[y0:y1, x0:x1] = tile[y0 - y_pos:y1 - y_pos, x0 - x_pos:x1 - x_pos]
+        return _import_pil().fromarray(frame)
+
+RENDER_BACKENDS = ("auto", "pillow", "numpy")
+
+def _benchmark_matrix():
+    # A full board, so the comparison covers the most pastes a frame can need
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    return [[letters[(row * BOARD_SIZE + col) % len(letters)] for col in range(BOARD_SIZE)] for row in range(BOARD_SIZE)]
+
+def benchmark_board_renderers(renderers, matrix=None, repeats=5):
+    """Return the best of repeats render times in seconds for each renderer (None if it cannot render)."""
+    matrix = matrix or _benchmark_matrix()
+    times = []
+    for renderer in renderers:
+        if renderer.render(matrix) is None:  # Also decodes the sprites, outside the timing
+            times.append(None)
+            continue
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            renderer.render(matrix)
+            best = min(best, time.perf_counter() - start)
+        times.append(best)
+    return times
+
+def _installed_package(name):
+    """Where and when a package was installed, as a stand-in for its version that doesn't import it (None if missing)."""
+    import importlib.util
+    spec = importlib.util.find_spec(name)
+    if spec is None or not spec.origin:
+        return None
+    st = os.stat(spec.origin)
+    return f"{spec.origin}:{st.st_mtime_ns}:{st.st_size}"
+
+def _render_backend_key(startx, starty, tile_spacing, board_scale, tile_scale):
+    """Deps stamp key for the 'auto' render backend choice, or None when NumPy is not installed."""
+    numpy_package = _installed_package("numpy")
+    if numpy_package is None:
+        return None
+    try:
+        st = os.stat("img/board.jpg")
+        board = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        board = None
+    return _deps_key("render", _installed_package("PIL"), numpy_package, board,
+                     startx, starty, tile_spacing, board_scale, tile_scale)
+
+def select_board_renderer(backend, startx, starty, tile_spacing, board_scale, tile_scale, on_event=None):
+    """
+    Return the board renderer for backend: 'pillow' (BoardRenderer),
+    'numpy' (NumpyBoardRenderer, falling back to Pillow without NumPy) or
+    'auto', which benchmarks both and keeps the faster.
 
-        # 4. Save the finalized board image
-        resized_board_img.save(output_filename, "JPEG")
+    The 'auto' choice is kept in the deps stamp, keyed to the installed
+    Pillow and NumPy, the board image and the layout, so warm starts skip
+    the benchmark (and importing NumPy at all when Pillow won).
+    """
+    renderer = BoardRenderer(startx, starty, tile_spacing, board_scale, tile_scale)
+    if backend == "pillow":
+        return renderer
+    stamp_key = None
+    if backend == "auto":
+        stamp_key = _render_backend_key(startx, starty, tile_spacing, board_scale, tile_scale)
+        if stamp_key is None:
+            return renderer  # No NumPy to compare against
+        stamp = _load_deps_stamp().get("render_backend")
+        if isinstance(stamp, dict) and stamp.get("key") == stamp_key:
+            if stamp.get("backend") == renderer.backend:
+                return renderer
+            backend = "numpy"
+    try:
+        numpy_renderer = NumpyBoardRenderer(renderer)
+    except ImportError:
+        if backend == "numpy":
+            _emit(on_event, "warning", "NumPy is not installed; rendering board images with Pillow.")
+        return renderer
+    if backend == "numpy":
+        return numpy_renderer
+
+    pillow_time, numpy_time = benchmark_board_renderers([renderer, numpy_renderer])
+    if pillow_time is None or numpy_time is None:
+        return renderer
+    chosen = numpy_renderer if numpy_time < pillow_time else renderer
+    _set_deps_stamp("render_backend", {"key": stamp_key, "backend": chosen.backend})
+    _emit(on_event, "status", f"Board images: Pillow {pillow_time * 1000:.1f} ms, NumPy {numpy_time * 1000:.1f} ms "
+          f"per frame; using {chosen.backend}.", pillow=pillow_time, numpy=numpy_time)
+    return chosen
 
 class Bag:
     def __init__(self):
@@ -333,8 +847,109 @@ class Bag:
                     unseen_vowel_count += 1
         return unseen_tile_count, unseen_vowel_count
 
+class Move:
+    """
+    One parsed GCG move line (a tile placement, exchange or pass).
+
+    For placements the display word (play-through tiles in parentheses) and
+    the lexicon key are worked out once when the move is read, and the
+    definition on first use, so every formatter shares them.
+    """
+    def __init__(self, move_type, player_index, rack="", position="", word="", score="0", display_word=""):
+        self.move_type = move_type
+        self.player_index = player_index
+        self.rack = rack
+        self.position = position
+        self.word = word
+        self.score = int(score)
+        self.tiles = sum(1 for tile in word if tile != '.') if move_type == MOVE_TYPE_TILE_PLACEMENT else 0
+        self.challenged_off = False
+        self.display_word = display_word
+        self.key = re.sub(r'[^A-Za-z]', '', display_word.upper())
+        self.formed_words = []  # Main word and cross-words, set once the tiles are on the board
+        self._definitions = None
+        self._definition = ""
+        self._anagram_index = None
+        self._bingos = []
+
+    def get_definition(self, word_definitions):
+        if self._definitions is not word_definitions:
+            self._definitions = word_definitions
+            self._definition = get_word_definition(word_definitions, self.key)
+        return self._definition
+
+    def get_bingos(self, anagram_index):
+        """Return the bingos on this move's rack (see anagram_index.AnagramIndex)."""
+        if self._anagram_index is not anagram_index:
+            self._anagram_index = anagram_index
+            self._bingos = anagram_index.anagrams(self.rack)
+        return self._bingos
+
+class GameStats:
+    """
+    Running per-player statistics, updated in O(1) per move event by
+    Game.parse_gcg. A play that is challenged off is undone from a stack of
+    plays, and each player's highest play is a stack of running maxima, so
+    nothing ever rescans the game history.
+    """
+    def __init__(self):
+        self.turns = [0, 0]
+        self.bingos = [0, 0]
+        self.exchanges = [0, 0]
+        self.passes = [0, 0]
+        self.challenged_off = [0, 0]  # Plays lost to a challenge
+        self.challenge_bonuses = [0, 0]  # Plays that survived a challenge for a bonus
+        self._plays = []
+        self._best = ([], [])
+
+    def apply(self, move):
+        p = move.player_index
+        self.turns[p] += 1
+        if move.move_type == MOVE_TYPE_TILE_PLACEMENT:
+            if move.tiles == RACK_SIZE:
+                self.bingos[p] += 1
+            best = self._best[p]
+            best.append(move if not best or move.score > best[-1].score else best[-1])
+            self._plays.append(move)
+        elif move.move_type == MOVE_TYPE_EXCHANGE:
+            self.exchanges[p] += 1
+        elif move.move_type == MOVE_TYPE_PASS:
+            self.passes[p] += 1
+
+    def undo_play(self):
+        """Take back the last play after a lost challenge; the turn itself still counts."""
+        if not self._plays:
+            return None
+        move = self._plays.pop()
+        move.challenged_off = True
+        p = move.player_index
+        if move.tiles == RACK_SIZE:
+            self.bingos[p] -= 1
+        self._best[p].pop()
+        self.challenged_off[p] += 1
+        return move
+
+    def challenge_bonus(self, player_index):
+        self.challenge_bonuses[player_index] += 1
+
+    def get_highest_play(self, player_index=None):
+        """Return the highest scoring play (a Move) for a player, or overall, or None."""
+        best = [b[-1] for i, b in enumerate(self._best) if b and player_index in (None, i)]
+        return max(best, key=lambda move: move.score) if best else None
+
+    def get_average(self, player_index, score):
+        turns = self.turns[player_index]
+        return score / turns if turns else 0.0
+
 class Game:
     def __init__(self, gcg):
+        self.gcg = gcg
+        self._parsed_text = ""
+        self.moves = []
+        self.last_move = None
+        self.stats = GameStats()
+        self.rack = ""  # Tiles of the last #rack line
+        self._rack_moves = 0  # len(self.moves) when it was read
         self.players = Players()
         self.board = Board()
         self.bag = Bag()
@@ -347,13 +962,13 @@ class Game:
         self.power_tiles_played = [0, 0]  # Power tiles per player: S, J, Q, X, Z, ?
         self.parse_gcg(gcg)
 
-    def place_tiles(self, position, word):
+    def place_tiles(self, position, word, display_word=None):
         self.board.place_tiles(position, word)
         self.bag.remove_tiles(word)
         
         # Track blanks and stats for tile placements
         player_index = self.players.get_index(self.previous_player)
-        self._track_blanks_and_stats(position, word, player_index)
+        self._track_blanks_and_stats(position, word, player_index, display_word)
 
     def unplace_tiles(self, position, word):
         player_index = self.players.get_index(self.previous_player)
@@ -381,7 +996,7 @@ class Game:
     def remove_tiles(self, word):
         self.bag.remove_tiles(word)
 
-    def _track_blanks_and_stats(self, position, word, player_index):
+    def _track_blanks_and_stats(self, position, word, player_index, display_word=None):
         """Track blanks and power tiles played."""
         row, col = self.board.get_row_and_col_from_position(position)
         is_horizontal = position[0].isdigit()
@@ -414,31 +1029,69 @@ class Game:
                 else:
                     gcg_position = f"{col_letter}{row_number}"
                 
-                word_with_parens = self.board.get_filled_in_word(self.previous_position, self.previous_word)
-                
-                self.blanks.append({"position": gcg_position, "tile": tile.upper(), "word": word_with_parens})
+                if display_word is None:
+                    display_word = self.board.get_filled_in_word(position, word)
+
+                self.blanks.append({"position": gcg_position, "tile": tile.upper(), "word": display_word})
                 # Blanks count as power tiles
                 self.power_tiles_played[player_index] += 1
             # Track power tiles
             elif tile.upper() in POWER_TILES_SET:
                 self.power_tiles_played[player_index] += 1
 
+    def get_rack(self):
+        """Return the on-turn rack from the last #rack line, or "" if a move was made after it."""
+        if self.rack and self._rack_moves == len(self.moves):
+            return self.rack
+        return ""
+
+    def update(self):
+        """
+        Re-read the GCG file and apply only the lines added since the last
+        parse. Returns False, leaving the game untouched, if earlier content
+        changed or the last parsed line was incomplete; build a new Game then.
+        """
+        with open(self.gcg, 'r') as f:
+            text = f.read()
+        parsed = self._parsed_text
+        if not text.startswith(parsed) or (parsed and not parsed.endswith("\n")):
+            return False
+        self._parsed_text = text
+        self._parse_lines(text[len(parsed):].splitlines(True))
+        return True
+
+    def _record_move(self, move_type, line, position="", word=""):
+        player_index = self.players.names_to_indexes.get(self.previous_player)
+        match = re.search(r"^>[^:]+:\s+([\w\?]+)", line)
+        display_word = self.board.get_filled_in_word(position, word) if move_type == MOVE_TYPE_TILE_PLACEMENT else ""
+        move = Move(move_type, player_index, match.group(1) if match else "", position, word, self.previous_score, display_word)
+        self.moves.append(move)
+        self.last_move = move
+        if player_index is not None:
+            self.stats.apply(move)
+        return move
+
     def parse_gcg(self, gcg):
         with open(gcg, 'r') as f:
-            lines = f.readlines()
+            text = f.read()
+        self._parsed_text = text
+        self._parse_lines(text.splitlines(True))
 
+    def _parse_lines(self, lines):
         for line in lines:
             # print("\n\nline: ", line.strip())
             # Set player 1's name
-            match = re.search(r"#player1\s+(\S+)", line)
+            match = re.search(r"#player1\s+(\S+)(?:\s+(.*\S))?", line)
             if match is not None and match.group(1) is not None and self.players.get_name(0) == "":
                 self.players.set_name(0, match.group(1).strip())
+                self.players.set_full_name(0, (match.group(2) or "").strip())
                 # print(f'team going first: {self.players.get_name(0)}')
 
             # Set player 2's name
-            match = re.search(r"#player2\s+(\S+)", line)
+            match = re.search(r"#player2\s+(\S+)(?:\s+(.*\S))?", line)
             if match is not None and match.group(1) is not None and self.players.get_name(1) == "":
                 self.players.set_name(1, match.group(1).strip())
+                self.players.set_full_name(1, (match.group(2) or "").strip())
                 # print(f'team going second: {self.players.get_name(1)}')
 
             # Set final score
@@ -458,7 +1111,9 @@ class Game:
                 self.previous_score = match.group(4).strip()
                 self.previous_total = match.group(5).strip()
                 self.previous_move_type = MOVE_TYPE_TILE_PLACEMENT
-                self.place_tiles(self.previous_position, self.previous_word)
+                move = self._record_move(MOVE_TYPE_TILE_PLACEMENT, line, self.previous_position, self.previous_word)
+                self.place_tiles(self.previous_position, self.previous_word, move.display_word)
+                move.formed_words = self.board.get_formed_words(self.previous_position, self.previous_word)
             
             match = re.search(r"^>([^:]+):\s+[\w\?]+\s+-([\w\?]+)\s+(\S+)\s+(\d+)", line)
             if match is not None and match.group(1) is not None:
@@ -467,6 +1122,7 @@ class Game:
                 self.previous_score = match.group(3).strip()
                 self.previous_total = match.group(4).strip()
                 self.previous_move_type = MOVE_TYPE_EXCHANGE
+                self._record_move(MOVE_TYPE_EXCHANGE, line, word=self.previous_word)
 
             match = re.search(r"^>([^:]+):\s+[\w\?]+\s+-\s+(\S+)\s+(\d+)", line)
             if match is not None and match.group(1) is not None:
@@ -474,12 +1130,19 @@ class Game:
                 self.previous_score = match.group(2).strip()
                 self.previous_total = match.group(3).strip()
                 self.previous_move_type = MOVE_TYPE_PASS
+                self._record_move(MOVE_TYPE_PASS, line)
 
             match = re.search(r"^>[^:]+:\s+[\w\?]+\s+--", line)
             if match is not None:
                 # print("lost challenge detected, adding tiles back")
                 # print(f'previous word: {self.previous_word}')
                 self.unplace_tiles(self.previous_position, self.previous_word)
+                if self.stats.undo_play() is None and self.last_move is not None:
+                    self.last_move.challenged_off = True
+
+            match = re.search(r"^>([^:]+):\s+[\w\?]+\s+\(challenge\)", line)
+            if match is not None and match.group(1).strip() in self.players.names_to_indexes:
+                self.stats.challenge_bonus(self.players.names_to_indexes[match.group(1).strip()])
 
             match = re.search(r"^#rack\d\s([\w\?]+)", line)
             if match is not None and match.group(1) is not None:
@@ -487,6 +1150,8 @@ class Game:
                 # print("tiles_on_rack: ", tiles_on_rack)
                 # print(f'tiles on rack: {tiles_on_rack}')
                 self.remove_tiles(tiles_on_rack)
+                self.rack = tiles_on_rack
+                self._rack_moves = len(self.moves)
             
             self.previous_player = self.previous_player.replace('_', ' ')
 
@@ -517,11 +1182,9 @@ class Game:
         if self.previous_move_type == MOVE_TYPE_UNSPECIFIED:
             return ""
         elif self.previous_move_type == MOVE_TYPE_TILE_PLACEMENT:
-            word_with_parens = self.board.get_filled_in_word(self.previous_position, self.previous_word)
-            word_without_parens = re.sub(r'[^A-Za-z]', '', word_with_parens.upper())
-            word_definition = get_word_definition(word_definitions, word_without_parens)
-            lex_symbols = lex_symbols_map.get(word_without_parens, "")
-            display_word = word_with_parens + lex_symbols
+            move = self.last_move
+            word_definition = move.get_definition(word_definitions)
+            display_word = move.display_word + lex_symbols_map.get(move.key, "")
             return f'{LAST_PLAY_PREFIX}{self.previous_player} {self.previous_position} {display_word} {self.previous_score} {self.previous_total} | {word_definition}'
         elif self.previous_move_type == MOVE_TYPE_EXCHANGE:
             return f'{LAST_PLAY_PREFIX}{self.previous_player} exch {self.previous_word} {self.previous_score} {self.previous_total}'
@@ -550,14 +1213,106 @@ class Game:
         """Return player 2 stats: tiles played and power tiles played."""
         return f"Tiles: {self.tiles_played[1]}\nPower: {self.power_tiles_played[1]}"
 
-    def save_image(self, gcg_filename, startx, starty, tile_spacing, board_scale, tile_scale):
+    def get_gamestats_string(self):
+        """Return per-player bingos, average, exchanges and challenges, the highest play and next-tile odds."""
+        stats = self.stats
+        lines = []
+        for i in (0, 1):
+            bingo_word = "bingo" if stats.bingos[i] == 1 else "bingos"
+            line = (f"{self.players.get_name(i).replace('_', ' ')}: {stats.bingos[i]} {bingo_word} | "
+                    f"{stats.get_average(i, self.players.get_score(i)):.1f}/turn | "
+                    f"{stats.exchanges[i]} exch | {stats.challenged_off[i]} off")
+            if stats.challenge_bonuses[i]:
+                line += f" | {stats.challenge_bonuses[i]} chall. bonus"
+            lines.append(line)
+
+        high = stats.get_highest_play()
+        if high is not None:
+            lines.append(f"High: {self.players.get_name(high.player_index).replace('_', ' ')} {high.display_word} {high.score}")
+
+        unseen = sum(self.bag.tiles.values())
+        if unseen:
+            odds = [f"{tile} {100 * self.bag.tiles[tile] / unseen:.1f}%"
+                    for tile in "?SJQXZ" if self.bag.tiles[tile]]
+            if odds:
+                lines.append("Next tile: " + " | ".join(odds))
+        return "\n".join(lines)
+
+    def get_phony_words(self, word_definitions):
+        """Return the words formed by the last play that are not in the lexicon (none once it is challenged off)."""
+        move = self.last_move
+        if self.previous_move_type != MOVE_TYPE_TILE_PLACEMENT or move is None or move.challenged_off:
+            return []
+        return [w for w in move.formed_words if w not in word_definitions]
+
+    def get_phony_string(self, word_definitions):
+        phonies = self.get_phony_words(word_definitions)
+        if not phonies:
+            return ""
+        return f"INVALID: {', '.join(phonies)}"
+
+    def get_bingos_string(self, anagram_index):
+        """
+        Return 'BINGOS: ...' for the last move's rack, or 'MISSED BINGO: ...'
+        if the player did not bingo (a bingo challenged off counts as missed).
+        """
+        move = self.last_move
+        if move is None:
+            return ""
+        bingos = move.get_bingos(anagram_index)
+        if not bingos:
+            return ""
+        label = "BINGOS" if move.tiles == RACK_SIZE and not move.challenged_off else "MISSED BINGO"
+        return f"{label}: {', '.join(bingos)}"
+
+    def get_hooks_string(self, word_graph):
+        """Return 'FRONT | WORD | BACK' hooks for the main word of the last play (see word_graph.WordGraph)."""
+        move = self.last_move
+        if self.previous_move_type != MOVE_TYPE_TILE_PLACEMENT or move is None or not move.formed_words:
+            return ""
+        word = move.formed_words[0]
+        front, back = word_graph.hooks(word)
+        return f"{front} | {word} | {back}"
+
+    def get_last_move_squares(self):
+        """Return the squares of the tiles the last play put down, or [] if it was not a placement or was challenged off."""
+        move = self.last_move
+        if self.previous_move_type != MOVE_TYPE_TILE_PLACEMENT or move is None or move.challenged_off:
+            return []
+        return self.board.get_placed_squares(move.position, move.word)
+
+    def get_board_svg_string(self, svg_renderer):
+        """Return the board as SVG (see board_svg.SvgBoardRenderer), with the last play highlighted."""
+        return svg_renderer.render(self.board.matrix, self.get_last_move_squares())
+
+    def get_drawprob_string(self, draw_size=RACK_SIZE):
+        """Return the odds of drawing a blank, an S and each tile, and the expected vowels, in draw_size tiles."""
+        from draw_probability import draw_odds
+        return draw_odds(self.bag.tiles, draw_size).get_string()
+
+    def save_image(self, gcg_filename, startx, starty, tile_spacing, board_scale, tile_scale, renderer=None, image_output=None):
         last_play = ""
-        if self.previous_move_type != MOVE_TYPE_UNSPECIFIED:
+        if self.previous_move_type == MOVE_TYPE_TILE_PLACEMENT:
+            last_play = "_" + self.last_move.key
+        elif self.previous_move_type != MOVE_TYPE_UNSPECIFIED:
             word_with_parens = self.board.get_filled_in_word(self.previous_position, self.previous_word)
             last_play = "_" + re.sub(r'[^A-Za-z]', '', word_with_parens.upper())
-        return self.board.save_image(gcg_filename, last_play, startx, starty, tile_spacing, board_scale, tile_scale)
+        return self.board.save_image(gcg_filename, last_play, startx, starty, tile_spacing, board_scale, tile_scale, renderer,
+                                     image_output)
+
+def parse_draw_size(text):
+    """Parse a --drawsize value: a number of tiles from 0 to a full rack."""
+    if not text.strip().isdigit() or not 0 <= int(text) <= RACK_SIZE:
+        raise argparse.ArgumentTypeError(f"Draw size must be between 0 and {RACK_SIZE}: {text}")
+    return int(text)
 
 def read_definitions(filename):
+    from lexicon_index import LexiconIndex, is_lexicon_index, split_lexicon_word
+    if is_lexicon_index(filename):
+        # Compiled lexicons are memory-mapped and looked up in place
+        index = LexiconIndex(filename)
+        return index.definitions, index.symbols
+
     word_definitions = {}
     lex_symbols_map = {} 
     with open(filename, 'r') as file:
@@ -568,11 +1323,8 @@ def read_definitions(filename):
             raw_word = parts[0]                      
             definition = parts[1].strip()            
             definition = definition[1:-1]        
-            key = _clean_csv_key(raw_word)
-
-            # Extract lexicon symbols exactly as they appear in the CSV (after the cleaned key)
-            m = LEX_SUFFIX_RE.search(raw_word)
-            lex_symbols = m.group(0) if m else ""
+            # Lexicon symbols are kept exactly as they appear in the CSV (after the cleaned key)
+            key, lex_symbols = split_lexicon_word(raw_word)
 
             word_definitions[key] = definition
             lex_symbols_map[key] = lex_symbols
@@ -585,6 +1337,463 @@ def get_word_definition(word_definitions, word):
     # print(f'No definition found for {word}')
     return ""
 
+def _emit(on_event, kind, message="", **data):
+    """
+    Send a structured watcher event to on_event, or print it when running from the CLI.
+
+    Events are plain dicts with a "kind" ("status", "ready", "update", "warning"
+    or "error"), a human readable "message" and any extra data (e.g. "elapsed").
+    """
+    if on_event is not None:
+        on_event(dict(kind=kind, message=message, **data))
+    elif message:
+        print(message, file=sys.stderr if kind == "error" else sys.stdout, flush=True)
+
+#-----------------------------
+# File watcher backends
+#-----------------------------
+
+# File systems where OS change notifications are missing or unreliable
+NETWORK_FS_TYPES = {
+    "nfs", "nfs4", "cifs", "smb", "smb2", "smb3", "smbfs", "afs", "ncpfs",
+    "9p", "vboxsf", "virtiofs", "prl_fs", "vmhgfs", "fuse.vmhgfs-fuse",
+    "fuse.sshfs", "fuse.rclone", "davfs", "fuse.davfs2",
+}
+
+class WatcherStats:
+    """Tracks how long after a file's mtime each change was detected."""
+    def __init__(self):
+        self.changes = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def record(self, paths):
+        mtimes = []
+        for path in paths:
+            try:
+                mtimes.append(os.stat(path).st_mtime)
+            except OSError:
+                pass
+        if not mtimes:
+            return None
+        # Clock skew between us and a file server can make this negative
+        latency = max(0.0, time.time() - max(mtimes))
+        self.changes += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        return latency
+
+    def summary(self, name):
+        if not self.changes:
+            return f"{name} watcher: no changes detected"
+        avg = self.total_latency / self.changes
+        return (f"{name} watcher: {self.changes} changes, "
+                f"avg detection latency {avg * 1000:.0f} ms, max {self.max_latency * 1000:.0f} ms")
+
+class NotifyWatcher:
+    """OS change notifications through watchfiles.awatch."""
+    name = "notify"
+
+    def __init__(self, paths):
+        self.paths = [os.path.abspath(p) for p in paths]
+        self.stats = WatcherStats()
+        self._stopped = False
+        self._stop_event = None
+
+    async def changes(self):
+        """Yield the set of watched paths that changed, one set per batch."""
+        awatch = _import_awatch()
+        self._stop_event = asyncio.Event()
+        if self._stopped:
+            return
+        async for batch in awatch(*self.paths, stop_event=self._stop_event):
+            yield {os.path.abspath(path) for _, path in batch}
+
+    def stop(self):
+        self._stopped = True
+        if self._stop_event is not None:
+            self._stop_event.set()
+
+class PollingWatcher:
+    """
+    Polls os.stat() for the watched files.
+
+    The interval drops to min_interval right after a change and backs off
+    towards max_interval while the files stay idle.
+    """
+    name = "poll"
+
+    def __init__(self, paths, min_interval=0.05, max_interval=0.5, backoff=1.5):
+        self.paths = [os.path.abspath(p) for p in paths]
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.stats = WatcherStats()
+        self._stopped = False
+
+    @staticmethod
+    def _signature(path):
+        try:
+            st = os.stat(path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    async def changes(self):
+        """Yield the set of watched paths that changed, one set per batch."""
+        signatures = {path: self._signature(path) for path in self.paths}
+        interval = self.min_interval
+        while not self._stopped:
+            await asyncio.sleep(interval)
+            changed = set()
+            for path in self.paths:
+                signature = self._signature(path)
+                if signature != signatures[path]:
+                    signatures[path] = signature
+                    changed.add(path)
+            if changed:
+                interval = self.min_interval
+                yield changed
+            else:
+                interval = min(interval * self.backoff, self.max_interval)
+
+    def stop(self):
+        self._stopped = True
+
+WATCHER_BACKENDS = {
+    NotifyWatcher.name: NotifyWatcher,
+    PollingWatcher.name: PollingWatcher,
+}
+
+def _filesystem_type(path):
+    """Best-effort file system type (or 'remote') for path; None when unknown."""
+    path = os.path.abspath(path)
+    if os.name == "nt":
+        if path.startswith("\\\\"):
+            return "remote"
+        try:
+            import ctypes
+            DRIVE_REMOTE = 4
+            drive = os.path.splitdrive(path)[0] + "\\"
+            if ctypes.windll.kernel32.GetDriveTypeW(drive) == DRIVE_REMOTE:
+                return "remote"
+        except Exception:
+            pass
+        return None
+    try:
+        with open("/proc/mounts", "r") as f:
+            mounts = [line.split()[1:3] for line in f if len(line.split()) >= 3]
+    except OSError:
+        return None
+    best_mount, best_type = "", None
+    for mount_point, fs_type in mounts:
+        mount_point = mount_point.replace("\\040", " ")
+        if (path == mount_point or path.startswith(mount_point.rstrip("/") + "/")) and len(mount_point) > len(best_mount):
+            best_mount, best_type = mount_point, fs_type
+    return best_type
+
+def select_watcher(paths, backend="auto"):
+    """
+    Return a watcher for paths.
+
+    'auto' uses OS notifications unless watchfiles is unavailable or a path
+    lives on a network/virtualized file system, where it falls back to polling.
+    A missing watchfiles is not reinstalled here; that is left to startup.
+    """
+    if backend != "auto":
+        if backend not in WATCHER_BACKENDS:
+            raise ValueError(f"Unknown watcher backend: {backend}")
+        return WATCHER_BACKENDS[backend](paths)
+
+    for path in paths:
+        fs_type = _filesystem_type(path)
+        if fs_type == "remote" or fs_type in NETWORK_FS_TYPES:
+            return PollingWatcher(paths)
+    try:
+        _timed_import("watchfiles")
+    except ImportError:
+        return PollingWatcher(paths)
+    return NotifyWatcher(paths)
+
+#-----------------------------
+# Output fan-out
+#-----------------------------
+
+def _write_output(path, content, encoding=None, make_dirs=False):
+    if make_dirs:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding=encoding) as f:
+        f.write(content)
+
+def _settle_future(future, error):
+    if future.done():
+        return
+    if error is None:
+        future.set_result(None)
+    else:
+        future.set_exception(error)
+
+class OutputDestination:
+    """
+    One place the output files go: the configured paths themselves
+    (directory=None), or a mirror directory that gets the same file names.
+
+    Writes are queued and done on the destination's own thread, so a slow
+    or stalled destination (e.g. an SMB share) never holds up the watcher
+    or another destination. The queue keeps only the latest content per
+    file, and files are skipped when they already hold that content.
+    """
+    def __init__(self, directory=None, on_event=None):
+        self.directory = directory
+        self.on_event = on_event
+        self.pending = {}  # target path -> (content, encoding), oldest first
+        self._written = {}  # target path -> content last written there
+        self._jobs = None  # queue.SimpleQueue for the writer thread, started on first use
+        self._wake = None
+        self._task = None
+        self._idle = None
+        self._failing = False
+
+    def target(self, path):
+        if self.directory is None:
+            return path
+        return os.path.join(self.directory, os.path.basename(path))
+
+    def submit(self, path, content, encoding=None):
+        target = self.target(path)
+        if target not in self.pending and self._written.get(target) == content:
+            return
+        self.pending.pop(target, None)  # Re-queue at the back with the newer content
+        self.pending[target] = (content, encoding)
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._idle = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        self._idle.clear()
+        self._wake.set()
+
+    def _writer(self):
+        # A daemon thread, unlike an executor's, cannot keep the process alive
+        # on exit when a write to a dead share never returns
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            loop, future, args = job
+            try:
+                _write_output(*args)
+                error = None
+            except OSError as e:
+                error = e
+            try:
+                loop.call_soon_threadsafe(_settle_future, future, error)
+            except RuntimeError:
+                return  # Event loop closed
+
+    def _write(self, loop, *args):
+        if self._jobs is None:
+            import queue
+            import threading
+            self._jobs = queue.SimpleQueue()
+            threading.Thread(target=self._writer, name="watchgcg-output", daemon=True).start()
+        future = loop.create_future()
+        self._jobs.put((loop, future, args))
+        return future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            while self.pending:
+                target = next(iter(self.pending))
+                content, encoding = self.pending.pop(target)
+                try:
+                    await self._write(loop, target, content, encoding, self.directory is not None)
+                except OSError as e:
+                    self._written.pop(target, None)
+                    if not self._failing:
+                        self._failing = True
+                        _emit(self.on_event, "warning", f"Could not write {target}: {e}")
+                    continue
+                self._written[target] = content
+                if self._failing:
+                    self._failing = False
+                    _emit(self.on_event, "status", f"Writing to {self.directory or 'the output files'} again.")
+            self._idle.set()
+
+    async def flush(self):
+        """Wait until everything queued so far has been written (or has failed)."""
+        if self._idle is not None:
+            await self._idle.wait()
+
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+        if self._jobs is not None:
+            self._jobs.put(None)
+
+class OutputFanout:
+    """Sends every output file to the configured paths and to each mirror directory (see OutputDestination)."""
+    def __init__(self, mirrors=(), on_event=None):
+        self.destinations = [OutputDestination(None, on_event)]
+        self.destinations += [OutputDestination(directory, on_event) for directory in mirrors or ()]
+
+    def write(self, path, content, encoding=None):
+        if path:
+            for destination in self.destinations:
+                destination.submit(path, content, encoding)
+
+    async def flush(self, timeout=None):
+        """Wait up to timeout seconds for every destination to write what is queued. Returns True if they all did."""
+        try:
+            await asyncio.wait_for(asyncio.gather(*(d.flush() for d in self.destinations)), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def close(self):
+        for destination in self.destinations:
+            destination.close()
+
+#-----------------------------
+# Tournament daemon: board table and control channel
+#-----------------------------
+
+SWITCH_COMMAND_RE = re.compile(r"^switch\s+(?:board\s+)?(\d+)\s+(?:to\s+)?(.+)$", re.IGNORECASE)
+REMOVE_COMMAND_RE = re.compile(r"^remove\s+(?:board\s+)?(\d+)$", re.IGNORECASE)
+
+def _board_output_path(path, board):
+    """Board 1 uses the configured output paths; board N writes board<N>_<name> next to them."""
+    if not path or board == 1:
+        return path
+    out_dir = os.path.dirname(path) or "."
+    return os.path.join(out_dir, f"board{board}_" + os.path.basename(path))
+
+class BoardTable:
+    """
+    The GCG file each board is showing.
+
+    Daemon control commands edit this table; on_change is called after every
+    edit so the watcher can restart on the new set of files.
+    """
+    def __init__(self, gcg_filename):
+        self.boards = {1: gcg_filename}
+        self.pending = set()  # boards to refresh as soon as the watcher restarts
+        self.on_change = None
+
+    def paths(self):
+        return list(self.boards.values())
+
+    def boards_for(self, changed_paths):
+        return [board for board, path in sorted(self.boards.items())
+                if os.path.abspath(path) in changed_paths]
+
+    def handle_command(self, line):
+        """Apply one control command and return a one-line reply."""
+        line = line.strip()
+        if not line or line.startswith("#"):
+            return ""
+
+        match = SWITCH_COMMAND_RE.match(line)
+        if match:
+            board = int(match.group(1))
+            path = match.group(2).strip().strip('"')
+            if board < 1:
+                return f"error: invalid board number {board}"
+            if not os.path.isfile(path):
+                return f"error: GCG file not found: {path}"
+            self.boards[board] = path
+            self.pending.add(board)
+            self._changed()
+            return f"ok: board {board} -> {path}"
+
+        match = REMOVE_COMMAND_RE.match(line)
+        if match:
+            board = int(match.group(1))
+            if board == 1:
+                return "error: board 1 cannot be removed, switch it instead"
+            if self.boards.pop(board, None) is None:
+                return f"error: no board {board}"
+            self.pending.discard(board)
+            self._changed()
+            return f"ok: board {board} removed"
+
+        if line.lower() == "status":
+            return "ok: " + "; ".join(f"board {board} -> {path}" for board, path in sorted(self.boards.items()))
+
+        return f"error: unknown command: {line}"
+
+    def _changed(self):
+        if self.on_change is not None:
+            self.on_change()
+
+class ControlFile:
+    """Reads commands appended to a watched control file since the last read."""
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        if not os.path.exists(self.path):
+            open(self.path, "a").close()
+        # Commands written before we started are not replayed
+        self.offset = os.path.getsize(self.path)
+
+    def read_commands(self):
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() < self.offset:
+                self.offset = 0  # truncated by the operator
+            f.seek(self.offset)
+            data = f.read()
+        # Leave a partially written last line for the next read
+        complete = data[:data.rfind(b"\n") + 1]
+        self.offset += len(complete)
+        return complete.decode("utf-8", errors="replace").splitlines()
+
+async def _serve_control(port, table, on_event=None):
+    """Accept newline separated control commands on 127.0.0.1:port."""
+    async def handle(reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = table.handle_command(line.decode("utf-8", errors="replace"))
+                if reply:
+                    _emit(on_event, "status", f"[control] {reply}")
+                    writer.write((reply + "\n").encode())
+                    await writer.drain()
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", port)
+
+def _write_player_cards(roster, game, board, written, on_event=None):
+    """
+    Write the roster player files (p1name.txt, p1preview.txt, ...) for board
+    when the game's #player names change. written maps board -> the names
+    already handled, so an unchanged game only costs a tuple compare.
+    """
+    if roster.refresh():
+        written.clear()  # Roster edited: match every board again
+    names = tuple((game.players.get_full_name(i), game.players.get_name(i)) for i in (0, 1))
+    if written.get(board) == names:
+        return
+    written[board] = names
+
+    matched = []
+    for player_number, (full_name, name) in enumerate(names, start=1):
+        player_index = roster.find_player(full_name, name) if name else None
+        if player_index is None:
+            # Don't leave the previous game's player up under the new name
+            roster.write_unmatched(full_name or name, player_number, board)
+            if name:
+                _emit(on_event, "warning", f"Board {board}: no roster match for player {player_number} '{full_name or name}'.")
+            continue
+        roster.write_player(player_index, player_number, board)
+        matched.append(roster.players[player_index][roster.name_column])
+    if matched:
+        _emit(on_event, "status", f"Board {board}: player cards for {' vs '.join(matched)}.")
+
 async def _drain_magpie(proc, timeout=0.5):
     """Read all available lines from proc.stdout within the given timeout window."""
     collected = []
@@ -624,17 +1833,17 @@ async def _wait_for_magpie_finished(proc, timeout=1.0):
     return ''.join(collected)
 
 
-def _magpie_warn_and_disable(proc, context, output):
-    """Print a prominent autosim warning, kill the process, and return None."""
-    print(
+def _magpie_warn_and_disable(proc, context, output, on_event=None):
+    """Report a prominent autosim warning, kill the process, and return None."""
+    _emit(
+        on_event, "warning",
         "\n" + "=" * 60 + "\n"
         "!!! AUTOSIM WARNING !!!\n"
         f"MAGPIE reported a problem during {context}.\n"
         "Autosim has been DISABLED. The rest of the program will\n"
         "continue running normally without automatic analysis.\n"
         f"\nMAGPIE output:\n>{output.strip()}<\n"
-        + "=" * 60 + "\n",
-        flush=True
+        + "=" * 60 + "\n"
     )
     proc.kill()
     return None
@@ -644,9 +1853,191 @@ def _magpie_output_ok(output):
     return 'finished' in output and 'error' not in output.lower()
 
 
-async def _run_magpie_analysis(proc, gcg_filename, game, poll_interval=1.0):
-    """Load the current GCG into MAGPIE, run analysis, and write results to analysis.txt."""
+def parse_cpu_list(text):
+    """Parse a CPU list like '0-3,6' into a set of CPU numbers, all of which this process may use."""
+    cpus = set()
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition('-')
+        if not first.isdigit() or (last and not last.isdigit()):
+            raise argparse.ArgumentTypeError(f"Invalid CPU list: {text}")
+        cpus.update(range(int(first), int(last or first) + 1))
+    # Pinning to a CPU we cannot run on would only fail once MAGPIE is spawned
+    if hasattr(os, 'sched_getaffinity'):
+        available = os.sched_getaffinity(0)
+    else:
+        available = set(range(os.cpu_count() or 1))
+    unavailable = cpus - available
+    if unavailable:
+        raise argparse.ArgumentTypeError(f"CPU(s) {', '.join(map(str, sorted(unavailable)))} not available "
+                         f"(this process may use {', '.join(map(str, sorted(available)))})")
+    return cpus
+
+def parse_nice(text):
+    """Parse an engine nice level: 0-19, since raising priority needs privileges we don't ask for."""
+    if not text.strip().isdigit() or not 0 <= int(text) <= 19:
+        raise argparse.ArgumentTypeError(f"Nice level must be between 0 and 19: {text}")
+    return int(text)
+
+
+class EngineLimits:
+    """
+    CPU budget for the MAGPIE processes, so analysis never starves OBS.
+
+    threads is MAGPIE's -threads; cpus pins the engine to those CPUs; nice
+    lowers its priority (on Windows: below normal, or idle from 10 up).
+    Affinity and priority are set on the process right after it is spawned
+    (see apply_limits), before MAGPIE starts the worker threads that
+    inherit them. With
+    max_load (a fraction of all CPUs), the thread count is recomputed
+    before each analysis from the 1-minute load average, less the CPU time
+    the engine itself used since the last check (see engine_load), so the
+    whole system stays under that share.
+    """
+    def __init__(self, threads=None, cpus=None, nice=None, max_load=None):
+        self.threads = threads
+        self.cpus = set(cpus) if cpus else None
+        self.nice = nice
+        self.max_load = max_load
+        self.applied = {}  # pid -> threads last set on that process
+        self._cpu_samples = {}  # pid -> (CPU seconds used, time.monotonic()) at the last engine_load()
+
+    def spawn_kwargs(self):
+        """Keyword arguments for create_subprocess_exec: the priority class on Windows."""
+        if os.name != 'nt' or not self.nice or self.nice <= 0:
+            return {}
+        priority = subprocess.IDLE_PRIORITY_CLASS if self.nice >= 10 else subprocess.BELOW_NORMAL_PRIORITY_CLASS
+        return {'creationflags': priority}
+
+    def apply_limits(self, pid):
+        """
+        Pin an already spawned process to cpus and lower its priority. This
+        is done from here rather than in the child before exec, which is not
+        safe while this process has other threads running. Raises OSError
+        if a limit cannot be applied.
+        """
+        if os.name != 'nt':
+            if self.cpus and hasattr(os, 'sched_setaffinity'):
+                os.sched_setaffinity(pid, self.cpus)
+            if self.nice:
+                os.setpriority(os.PRIO_PROCESS, pid, self.nice)
+            return
+        if not self.cpus:
+            return
+        import ctypes
+        PROCESS_SET_INFORMATION = 0x0200
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(PROCESS_SET_INFORMATION, False, pid)
+        if handle:
+            kernel32.SetProcessAffinityMask(handle, ctypes.c_size_t(sum(1 << cpu for cpu in self.cpus)))
+            kernel32.CloseHandle(handle)
+
+    @staticmethod
+    def _cpu_seconds(pid):
+        """CPU time pid has used so far, from /proc; None where that is not available."""
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                # The command name in parentheses may contain spaces; utime and stime follow it
+                fields = f.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            return None
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+    def engine_load(self):
+        """
+        Return how many CPUs the engine processes kept busy, on average, since
+        the previous call. A process seen for the first time, or on a system
+        without /proc, counts as 0, which only makes the budget stricter.
+        """
+        now = time.monotonic()
+        busy = 0.0
+        for pid in self.applied:
+            used = self._cpu_seconds(pid)
+            if used is None:
+                continue
+            last = self._cpu_samples.get(pid)
+            self._cpu_samples[pid] = (used, now)
+            if last is not None and now > last[1]:
+                busy += (used - last[0]) / (now - last[1])
+        return busy
+
+    def threads_for_load(self, load=None, engine_load=None):
+        """Return the thread count to use now (None leaves MAGPIE's default)."""
+        if self.max_load is None:
+            return self.threads
+        if load is None:
+            if not hasattr(os, 'getloadavg'):
+                return self.threads
+            load = os.getloadavg()[0]
+        if engine_load is None:
+            engine_load = self.engine_load()
+        cpu_count = len(self.cpus) if self.cpus else (os.cpu_count() or 1)
+        budget = self.threads or cpu_count
+        others = max(0.0, load - engine_load)
+        return max(1, min(budget, int(self.max_load * (os.cpu_count() or 1) - others)))
+
+
+async def _set_magpie_threads(proc, limits, on_event=None):
+    """Send 'set -threads' when the load-based thread budget has changed since the last analysis."""
+    threads = limits.threads_for_load()
+    if threads is None or limits.applied.get(proc.pid) == threads:
+        return
+    proc.stdin.write(f'set -threads {threads}\n'.encode())
+    await proc.stdin.drain()
+    await _wait_for_magpie_finished(proc)
+    if proc.pid in limits.applied:
+        _emit(on_event, "status", f"MAGPIE now using {threads} thread(s).", threads=threads)
+    limits.applied[proc.pid] = threads
+
+
+async def _start_magpie(magpie_path, lex_filename, on_event=None, limits=None):
+    """
+    Start MAGPIE in magpie_path and configure it for lex_filename's lexicon,
+    within limits (an EngineLimits). Returns the process, or None on failure.
+    """
+    lex_stem = Path(lex_filename).stem  # e.g. "NWL23defs"
+    lex = re.sub(r'defs$', '', lex_stem, flags=re.IGNORECASE)  # e.g. "NWL23"
+    limits = limits or EngineLimits()
+    proc = await asyncio.create_subprocess_exec(
+        './bin/magpie',
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+        cwd=magpie_path,
+        **limits.spawn_kwargs(),
+    )
     try:
+        limits.apply_limits(proc.pid)
+    except OSError as e:
+        proc.kill()
+        _emit(on_event, "warning", f"Could not start MAGPIE with the engine limits ({e}); autosim is disabled.")
+        return None
+    startup_output = await _drain_magpie(proc, timeout=1.0)
+    if 'error' in startup_output.lower():
+        return _magpie_warn_and_disable(proc, 'startup', startup_output, on_event)
+    initial_config = f'set -lex {lex} -ld english -printonf true -shwithmoves false -minp 200 -numplays 200 -eplies 25'
+    threads = limits.threads_for_load()
+    if threads is not None:
+        initial_config += f' -threads {threads}'
+        limits.applied[proc.pid] = threads
+    initial_config += '\n'
+    proc.stdin.write(initial_config.encode())
+    await proc.stdin.drain()
+    set_output = await _wait_for_magpie_finished(proc)
+    if not _magpie_output_ok(set_output):
+        return _magpie_warn_and_disable(proc, 'initial configuration', set_output, on_event)
+    return proc
+
+
+async def _run_magpie_analysis(proc, gcg_filename, game, poll_interval=1.0, on_event=None, limits=None, write=None,
+                               output_path='analysis.txt'):
+    """Load the current GCG into MAGPIE, run analysis, and write results to output_path (through write(path, text) if given)."""
+    write = write or _write_output
+    try:
+        if limits is not None:
+            await _set_magpie_threads(proc, limits, on_event)
         unseen_count, _ = game.bag.get_unseen_counts()
         command = 'endgame' if unseen_count <= 7 else 'gs'
         final_cmd = 'she' if command == 'endgame' else 'shm'
@@ -659,7 +2050,7 @@ async def _run_magpie_analysis(proc, gcg_filename, game, poll_interval=1.0):
         _magpie_debug("[MAGPIE] sent load, waiting for finished", flush=True)
         load_output = await _wait_for_magpie_finished(proc)
         if not _magpie_output_ok(load_output):
-            _magpie_warn_and_disable(proc, 'load', load_output)
+            _magpie_warn_and_disable(proc, 'load', load_output, on_event)
             return
 
         proc.stdin.write(b'goto end\n')
@@ -667,7 +2058,7 @@ async def _run_magpie_analysis(proc, gcg_filename, game, poll_interval=1.0):
         _magpie_debug("[MAGPIE] sent goto end, waiting for finished", flush=True)
         goto_output = await _wait_for_magpie_finished(proc)
         if not _magpie_output_ok(goto_output):
-            _magpie_warn_and_disable(proc, 'goto end', goto_output)
+            _magpie_warn_and_disable(proc, 'goto end', goto_output, on_event)
             return
 
         proc.stdin.write(f'{command}\n'.encode())
@@ -684,16 +2075,14 @@ async def _run_magpie_analysis(proc, gcg_filename, game, poll_interval=1.0):
             await asyncio.sleep(poll_interval)
             output = await _drain_magpie(proc, timeout=0.1)
             if output:
-                with open('analysis.txt', 'w') as f:
-                    f.write(output)
+                write(output_path, output)
             if '(error 1)' in output or 'finished' in output:
                 _magpie_debug(f"[MAGPIE] command finished, fetching result with {final_cmd}", flush=True)
                 proc.stdin.write(f'{final_cmd}\n'.encode())
                 await proc.stdin.drain()
                 final_output = await _drain_magpie(proc, timeout=2.0)
-                with open('analysis.txt', 'w') as f:
-                    f.write(final_output)
-                _magpie_debug("[MAGPIE] analysis.txt written", flush=True)
+                write(output_path, final_output)
+                _magpie_debug(f"[MAGPIE] {output_path} written", flush=True)
                 break
             proc.stdin.write(b'status\n')
             await proc.stdin.drain()
@@ -706,6 +2095,23 @@ async def _run_magpie_analysis(proc, gcg_filename, game, poll_interval=1.0):
             traceback.print_exc()
 
 
+async def _run_local_analysis(analysis, snapshot, rack, output_path, write=None):
+    """
+    Generate plays for rack off the event loop thread and write them to
+    output_path. Cancelling the task also stops the search in its thread, so
+    quick updates never leave several searches running at once.
+    """
+    import threading
+    loop = asyncio.get_running_loop()
+    cancel = threading.Event()
+    try:
+        text = await loop.run_in_executor(None, analysis.analyze, snapshot, rack, cancel)
+    except asyncio.CancelledError:
+        cancel.set()
+        raise
+    (write or _write_output)(output_path, text)
+
+
 async def main(
         gcg_filename,
         lex_filename, 
@@ -726,47 +2132,188 @@ async def main(
         boardscale=1.0,
         tilescale=1.0,
         saveboardimg=False,
-        autosim_path=None
+        autosim_path=None,
+        on_event=None,
+        watcher="auto",
+        control_file=None,
+        control_port=None,
+        roster=None,
+        playercards=None,
+        gamestats_output_filename=None,
+        drawprob_output_filename=None,
+        draw_size=RACK_SIZE,
+        phony_output_filename=None,
+        hooks_output_filename=None,
+        localsim=False,
+        bingos_output_filename=None,
+        engine_limits=None,
+        mirrors=None,
+        image_mode="history",
+        image_ring=10,
+        image_variants=None,
+        board_svg_output_filename=None,
+        render_backend="auto"
         ):
-    
-    from watchfiles import awatch
+    """
+    Watch gcg_filename and rewrite the overlay files on every change.
+
+    on_event, if given, receives structured status/timing/error events (see
+    _emit) instead of having them printed, so the GUI can run this coroutine
+    in-process on a background event loop. watcher picks the file watcher
+    backend ("auto", "notify" or "poll", see select_watcher).
+
+    board_svg_output_filename writes the board as SVG on every update, laid
+    out with the same tile parameters and without needing Pillow.
+
+    render_backend picks how board images are composited (see
+    select_board_renderer()).
+
+    image_mode and image_ring choose where board images go, and
+    image_variants (ImageVariants) the sizes and formats each one is
+    written in (see ImageOutput).
 
+    Output files are written through an OutputFanout: to their own paths and
+    to every directory in mirrors, each destination on its own queue.
+
+    engine_limits (an EngineLimits) caps the threads, CPUs and priority of
+    the autosim MAGPIE process.
+
+    localsim writes analysis.txt with the built-in move generator (see
+    movegen.py); with autosim_path it is the fallback whenever MAGPIE is not
+    running.
+
+    control_file and/or control_port turn on daemon mode: "switch N path"
+    commands move board N to another GCG file while the lexicon, board
+    renderer and MAGPIE stay loaded (see BoardTable).
+
+    roster turns on player cards: the #player names of each board are matched
+    against this roster TSV and the player files are written to playercards
+    (see extract_player_data.RosterIndex).
+    """
+    
+    _emit(on_event, "status", f"Loading lexicon {lex_filename}…")
+    load_start = time.perf_counter()
     word_definitions, lex_symbols_map = read_definitions(lex_filename)
+    _startup_mark("lexicon loaded")
+    _emit(
+        on_event, "status",
+        f"Loaded {len(word_definitions)} words in {time.perf_counter() - load_start:.2f}s.",
+        elapsed=time.perf_counter() - load_start
+    )
+
+    renderer = None
+    if saveboardimg:
+        renderer = select_board_renderer(render_backend, tilestartx, tilestarty, tilespacing, boardscale, tilescale, on_event)
+    image_output = ImageOutput(image_mode, image_ring, image_variants) if saveboardimg else None
+    svg_renderer = None
+    if board_svg_output_filename:
+        svg_renderer = _timed_import("board_svg").SvgBoardRenderer(tilestartx, tilestarty, tilespacing, boardscale, tilescale)
+    boards = BoardTable(gcg_filename)
+    control = ControlFile(control_file) if control_file else None
+    control_server = None
+    watcher_stats = {}
+
+    roster_index = None
+    player_cards = {}
+    if roster:
+        # Only needed for player cards, so only imported when asked for
+        roster_index = _timed_import("extract_player_data").RosterIndex(roster, playercards or ".")
+        _emit(on_event, "status", f"Loaded roster {roster} ({len(roster_index.players)} players).")
+
+    word_graph = None
+
+    def get_word_graph():
+        nonlocal word_graph
+        if word_graph is None:
+            # Memory-mapped from the .dawg cached next to the lexicon, built on first use
+            graph_start = time.perf_counter()
+            word_graph = _timed_import("word_graph").load_word_graph(lex_filename, word_definitions)
+            _emit(on_event, "status", f"Loaded word graph in {time.perf_counter() - graph_start:.2f}s.",
+                  elapsed=time.perf_counter() - graph_start)
+        return word_graph
+
+    if hooks_output_filename:
+        get_word_graph()
+    anagram_index = None
+    if bingos_output_filename:
+        index_start = time.perf_counter()
+        anagram_module = _timed_import("anagram_index")
+        # The blank table is built here too, off the event loop, so the first
+        # rack with a blank doesn't stall an update
+        anagram_index = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: anagram_module.AnagramIndex(word_definitions).build_blank_table())
+        _emit(on_event, "status", f"Indexed {len(anagram_index)} bingos in {time.perf_counter() - index_start:.2f}s.",
+              elapsed=time.perf_counter() - index_start)
+    # board -> movegen.LocalAnalysis, whose cross-checks follow that board's Game
+    local_analyses = {}
+    local_task = None
+
+    # board -> Game, updated in place while its GCG file only grows (see Game.update)
+    games = {}
+
+    outputs = OutputFanout(mirrors, on_event)
+    write = outputs.write
 
     magpie_proc = None
+    magpie_task = None
     analysis_task = None
-    if autosim_path:
-        lex_stem = Path(lex_filename).stem  # e.g. "NWL23defs"
-        lex = re.sub(r'defs$', '', lex_stem, flags=re.IGNORECASE)  # e.g. "NWL23"
-        magpie_proc = await asyncio.create_subprocess_exec(
-            './bin/magpie',
-            stdin=asyncio.subprocess.PIPE,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.STDOUT,
-            cwd=autosim_path,
-        )
-        startup_output = await _drain_magpie(magpie_proc, timeout=1.0)
-        if 'error' in startup_output.lower():
-            magpie_proc = _magpie_warn_and_disable(magpie_proc, 'startup', startup_output)
+    analysis_board = None
+    # board -> (gcg, game, output path) waiting for MAGPIE, oldest first
+    magpie_queue = {}
+    magpie_wakeup = asyncio.Event()
+    file_watcher = None
+
+    def analyse_with_magpie(board, board_gcg, game, output_path):
+        """
+        Queue board for MAGPIE. There is one engine, so boards take turns: a
+        new position for the board being analysed restarts it, other boards
+        wait with only their latest position kept.
+        """
+        if board == analysis_board and analysis_task and not analysis_task.done():
+            waiting = list(magpie_queue.items())
+            magpie_queue.clear()
+            magpie_queue[board] = (board_gcg, game, output_path)
+            magpie_queue.update(waiting)
+            analysis_task.cancel()
         else:
-            initial_config = f'set -lex {lex} -ld english -printonf true -shwithmoves false -minp 200 -numplays 200 -eplies 25\n'
-            magpie_proc.stdin.write(initial_config.encode())
-            await magpie_proc.stdin.drain()
-            set_output = await _wait_for_magpie_finished(magpie_proc)
-            if not _magpie_output_ok(set_output):
-                magpie_proc = _magpie_warn_and_disable(magpie_proc, 'initial configuration', set_output)
-
-    print(
-        f"\n\n\n!!! SUCCESS !!!\nSuccessfully starting watching {gcg_filename} for changes.\n"
-        "On certain operating systems you might see syntax warnings above which can be safely ignored.\n"
-        "This script is designed to run indefinitely watching for changes to the GCG file,\n"
-        "so while it's running you will be unable to enter commands in this terminal.\n"
-        "Any syntax or error messages after this message are legitimate and should be reported to the developer.\n"
-        "To stop execution, hit control-C.\n"
-    )
+            magpie_queue[board] = (board_gcg, game, output_path)
+        magpie_wakeup.set()
+
+    async def run_magpie_queue():
+        """The only coroutine that talks to MAGPIE: runs the queued analyses one at a time."""
+        nonlocal analysis_task, analysis_board
+        try:
+            while magpie_proc.returncode is None:
+                if not magpie_queue:
+                    magpie_wakeup.clear()
+                    await magpie_wakeup.wait()
+                    continue
+                board = next(iter(magpie_queue))
+                board_gcg, game, output_path = magpie_queue.pop(board)
+                magpie_proc.stdin.write(b'stop\n')
+                await magpie_proc.stdin.drain()
+                await _drain_magpie(magpie_proc, timeout=0.5)
+                analysis_board = board
+                analysis_task = asyncio.create_task(
+                    _run_magpie_analysis(magpie_proc, board_gcg, game, on_event=on_event, limits=engine_limits,
+                                         write=write, output_path=output_path)
+                )
+                # Unlike awaiting the task, wait() returns when it is cancelled for a restart
+                await asyncio.wait({analysis_task})
+                analysis_board = None
+        finally:
+            if analysis_task and not analysis_task.done():
+                analysis_task.cancel()
+
+    async def process_board(board, board_gcg, latency=None):
+        nonlocal local_task
+        update_start = time.perf_counter()
+        game = games.get(board)
+        if game is None or game.gcg != board_gcg or not game.update():
+            game = games[board] = Game(board_gcg)
 
-    async for _ in awatch(gcg_filename):
-        game = Game(gcg_filename)
+        def out(path):
+            return _board_output_path(path, board)
 
         if ver == "au":
             if p1score and p2score:
@@ -779,62 +2326,180 @@ async def main(
                 p1_path = os.path.join(out_dir, "p1_" + base)  
                 p2_path = os.path.join(out_dir, "p2_" + base)
 
-            with open(p1_path, "w", encoding="utf-8") as score_file:
-                score_file.write(game.get_p1_score_string())
+            write(out(p1_path), game.get_p1_score_string(), "utf-8")
 
-            with open(p2_path, "w", encoding="utf-8") as score_file:
-                score_file.write(game.get_p2_score_string())
+            write(out(p2_path), game.get_p2_score_string(), "utf-8")
         else:
             # Standard mode: write one file with both scores
-            with open(score_output_filename, "w", encoding="utf-8") as score_file:
-                score_file.write(game.get_scores_string())
+            write(out(score_output_filename), game.get_scores_string(), "utf-8")
 
-        with open(unseen_output_filename, "w") as unseen_file:
-            unseen_file.write(game.get_unseen_tiles_string())
+        write(out(unseen_output_filename), game.get_unseen_tiles_string())
 
-        with open(count_output_filename, "w") as count_file:
-            count_file.write(game.get_unseen_count_string())
+        write(out(count_output_filename), game.get_unseen_count_string())
 
-        with open(last_play_output_filename, "w") as last_play_file:
-            last_play_file.write(game.get_last_play_string(word_definitions, lex_symbols_map))
+        last_play_string = game.get_last_play_string(word_definitions, lex_symbols_map)
+        write(out(last_play_output_filename), last_play_string)
 
         # Write blank files if they exist
         if blank1_output_filename:
             blank1_content = game.get_blank_1_string()
-            with open(blank1_output_filename, "w") as blank1_file:
-                blank1_file.write(blank1_content)
+            write(out(blank1_output_filename), blank1_content)
         
         if blank2_output_filename:
             blank2_content = game.get_blank_2_string()
-            with open(blank2_output_filename, "w") as blank2_file:
-                blank2_file.write(blank2_content)
+            write(out(blank2_output_filename), blank2_content)
         
         # Write stats files if provided
         if stats1_output_filename:
-            with open(stats1_output_filename, "w") as stats1_file:
-                stats1_file.write(game.get_stats1_string())
+            write(out(stats1_output_filename), game.get_stats1_string())
         
         if stats2_output_filename:
-            with open(stats2_output_filename, "w") as stats2_file:
-                stats2_file.write(game.get_stats2_string())
+            write(out(stats2_output_filename), game.get_stats2_string())
 
-        if saveboardimg:
-            game.save_image(gcg_filename, tilestartx, tilestarty, tilespacing, boardscale, tilescale)
+        if gamestats_output_filename:
+            write(out(gamestats_output_filename), game.get_gamestats_string(), "utf-8")
 
-        if autosim_path and magpie_proc:
-            if analysis_task and not analysis_task.done():
-                analysis_task.cancel()
-                try:
-                    await analysis_task
-                except asyncio.CancelledError:
-                    pass
-            magpie_proc.stdin.write(b'stop\n')
-            await magpie_proc.stdin.drain()
-            await _drain_magpie(magpie_proc, timeout=0.5)
-            analysis_task = asyncio.create_task(
-                _run_magpie_analysis(magpie_proc, gcg_filename, game)
+        if drawprob_output_filename:
+            write(out(drawprob_output_filename), game.get_drawprob_string(draw_size), "utf-8")
+
+        if phony_output_filename:
+            write(out(phony_output_filename), game.get_phony_string(word_definitions), "utf-8")
+
+        if hooks_output_filename:
+            write(out(hooks_output_filename), game.get_hooks_string(word_graph), "utf-8")
+
+        if bingos_output_filename:
+            write(out(bingos_output_filename), game.get_bingos_string(anagram_index), "utf-8")
+
+        if roster_index is not None:
+            _write_player_cards(roster_index, game, board, player_cards, on_event)
+
+        if svg_renderer is not None:
+            write(out(board_svg_output_filename), game.get_board_svg_string(svg_renderer), "utf-8")
+
+        if saveboardimg:
+            game.save_image(board_gcg, tilestartx, tilestarty, tilespacing, boardscale, tilescale, renderer, image_output)
+
+        if autosim_path and magpie_proc and magpie_proc.returncode is None:
+            analyse_with_magpie(board, board_gcg, game, out('analysis.txt'))
+        elif (localsim or autosim_path) and game.get_rack():
+            analysis = local_analyses.get(board)
+            if analysis is None:
+                if not local_analyses:
+                    _emit(on_event, "status", "Using the built-in move generator for analysis.txt"
+                          + (" (MAGPIE is not running)." if autosim_path else "."))
+                analysis = local_analyses[board] = _timed_import("movegen").LocalAnalysis(get_word_graph())
+            if local_task and not local_task.done():
+                local_task.cancel()
+            local_task = asyncio.create_task(
+                _run_local_analysis(analysis, analysis.snapshot(game.board), game.get_rack(), out('analysis.txt'), write)
             )
 
+        elapsed = time.perf_counter() - update_start
+        _emit(on_event, "update", elapsed=elapsed, last_play=last_play_string.strip(),
+              watcher=file_watcher.name, latency=latency, board=board)
+
+    async def update_board(board, board_gcg, latency=None):
+        """process_board(), except that in daemon mode a failing board is reported and the others keep going."""
+        if control is None and not control_port:
+            await process_board(board, board_gcg, latency)
+            return
+        try:
+            await process_board(board, board_gcg, latency)
+        except Exception as e:
+            # Parse the file from scratch once it is readable again
+            games.pop(board, None)
+            _emit(on_event, "error", f"Board {board}: could not update from {board_gcg}: {e}", board=board)
+
+    try:
+        if autosim_path:
+            _emit(on_event, "status", f"Starting MAGPIE in {autosim_path}…")
+            magpie_proc = await _start_magpie(autosim_path, lex_filename, on_event, engine_limits)
+            if magpie_proc:
+                magpie_task = asyncio.create_task(run_magpie_queue())
+
+        if control is not None:
+            _emit(on_event, "status", f"Daemon mode: reading commands from {control.path}")
+        if control_port:
+            control_server = await _serve_control(control_port, boards, on_event)
+            _emit(on_event, "status", f"Daemon mode: accepting commands on 127.0.0.1:{control_port}")
+
+        ready = False
+        while True:
+            watch_paths = boards.paths() + ([control.path] if control else [])
+            file_watcher = select_watcher(watch_paths, watcher)
+            file_watcher.stats = watcher_stats.setdefault(file_watcher.name, WatcherStats())
+            boards.on_change = file_watcher.stop
+
+            if not ready:
+                ready = True
+                _emit(on_event, "status", f"Using the {file_watcher.name} file watcher.", watcher=file_watcher.name)
+                if on_event is None:
+                    print(
+                        f"\n\n\n!!! SUCCESS !!!\nSuccessfully starting watching {gcg_filename} for changes.\n"
+                        "On certain operating systems you might see syntax warnings above which can be safely ignored.\n"
+                        "This script is designed to run indefinitely watching for changes to the GCG file,\n"
+                        "so while it's running you will be unable to enter commands in this terminal.\n"
+                        "Any syntax or error messages after this message are legitimate and should be reported to the developer.\n"
+                        "To stop execution, hit control-C.\n"
+                    )
+                else:
+                    _emit(on_event, "ready", f"Watching {gcg_filename} for changes.", gcg=gcg_filename)
+                _startup_mark("watching")
+                _report_startup_times()
+
+            # Boards switched by a control command show their new game straight away
+            for board in sorted(boards.pending):
+                if board in boards.boards:
+                    await update_board(board, boards.boards[board])
+            boards.pending.clear()
+
+            async for changed in file_watcher.changes():
+                if control is not None and control.path in changed:
+                    for command in control.read_commands():
+                        reply = boards.handle_command(command)
+                        if reply:
+                            _emit(on_event, "status", f"[control] {reply}")
+                    changed = changed - {control.path}
+                    if not changed:
+                        continue
+                latency = file_watcher.stats.record(changed)
+                for board in boards.boards_for(changed):
+                    await update_board(board, boards.boards[board], latency)
+            # The watcher only stops on its own after the board table changed;
+            # loop around and watch the new set of files.
+    finally:
+        if file_watcher is not None:
+            file_watcher.stop()
+        for name, stats in watcher_stats.items():
+            _emit(on_event, "status", stats.summary(name))
+        if control_server is not None:
+            control_server.close()
+        # Also reached when the GUI cancels the watcher: never leave MAGPIE behind
+        magpie_queue.clear()
+        if magpie_task and not magpie_task.done():
+            magpie_task.cancel()
+        if analysis_task and not analysis_task.done():
+            analysis_task.cancel()
+        if local_task and not local_task.done():
+            local_task.cancel()
+        if magpie_proc and magpie_proc.returncode is None:
+            magpie_proc.kill()
+        try:
+            if not await outputs.flush(timeout=1.0):
+                _emit(on_event, "warning", "Some output files were still queued at exit.")
+        except asyncio.CancelledError:
+            pass
+        outputs.close()
+
+def engine_limits_from_args(args):
+    return EngineLimits(
+        threads=getattr(args, 'engine_threads', None),
+        cpus=getattr(args, 'engine_cpus', None),
+        nice=getattr(args, 'engine_nice', None),
+        max_load=getattr(args, 'engine_max_load', None),
+    )
+
 async def run_watcher(args):
     await main(
         args.gcg, 
@@ -856,13 +2521,32 @@ async def run_watcher(args):
         args.boardscale,
         args.tilescale,
         args.saveboardimg,
-        getattr(args, 'autosim', None)
+        getattr(args, 'autosim', None),
+        watcher=getattr(args, 'watcher', "auto"),
+        control_file=getattr(args, 'control', None),
+        control_port=getattr(args, 'control_port', None),
+        roster=getattr(args, 'roster', None),
+        playercards=getattr(args, 'playercards', None),
+        gamestats_output_filename=getattr(args, 'gamestats', None),
+        drawprob_output_filename=getattr(args, 'drawprob', None),
+        draw_size=getattr(args, 'drawsize', RACK_SIZE),
+        phony_output_filename=getattr(args, 'phony', None),
+        hooks_output_filename=getattr(args, 'hooks', None),
+        localsim=getattr(args, 'localsim', False),
+        bingos_output_filename=getattr(args, 'bingos', None),
+        engine_limits=engine_limits_from_args(args),
+        mirrors=getattr(args, 'mirror', None),
+        image_mode=getattr(args, 'imagemode', "history"),
+        image_ring=getattr(args, 'imagering', 10),
+        image_variants=getattr(args, 'imagevariant', None),
+        board_svg_output_filename=getattr(args, 'boardsvg', None),
+        render_backend=getattr(args, 'renderbackend', "auto")
     )
 
 def build_cli_parser():
     p = argparse.ArgumentParser(add_help=False)  # we'll add help in the top-level parser
     p.add_argument("--gcg", type=str, help="the gcg file to monitor")
-    p.add_argument("--lex", type=str, help="the lexicon file to use for definitions")
+    p.add_argument("--lex", type=str, help="the lexicon file to use for definitions (CSV or compiled .lexidx)")
     p.add_argument("--score", type=str, help="the output file(s) to write the score")
     p.add_argument("--p1score", type=str, help="(au optional) explicit Player 1 score output file")
     p.add_argument("--p2score", type=str, help="(au optional) explicit Player 2 score output file")
@@ -873,6 +2557,14 @@ def build_cli_parser():
     p.add_argument("--blank2", type=str, help="the output file to write the second blank (if any)")
     p.add_argument("--stats1", type=str, help="the output file to write player 1 game stats (tiles and power tiles)")
     p.add_argument("--stats2", type=str, help="the output file to write player 2 game stats (tiles and power tiles)")
+    p.add_argument("--gamestats", type=str, help="the output file to write bingos, average per turn, exchanges, challenges, highest play and next-tile odds")
+    p.add_argument("--drawprob", type=str, help="the output file to write the odds of drawing a blank, an S or any tile, and the expected vowels")
+    p.add_argument("--drawsize", type=parse_draw_size, default=RACK_SIZE, help="(drawprob) number of tiles drawn from the unseen pool (default: a full rack)")
+    p.add_argument("--phony", type=str, help="the output file to flag words in the last play that are not in the lexicon (empty when all are valid)")
+    p.add_argument("--hooks", type=str, help="the output file to write the front and back hooks of the last play (caches a .dawg word graph next to the lexicon)")
+    p.add_argument("--bingos", type=str, help="the output file to write the bingos on the last move's rack ('MISSED BINGO: ...' if none was played)")
+    p.add_argument("--mirror", action="append", default=None, metavar="DIR",
+                   help="also write every output file to DIR (repeatable); each destination has its own queue, so a slow share never delays the others")
     p.add_argument("--ver", choices=["std", "au"], default="std",
                    help="Output format: 'std' (default) outputs one file with both scores; 'au' writes p1_*/p2_* files")
     
@@ -883,27 +2575,73 @@ def build_cli_parser():
     p.add_argument("--boardscale", type=float, default=1.0, help="Scale of the board in the board image")
     p.add_argument("--tilescale", type=float, default=1.0, help="Scale of the tiles in the board image")
     p.add_argument("--saveboardimg", action="store_true", help="Output board images")
+    p.add_argument("--renderbackend", choices=RENDER_BACKENDS, default="auto",
+                   help="(saveboardimg) composite board images with Pillow, NumPy, or 'auto': benchmark both at startup and use the faster")
+    p.add_argument("--boardsvg", type=str, default=None,
+                   help="the output file to write the board as SVG (uses the tile layout options, no Pillow needed)")
+    p.add_argument("--imagemode", choices=IMAGE_MODES, default="history",
+                   help="(saveboardimg) 'history' keeps an image per update, 'latest' replaces <gcg>.latest.jpg, 'ring' adds the last --imagering images")
+    p.add_argument("--imagering", type=int, default=10, help="(imagemode ring) number of recent images to keep")
+    p.add_argument("--imagevariant", type=parse_image_variant, action="append", default=None, metavar="NAME:SIZE[:FORMAT[:QUALITY]]",
+                   help="(saveboardimg) write each board image as this variant instead of one full-size JPEG; repeatable, "
+                        "e.g. main:1920x1080:jpeg:90 pip:480:webp:80 (SIZE: WIDTHxHEIGHT, WIDTH or full)")
     p.add_argument("--autosim", type=str, default=None, help="Path to MAGPIE directory for automatic analysis after each GCG update")
+    p.add_argument("--engine-threads", type=int, default=None, help="(autosim) number of MAGPIE threads (default: MAGPIE's own)")
+    p.add_argument("--engine-cpus", type=parse_cpu_list, default=None, help="(autosim) CPUs MAGPIE may run on, e.g. '2-7' or '4,5,6'")
+    p.add_argument("--engine-nice", type=parse_nice, default=None,
+                   help="(autosim) lower MAGPIE's priority by this nice level (Windows: below normal, idle from 10)")
+    p.add_argument("--engine-max-load", type=float, default=None,
+                   help="(autosim) shrink MAGPIE's threads so the system load stays under this fraction of the CPUs, e.g. 0.75")
+    p.add_argument("--localsim", action="store_true",
+                   help="Write analysis.txt with the built-in move generator (top plays by score); also the fallback when --autosim's MAGPIE is unavailable")
+    p.add_argument("--watcher", choices=["auto", "notify", "poll"], default="auto",
+                   help="File watcher backend: OS notifications, stat polling, or 'auto' (polls on network shares)")
+    p.add_argument("--daemon", action="store_true",
+                   help="Keep running between games and accept 'switch N path' commands (defaults --control to watch_gcg.control next to --gcg)")
+    p.add_argument("--control", type=str, default=None, help="(daemon) control file; append one command per line")
+    p.add_argument("--control-port", type=int, default=None, help="(daemon) also accept commands on this 127.0.0.1 TCP port")
+    p.add_argument("--roster", type=str, default=None,
+                   help="Tab-separated player roster; players named in the GCG's #player lines get their player card files written")
+    p.add_argument("--playercards", type=str, default=None, help="(roster) directory for the player card files (default: current directory)")
     return p
 
-def run_gui():
+def run_gui(log_lines=2000, log_file=None):
+    """
+    Launch the Tk GUI.
+
+    The log view keeps at most log_lines lines; older lines are dropped, or
+    appended to the rotating log_file when one is given.
+    """
     import json
     import os
     import platform
     import queue
-    import shutil
-    import signal
     import sys
     import threading
+    import traceback
     from pathlib import Path
     from datetime import datetime
 
-    import tkinter as tk
+    tk = _timed_import("tkinter")
     from tkinter import ttk, filedialog, messagebox
 
 # -------------------------------
 # Persistent config
 # -------------------------------
+    log_lines = max(1, log_lines)
+    overflow_logger = None
+    if log_file:
+        import logging
+        import logging.handlers
+        overflow_logger = logging.getLogger("watch_gcg.gui")
+        overflow_logger.propagate = False
+        overflow_logger.setLevel(logging.INFO)
+        handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=1024 * 1024, backupCount=3, encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        overflow_logger.addHandler(handler)
+
     APP_NAME = "WatchGCG-GUI"
     CONFIG_DIR = os.path.join(Path.home(), f".{APP_NAME.lower()}")
     CONFIG_FILE = os.path.join(CONFIG_DIR, "folders.json")
@@ -921,8 +2659,6 @@ def run_gui():
         "stats2":"Last folder used for Stats 2 output",
     }
 
-    SUCCESS_MARK = "To stop execution, hit control-C."  # gate log output
-
     # -------------------------------
     # Folder memory helpers
     # -------------------------------
@@ -947,79 +2683,98 @@ def run_gui():
         return data.get(key)
 
     # -------------------------------
-    # Runner that spawns watch_gcg.py (shows only post-success logs)
+    # Runner that drives main() on a background event-loop thread
     # -------------------------------
-    class TailRunner:
-        def __init__(self, on_log):
-            self.on_log = on_log
-            self.proc = None
+    class WatcherRunner:
+        def __init__(self):
             self.q = queue.Queue()
+            self.loop = None
             self.thread = None
-            self.show_after_success = False
-            self._gcg_display = None
+            self.task = None
 
-        def start(self, python_exe, script_path, args, gcg_path=None):
-            if self.proc:
-                self.on_log("[warn] Already running.\n")
-                return
-            
-            if not python_exe:
-                python_exe = sys.executable or "py"
+        def is_running(self):
+            # The loop thread only ends once main() has finished its cleanup
+            return self.thread is not None and self.thread.is_alive()
 
-            self._gcg_display = Path(gcg_path).name if gcg_path else None
-            cmd = [python_exe, "-u", script_path] + args
-            self.on_log(f"[info] Launching: {' '.join(cmd)}\n")
+        def start(self, watcher_kwargs):
+            if self.is_running():
+                self.q.put({"kind": "warning", "message": "Already running."})
+                return
 
-            def reader():
-                try:
-                    self.proc = subprocess.Popen(
-                        cmd,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.STDOUT,
-                        universal_newlines=True,
-                        bufsize=1,
-                    )
-                    # Stream stdout lines
-                    for raw in self.proc.stdout:
-                        line = raw if raw is not None else ""
-                        if not self.show_after_success and SUCCESS_MARK in line:
-                            self.show_after_success = True
-                            gcg_filename = self._gcg_display or "the selected GCG file"
-                            self.q.put(f"\n\n\n!!! SUCCESS !!!\nSuccessfully starting watching {gcg_filename} for changes.\n"
-                                    "Any syntax or error messages after this message are legitimate and should be reported to the developer.\n"
-                                    "To stop execution, exit out of this window.\n")
-                            continue
-                        if self.show_after_success:
-                            self.q.put(line)
-                except FileNotFoundError:
-                    self.q.put("[error] Could not start Python or script.\n")
-                finally:
-                    self.q.put("[info] Process exited.\n")
-
-            self.thread = threading.Thread(target=reader, daemon=True)
+            self.loop = asyncio.new_event_loop()
+            self.thread = threading.Thread(target=self._run_loop, args=(self.loop,), daemon=True)
             self.thread.start()
 
+            self.q.put({"kind": "status", "message": f"Starting watcher for {Path(watcher_kwargs['gcg_filename']).name}"})
+            self.loop.call_soon_threadsafe(self._create_task, watcher_kwargs)
+
+        @staticmethod
+        def _run_loop(loop):
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_forever()
+            finally:
+                loop.run_until_complete(loop.shutdown_asyncgens())
+                loop.close()
+
+        def _create_task(self, watcher_kwargs):
+            # Runs on the loop thread, so stop() (also scheduled there) always finds the task
+            self.task = self.loop.create_task(self._run(watcher_kwargs))
+
+        async def _run(self, watcher_kwargs):
+            try:
+                await main(**watcher_kwargs, on_event=self.q.put)
+            except asyncio.CancelledError:
+                self.q.put({"kind": "status", "message": "Watcher stopped."})
+            except Exception as exc:
+                tb = "".join(traceback.format_exception(type(exc), exc, exc.__traceback__))
+                self.q.put({"kind": "error", "message": tb})
+            finally:
+                # main()'s own cleanup has finished by now, so stopping the loop loses nothing
+                self.q.put({"kind": "exited", "message": "Watcher exited."})
+                self.loop.stop()
+
         def poll(self):
+            """Drain every queued event and return them as formatted log lines."""
+            lines = []
             try:
                 while True:
-                    self.on_log(self.q.get_nowait())
+                    lines.append(self._format_event(self.q.get_nowait()))
             except queue.Empty:
                 pass
-
-        def stop(self):
-            if not self.proc:
-                return
-            try:
-                if os.name == "nt":
-                    # Graceful on Windows
-                    self.proc.terminate()
-                else:
-                    self.proc.send_signal(signal.SIGTERM)
-            except Exception:
-                pass
-            self.proc = None
-            self.thread = None
-            self.show_after_success = False
+            return lines
+
+        @staticmethod
+        def _format_event(event):
+            kind = event.get("kind")
+            message = event.get("message", "")
+            if kind == "ready":
+                gcg_filename = Path(event.get("gcg") or "").name or "the selected GCG file"
+                return (f"\n\n\n!!! SUCCESS !!!\nSuccessfully starting watching {gcg_filename} for changes.\n"
+                        "Any syntax or error messages after this message are legitimate and should be reported to the developer.\n"
+                        "To stop execution, exit out of this window.\n")
+            if kind == "update":
+                line = f"[update] {event.get('elapsed', 0.0) * 1000:.1f} ms"
+                if event.get("board", 1) != 1:
+                    line = f"[update] board {event['board']}: {event.get('elapsed', 0.0) * 1000:.1f} ms"
+                if event.get("latency") is not None:
+                    line += f" ({event.get('watcher')} watcher, detected after {event['latency'] * 1000:.0f} ms)"
+                if event.get("last_play"):
+                    line += f" | {event['last_play']}"
+                return line + "\n"
+            prefix = {"status": "[info]", "warning": "[warn]", "error": "[error]", "exited": "[info]"}.get(kind, "[info]")
+            return f"{prefix} {message.rstrip()}\n"
+
+        def _cancel_task(self):
+            if self.task is not None:
+                self.task.cancel()
+
+        def stop(self, timeout=None):
+            """Cancel main() on the loop thread; with a timeout, wait that long for its cleanup."""
+            if self.is_running():
+                self.loop.call_soon_threadsafe(self._cancel_task)
+                if timeout is not None:
+                    self.thread.join(timeout)
         
     # -------------------------------
     # Main GUI
@@ -1039,28 +2794,11 @@ def run_gui():
             self._make_controls()
             self._make_log()
 
-            # Validate python exe
-            py = (self.python_var.get() or "").strip()
-            if not py:
-                py = sys.executable  # fallback
-
-            def _looks_like_python_exe(p):
-                base = os.path.basename(p).lower()
-                return base in ("python.exe", "pythonw.exe", "py.exe", "pyw.exe") or base.startswith("python") and base.endswith(".exe")
-
-            # If user accidentally picked the script or a folder, warn
-            if os.path.isdir(py) or (py.lower().endswith(".py") and os.path.exists(py)) or (os.name == "nt" and not _looks_like_python_exe(py) and py not in ("py", "python", "python3")):
-                messagebox.showwarning(
-                    "Invalid Python",
-                    "The 'Python exe' field must point to a Python interpreter (python.exe) or be 'py'."
-                )
-                return
-            
             # Runner + polling
-            self.runner = TailRunner(self._append_log)
+            self.runner = WatcherRunner()
             self.after(120, self._poll_runner)
 
-            # Stop child on window close
+            # Stop the watcher on window close
             master.protocol("WM_DELETE_WINDOW", self._on_close)
 
         # ---------- UI: file pickers ----------
@@ -1102,7 +2840,7 @@ def run_gui():
             
             fields = [
                 ("gcg",   "GCG file (.gcg)",          [("GCG file", "*.gcg")]),
-                ("lex",   "Lexicon file (.csv)",      [("Lexicon", "*.csv")]),
+                ("lex",   "Lexicon file (.csv)",      [("Lexicon", "*.csv"), ("Compiled lexicon", "*.lexidx")]),
                 # Score field (single) for Default
                 ("score", "Score (.txt)",             [("Score", "*.txt")]),
                 # AU fields (two) – initially hidden
@@ -1175,20 +2913,7 @@ def run_gui():
             bar = ttk.Frame(self)
             bar.pack(fill="x", padx=10, pady=(0, 10))
 
-            self.python_var = tk.StringVar(value=sys.executable or "python")
-            ttk.Label(bar, text="Python exe:").pack(side="left")
-            py_entry = ttk.Entry(bar, textvariable=self.python_var, width=42)
-            py_entry.pack(side="left", padx=(4, 10))
-
-            def choose_python():
-                kw = {}
-                if os.name == "nt":
-                    kw["filetypes"] = [("Python executable", "python*.exe"), ("Executables", "*.exe"), ("All files", "*.*")]
-                path = filedialog.askopenfilename(title="Choose Python executable", **kw)
-                if path:
-                    self.python_var.set(path)
-            ttk.Button(bar, text="Find…", command=choose_python).pack(side="left", padx=(0, 12))
-
+            ttk.Button(bar, text="Stop", command=self.on_stop).pack(side="right", padx=(6, 0))
             ttk.Button(bar, text="Start", command=self.on_start).pack(side="right")
           
 
@@ -1207,9 +2932,25 @@ def run_gui():
 
 
         def _append_log(self, s: str):
+            self._append_log_batch([s])
+
+        def _append_log_batch(self, lines):
+            """Insert all pending lines in one go and trim the widget to log_lines."""
+            if not lines:
+                return
             ts = datetime.now().strftime("%H:%M:%S")
             self.log_text.configure(state="normal")
-            self.log_text.insert("end", f"[{ts}] {s}")
+            self.log_text.insert("end", "".join(f"[{ts}] {s}" for s in lines))
+
+            # Every message ends with a newline, so "end-1c" sits on an empty last line
+            line_count = int(self.log_text.index("end-1c").split(".")[0]) - 1
+            overflow = line_count - log_lines
+            if overflow > 0:
+                cut = f"{overflow + 1}.0"
+                if overflow_logger is not None:
+                    overflow_logger.info(self.log_text.get("1.0", cut).rstrip("\n"))
+                self.log_text.delete("1.0", cut)
+
             self.log_text.see("end")
             self.log_text.configure(state="disabled")
 
@@ -1247,46 +2988,47 @@ def run_gui():
                 messagebox.showwarning("Missing fields", f"Please choose files for: {', '.join(missing)}")
                 return
 
-            script_path = os.path.abspath(__file__)
-            args = [
-                "--gcg", vals["gcg"],
-                "--lex", vals["lex"],
-                "--unseen", vals["unseen"],
-                "--count", vals["count"],
-                "--lp", vals["lp"],
-                "--ver", mode,
-            ]
+            watcher_kwargs = dict(
+                gcg_filename=vals["gcg"],
+                lex_filename=vals["lex"],
+                score_output_filename=vals.get("score") or None,
+                unseen_output_filename=vals["unseen"],
+                count_output_filename=vals["count"],
+                last_play_output_filename=vals["lp"],
+                ver=mode,
+            )
 
-            if mode == "std":
-                args += ["--score", vals["score"]]
-            else:
+            if mode == "au":
                 # Because GUI always requires two files explicitly in AU mode
-                args += ["--p1score", vals["p1score"], "--p2score", vals["p2score"]]
+                watcher_kwargs.update(p1score=vals["p1score"], p2score=vals["p2score"])
 
             # Add optional blank and stats files if provided
-            if vals.get("blank1"):
-                args += ["--blank1", vals["blank1"]]
-            if vals.get("blank2"):
-                args += ["--blank2", vals["blank2"]]
-            if vals.get("stats1"):
-                args += ["--stats1", vals["stats1"]]
-            if vals.get("stats2"):
-                args += ["--stats2", vals["stats2"]]
+            watcher_kwargs.update(
+                blank1_output_filename=vals.get("blank1") or None,
+                blank2_output_filename=vals.get("blank2") or None,
+                stats1_output_filename=vals.get("stats1") or None,
+                stats2_output_filename=vals.get("stats2") or None,
+            )
 
             # Persist folders
             for k, v in vals.items():
                 if v:
                     save_last_folder(os.path.dirname(v), k)
 
-            self.runner.start(self.python_var.get(), script_path, args, gcg_path=vals["gcg"])
+            self.runner.start(watcher_kwargs)
         
+        def on_stop(self):
+            if self.runner.is_running():
+                self.runner.stop()
+
         def _on_close(self):
-            self.runner.stop()
+            # Give main() a moment to flush queued output writes before the process exits
+            self.runner.stop(timeout=2.0)
             self.master.destroy()
 
         # ---------- Poll runner ----------
         def _poll_runner(self):
-            self.runner.poll()
+            self._append_log_batch(self.runner.poll())
             self.after(120, self._poll_runner)
         
     def _gui_main():
@@ -1300,6 +3042,8 @@ def run_gui():
         except Exception:
             pass
         App(root)
+        _startup_mark("gui window")
+        _report_startup_times()
         root.mainloop()
 
     _gui_main()
@@ -1308,17 +3052,26 @@ def parse_top_level(argv):
     # top-level parser to catch --gui & forward the rest
     top = argparse.ArgumentParser(prog="watch_gcg", add_help=True)
     top.add_argument("--gui", action="store_true", help="Launch the GUI")
+    top.add_argument("--startup-times", action="store_true",
+                     help="Print a breakdown of startup phases and deferred import times")
+    top.add_argument("--log-lines", type=int, default=2000,
+                     help="(GUI) maximum number of lines kept in the log view")
+    top.add_argument("--log-file", type=str, default=None,
+                     help="(GUI) rotating file that receives log lines trimmed from the log view")
     # pass the rest to the CLI parser
     known, rest = top.parse_known_args(argv)
     return known, rest
 
 if __name__ == "__main__":
-    ensure_requirements()
+    _startup_mark("module loaded")
     known, rest = parse_top_level(sys.argv[1:])
+    STARTUP_TIMES = known.startup_times
+    ensure_requirements()
+    _startup_mark("dependency check")
     if known.gui or not rest:
         # GUI mode if --gui OR if no other args given
         try:
-            run_gui()
+            run_gui(log_lines=known.log_lines, log_file=known.log_file)
         except Exception as e:
             # Surface errors instead of a silent close on double-click
             if os.name == "nt":
@@ -1335,8 +3088,15 @@ if __name__ == "__main__":
             raise
     else:
         cli = build_cli_parser().parse_args(rest)
+        _startup_mark("arguments parsed")
+        if cli.daemon and not (cli.control or cli.control_port) and cli.gcg:
+            cli.control = os.path.join(os.path.dirname(os.path.abspath(cli.gcg)), "watch_gcg.control")
         if cli.saveboardimg:
             ensure_pil()
+        if cli.imagevariant and duplicate_variant_files(cli.imagevariant):
+            print("Error: Each --imagevariant needs its own NAME or FORMAT; these would overwrite each other: "
+                  + ", ".join(duplicate_variant_files(cli.imagevariant)))
+            sys.exit(-1)
 
         for required_inputs in ("gcg", "lex", "unseen", "count", "lp"):
             if not getattr(cli, required_inputs, None):
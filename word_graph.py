@@ -0,0 +1,325 @@
+"""
+Compact word graph (a minimal DAWG) for structural lexicon queries: hooks,
+anagrams and patterns, on top of the exact lookups word_definitions gives.
+
+The graph is built from sorted words with Daciuk's incremental minimization,
+then packed into one array of uint32 edges so it can be saved and
+memory-mapped:
+
+    b"WGCGDAWG"                  magic
+    uint32 edge count            little-endian
+    uint32 edges[count]          little-endian
+
+Each node is a run of edges, the root's run starts at edge 0. An edge packs
+
+    bits 0-4    letter (0 = A ... 25 = Z)
+    bit 5       a word ends after taking this edge
+    bit 6       last edge of its node
+    bits 7-31   index of the child's first edge (0 = no children)
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+MAGIC = b"WGCGDAWG"
+GRAPH_SUFFIX = ".dawg"
+
+_HEADER = struct.Struct("<8sI")
+_TERMINAL = 1 << 5
+_LAST = 1 << 6
+_CHILD_SHIFT = 7
+_MAX_CHILD = (1 << (32 - _CHILD_SHIFT)) - 1
+
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+class _Node:
+    __slots__ = ("children", "final", "id")
+
+    def __init__(self):
+        self.children = {}
+        self.final = False
+        self.id = None
+
+    def signature(self):
+        return (self.final, tuple((letter, child.id) for letter, child in sorted(self.children.items())))
+
+def build_edges(words):
+    """Build the packed edge array for an iterable of sorted, uppercase A-Z words."""
+    root = _Node()
+    register = {}
+    unchecked = []  # (parent, letter, child) along the previous word
+    previous = ""
+
+    def minimize(down_to):
+        while len(unchecked) > down_to:
+            parent, letter, child = unchecked.pop()
+            signature = child.signature()
+            if signature in register:
+                parent.children[letter] = register[signature]
+            else:
+                child.id = len(register) + 1
+                register[signature] = child
+
+    for word in words:
+        if word <= previous:
+            if word == previous:
+                continue
+            raise ValueError(f"Words must be sorted: {word!r} after {previous!r}")
+        common = 0
+        for a, b in zip(word, previous):
+            if a != b:
+                break
+            common += 1
+        minimize(common)
+        node = unchecked[-1][2] if unchecked else root
+        for letter in word[common:]:
+            child = _Node()
+            node.children[letter] = child
+            unchecked.append((node, letter, child))
+            node = child
+        node.final = True
+        previous = word
+    minimize(0)
+
+    # Lay out every distinct node's edges; children are placed after their parents
+    edges = array("I")
+    offsets = {}
+    pending = [root]
+    order = []
+    while pending:
+        node = pending.pop()
+        if id(node) in offsets or not node.children:
+            continue
+        offsets[id(node)] = len(edges)
+        order.append(node)
+        edges.extend([0] * len(node.children))
+        pending.extend(node.children.values())
+    if len(edges) > _MAX_CHILD:
+        raise ValueError("Lexicon too large for the word graph format")
+    for node in order:
+        start = offsets[id(node)]
+        items = sorted(node.children.items())
+        for i, (letter, child) in enumerate(items):
+            edge = ord(letter) - 65
+            if child.final:
+                edge |= _TERMINAL
+            if i == len(items) - 1:
+                edge |= _LAST
+            edge |= offsets.get(id(child), 0) << _CHILD_SHIFT
+            edges[start + i] = edge
+    return edges
+
+def write_word_graph(path, edges):
+    """Write packed edges to path, via a temporary file."""
+    path = str(path)
+    tmp_path = path + ".tmp"
+    data = edges
+    if sys.byteorder != "little":
+        data = array("I", edges)
+        data.byteswap()
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, len(edges)))
+        f.write(data.tobytes())
+    os.replace(tmp_path, path)
+
+class WordGraph:
+    """Read-only word graph over packed edges (an array, or a memory-mapped .dawg file)."""
+    def __init__(self, edges):
+        self._edges = edges
+
+    @classmethod
+    def open(cls, path):
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(mm) < _HEADER.size:
+            raise ValueError(f"Not a word graph: {path}")
+        magic, count = _HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or len(mm) != _HEADER.size + 4 * count:
+            raise ValueError(f"Not a word graph: {path}")
+        if sys.byteorder == "little":
+            edges = memoryview(mm)[_HEADER.size:].cast("I")
+        else:
+            edges = array("I", mm[_HEADER.size:])
+            edges.byteswap()
+        return cls(edges)
+
+    @classmethod
+    def from_words(cls, words):
+        return cls(build_edges(words))
+
+    def __len__(self):
+        return len(self._edges)
+
+    # ---------- Traversal ----------
+    # Nodes are edge indexes: 0 is the root, and a child of 0 means a leaf.
+
+    def children(self, node):
+        """Yield (letter, terminal, child) for the edges of node (an edge index; 0 is the root)."""
+        edges = self._edges
+        if node < 0 or node >= len(edges):
+            return
+        while True:
+            edge = edges[node]
+            yield ALPHABET[edge & 31], bool(edge & _TERMINAL), edge >> _CHILD_SHIFT
+            if edge & _LAST:
+                return
+            node += 1
+
+    def step(self, node, letter):
+        """Follow letter from node; return (terminal, child) or None."""
+        for edge_letter, terminal, child in self.children(node):
+            if edge_letter == letter:
+                return terminal, child
+            if edge_letter > letter:
+                return None
+        return None
+
+    def walk(self, word, node=0):
+        """Return (terminal, node after word), or None if no word starts with it."""
+        terminal = False
+        for i, letter in enumerate(word):
+            if i and not node:
+                return None  # The previous letter ended on a leaf
+            step = self.step(node, letter)
+            if step is None:
+                return None
+            terminal, node = step
+        return terminal, node
+
+    # ---------- Queries ----------
+
+    def __contains__(self, word):
+        if not isinstance(word, str) or not word:
+            return False
+        walked = self.walk(word.upper())
+        return walked is not None and walked[0]
+
+    def is_prefix(self, prefix):
+        return self.walk(prefix.upper()) is not None
+
+    def hooks(self, word):
+        """Return (front hooks, back hooks) for word as sorted letter strings."""
+        word = word.upper()
+        if not word:
+            return "", ""
+        back = ""
+        walked = self.walk(word)
+        if walked is not None and walked[1]:
+            back = "".join(letter for letter, terminal, _ in self.children(walked[1]) if terminal)
+        front = []
+        for letter, terminal, child in self.children(0):
+            if child:
+                walked = self.walk(word, child)
+                if walked is not None and walked[0]:
+                    front.append(letter)
+        return "".join(front), back
+
+    def anagrams(self, rack, partial=False):
+        """
+        Return the sorted words that use every tile of rack ('?' is a blank),
+        or, with partial=True, any of them (two letters or more).
+        """
+        counts = {}
+        for tile in rack.upper():
+            counts[tile] = counts.get(tile, 0) + 1
+        total = len(rack)
+        found = set()
+        prefix = []
+
+        def search(node, used):
+            for letter, terminal, child in self.children(node):
+                if counts.get(letter, 0):
+                    tile = letter
+                elif counts.get("?", 0):
+                    tile = "?"
+                else:
+                    continue
+                counts[tile] -= 1
+                prefix.append(letter)
+                if terminal and (used + 1 == total or (partial and used + 1 >= 2)):
+                    found.add("".join(prefix))
+                if child and used + 1 < total:
+                    search(child, used + 1)
+                prefix.pop()
+                counts[tile] += 1
+
+        if total:
+            search(0, 0)
+        return sorted(found)
+
+    def match(self, pattern):
+        """
+        Return the sorted words matching pattern, where '?' or '.' is any
+        one letter and '*' any run of letters (including none).
+        """
+        pattern = pattern.upper()
+        found = set()
+        prefix = []
+
+        def search(node, i, terminal):
+            if i == len(pattern):
+                if terminal:
+                    found.add("".join(prefix))
+                return
+            symbol = pattern[i]
+            if symbol == "*":
+                search(node, i + 1, terminal)
+            if node == 0 and prefix:
+                return  # Leaf: nothing follows
+            for letter, child_terminal, child in self.children(node):
+                if symbol == "*":
+                    prefix.append(letter)
+                    search(child, i, child_terminal)
+                    prefix.pop()
+                elif symbol in "?." or letter == symbol:
+                    prefix.append(letter)
+                    search(child, i + 1, child_terminal)
+                    prefix.pop()
+
+        search(0, 0, False)
+        return sorted(found)
+
+    def words(self):
+        """Yield every word in sorted order."""
+        prefix = []
+
+        def walk(node):
+            for letter, terminal, child in self.children(node):
+                prefix.append(letter)
+                if terminal:
+                    yield "".join(prefix)
+                if child:
+                    yield from walk(child)
+                prefix.pop()
+
+        if len(self._edges):
+            yield from walk(0)
+
+def graph_path_for(lex_filename):
+    return os.path.splitext(str(lex_filename))[0] + GRAPH_SUFFIX
+
+def load_word_graph(lex_filename, words=None):
+    """
+    Return the WordGraph for a lexicon, memory-mapping the cached .dawg next
+    to it when that is newer than the lexicon, and otherwise building it
+    from words (default: the lexicon's keys) and caching it.
+    """
+    graph_path = graph_path_for(lex_filename)
+    try:
+        if os.path.getmtime(graph_path) >= os.path.getmtime(lex_filename):
+            return WordGraph.open(graph_path)
+    except (OSError, ValueError):
+        pass
+
+    if words is None:
+        from watch_gcg import read_definitions
+        words = read_definitions(lex_filename)[0]
+    edges = build_edges(sorted(w for w in words if w.isascii() and w.isalpha() and w.isupper()))
+    try:
+        write_word_graph(graph_path, edges)
+    except OSError:
+        pass  # Read-only lexicon folder: use the graph in memory
+    return WordGraph(edges)